@@ -0,0 +1,146 @@
+"""
+Cold start benchmark: import time of the app's modules and time to the first render of main.py.
+
+Import time: every repetition imports the modules main.py depends on (everything except Streamlit
+itself) in a fresh interpreter and measures the wall time. The heavy libraries that must not be
+imported at start-up (LLMWare, pandas, pyarrow, tiktoken, streamlit-lottie) are checked: importing
+any of them fails the benchmark, as does exceeding --max-import-ms, so the lazy imports cannot
+regress silently. The slowest modules (cumulative time from `python -X importtime`) are listed.
+
+First render: when Streamlit is installed, main.py is run headless with streamlit.testing's AppTest
+in a fresh interpreter; the first run (cold: imports, caches empty) and a rerun (warm) are timed.
+
+Usage:
+    python _helpers/benchmark_cold_start.py [--repeat 5] [--max-import-ms 500] [--top 10] [--json out.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# What main.py imports, minus Streamlit and the UI modules built on it
+APP_MODULES = [
+    'configs.config',
+    'agents.agent_factory',
+    'pipeline.engine',
+    'pipeline.session',
+    'utils.research_snapshots',
+    'utils.intent_classifier',
+]
+UI_MODULES = ['ui.header', 'ui.conversation', 'ui.pipeline_events', 'ui.trace_waterfall']
+DEFERRED_MODULES = ['llmware', 'pandas', 'pyarrow', 'tiktoken', 'streamlit_lottie']
+
+IMPORT_CHILD = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+started_at = time.perf_counter()
+for module in {modules!r}:
+    __import__(module)
+elapsed = time.perf_counter() - started_at
+print(json.dumps({{'ms': elapsed * 1000, 'deferred_loaded': [m for m in {deferred!r} if m in sys.modules]}}))
+"""
+
+RENDER_CHILD = """
+import json, time
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file('main.py', default_timeout=60)
+started_at = time.perf_counter()
+app.run()
+first = time.perf_counter() - started_at
+started_at = time.perf_counter()
+app.run()
+rerun = time.perf_counter() - started_at
+print(json.dumps({'first_ms': first * 1000, 'rerun_ms': rerun * 1000, 'exceptions': [str(e.value) for e in app.exception]}))
+"""
+
+
+def streamlit_installed():
+    import importlib.util
+    return importlib.util.find_spec('streamlit') is not None
+
+
+def run_child(code, *flags):
+    output = subprocess.run(
+        [sys.executable, *flags, '-c', code], capture_output=True, text=True, check=True, cwd=ROOT,
+    )
+    return json.loads(output.stdout.strip().splitlines()[-1]), output.stderr
+
+
+def slowest_imports(stderr, top):
+    # `-X importtime` lines: "import time: self [us] | cumulative | imported package"
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        rows.append((int(cumulative) / 1000, name.rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per measurement")
+    parser.add_argument("--max-import-ms", type=float, default=500.0, help="Fail when the median import time exceeds this")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest imports listed")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    modules = APP_MODULES + (UI_MODULES if streamlit_installed() else [])
+    code = IMPORT_CHILD.format(root=ROOT, modules=modules, deferred=DEFERRED_MODULES)
+    samples, deferred_loaded = [], set()
+    for _ in range(args.repeat):
+        result, _ = run_child(code)
+        samples.append(result['ms'])
+        deferred_loaded.update(result['deferred_loaded'])
+    _, importtime = run_child(code, '-X', 'importtime')
+
+    results = {
+        'modules': modules,
+        'import_ms': {'median': statistics.median(samples), 'min': min(samples), 'max': max(samples)},
+        'deferred_loaded': sorted(deferred_loaded),
+        'slowest_imports': slowest_imports(importtime, args.top),
+    }
+    print(f"App module import ({len(modules)} modules, {args.repeat} fresh interpreters): "
+          f"median {results['import_ms']['median']:.1f} ms, min {results['import_ms']['min']:.1f} ms, "
+          f"max {results['import_ms']['max']:.1f} ms")
+    print("\nSlowest imports (cumulative ms):")
+    for cumulative_ms, name in results['slowest_imports']:
+        print(f"  {cumulative_ms:8.1f}  {name.strip()}")
+
+    if streamlit_installed():
+        renders = [run_child(RENDER_CHILD)[0] for _ in range(args.repeat)]
+        results['render_ms'] = {
+            'first_median': statistics.median(r['first_ms'] for r in renders),
+            'rerun_median': statistics.median(r['rerun_ms'] for r in renders),
+            'exceptions': sorted({e for r in renders for e in r['exceptions']}),
+        }
+        print(f"\nFirst render of main.py: median {results['render_ms']['first_median']:.1f} ms, "
+              f"rerun median {results['render_ms']['rerun_median']:.1f} ms")
+        for exception in results['render_ms']['exceptions']:
+            print(f"  app raised: {exception}")
+    else:
+        print("\nStreamlit is not installed: first render not measured")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    failures = []
+    if deferred_loaded:
+        failures.append(f"imported at start-up: {', '.join(sorted(deferred_loaded))}")
+    if results['import_ms']['median'] > args.max_import_ms:
+        failures.append(f"median import time {results['import_ms']['median']:.1f} ms > {args.max_import_ms:.0f} ms")
+    if failures:
+        print("\nFAIL: " + "; ".join(failures))
+        sys.exit(1)
+    print("\nOK: no deferred library imported at start-up")
+
+
+if __name__ == "__main__":
+    main()
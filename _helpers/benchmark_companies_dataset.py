@@ -0,0 +1,110 @@
+"""
+Benchmark for screening companies from the CSV versus the memory-mapped columnar dataset.
+
+Each path runs in a fresh subprocess so load time and memory are measured in isolation. The companies
+are screened for f_score > 8 (name, ticker, f_score), which is what ResearchManager needs. Memory is the
+growth of the resident set size over the process after importing pandas and pyarrow.
+With --scale N the rows of data/companies.csv are repeated N times into a temporary copy, to see how the
+paths behave on a larger universe.
+
+Usage:
+    python _helpers/benchmark_companies_dataset.py [--scale 1 100] [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+COLUMNS = ['name', 'ticker', 'f_score']
+PATHS = ['csv (all columns)', 'csv (usecols)', 'arrow (projected)', 'arrow (all columns)']
+
+
+def _rss_mb():
+    # Current resident set size (including touched pages of memory-mapped files) on Linux; elsewhere the
+    # peak from ru_maxrss, which is in bytes on macOS
+    if os.path.exists('/proc/self/statm'):
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_child(path, csv_path, repeat):
+    import pandas as pd
+    from utils.companies_dataset import CompaniesDataset
+
+    dataset = CompaniesDataset(csv_path)
+    baseline = _rss_mb()
+    timings, kept = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        if path == 'csv (all columns)':
+            frame = pd.read_csv(csv_path)
+            selected = frame.loc[frame['f_score'] > 8, COLUMNS].to_dict('records')
+        elif path == 'csv (usecols)':
+            frame = pd.read_csv(csv_path, usecols=COLUMNS)
+            selected = frame.loc[frame['f_score'] > 8].to_dict('records')
+        elif path == 'arrow (projected)':
+            selected = dataset.screen(min_f_score=8)
+        else:
+            table = dataset.read()
+            frame = table.to_pandas()
+            selected = frame.loc[frame['f_score'] > 8, COLUMNS].to_dict('records')
+        timings.append(time.perf_counter() - start)
+        kept.append(selected)
+    rss_mb = _rss_mb() - baseline
+    print(json.dumps({
+        'best_ms': min(timings) * 1000,
+        'rss_mb': rss_mb,
+        'selected': len(selected),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 100])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--csv", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.csv, args.repeat)
+        return
+
+    import pandas as pd
+    from utils.companies_dataset import build_companies_dataset
+
+    source = os.path.join(ROOT, 'data', 'companies.csv')
+    workdir = tempfile.mkdtemp()
+    try:
+        for scale in args.scale:
+            csv_path = os.path.join(workdir, f'companies_x{scale}.csv')
+            pd.concat([pd.read_csv(source)] * scale, ignore_index=True).to_csv(csv_path, index=False)
+            build_companies_dataset(csv_path)
+            base = os.path.splitext(csv_path)[0]
+            sizes = [os.path.getsize(p) / 1e6 for p in (csv_path, base + '.arrow', base + '_descriptions.arrow')]
+            print(f"\nscale x{scale}: csv {sizes[0]:.1f} MB, arrow {sizes[1]:.1f} MB (+ descriptions {sizes[2]:.1f} MB)")
+            print(f"{'path':<22} {'load (ms)':>10} {'RSS (MB)':>9} {'rows':>7}")
+            for path in PATHS:
+                output = subprocess.run(
+                    [sys.executable, __file__, '--child', path, '--csv', csv_path, '--repeat', str(args.repeat)],
+                    capture_output=True, text=True, check=True,
+                ).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+                print(f"{path:<22} {result['best_ms']:>10.1f} {result['rss_mb']:>9.1f} {result['selected']:>7}")
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmark and correctness check for the vectorized Piotroski F-score engine (data/fscore_engine.py).
+
+1. Verification: rescoring data/companies.csv with the engine must reproduce the stored f_score of
+   every row, and must agree with the scalar `calculate_f_score` from data/piotroski_calc.py.
+2. Benchmark: synthetic universes (10k and 100k tickers by default, several periods each) are scored
+   with the engine and with the scalar per-ticker path, and wall-clock times are reported.
+
+Usage:
+    python _helpers/benchmark_fscore_engine.py [--tickers 10000 100000] [--periods 4] [--skip-scalar]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+sys.path.insert(0, DATA_DIR)
+
+from fscore_engine import LINE_ITEMS, compute_f_scores, latest_f_scores, wide_to_long
+
+
+def load_scalar_scorer():
+    try:
+        from piotroski_calc import calculate_f_score
+        return calculate_f_score
+    except ImportError as e:
+        print(f"Scalar reference unavailable ({e}); skipping scalar comparisons.")
+        return None
+
+
+def verify(calculate_f_score):
+    companies = pd.read_csv(os.path.join(DATA_DIR, "companies.csv"))
+    companies['row_id'] = range(len(companies))
+    scores = latest_f_scores(compute_f_scores(wide_to_long(companies, id_column='row_id')))
+    engine_scores = scores['f_score'].reindex(companies['row_id']).to_numpy()
+
+    matches = int((engine_scores == companies['f_score'].to_numpy()).sum())
+    print(f"companies.csv: engine reproduces {matches}/{len(companies)} stored scores")
+
+    if calculate_f_score is not None:
+        scalar_scores = np.array([calculate_f_score(row) for row in companies.to_dict('records')])
+        agree = int((engine_scores == scalar_scores).sum())
+        print(f"companies.csv: engine agrees with calculate_f_score on {agree}/{len(companies)} rows")
+
+    return matches == len(companies)
+
+
+def synthetic_fundamentals(n_tickers, n_periods, seed=0):
+    rng = np.random.default_rng(seed)
+    items = list(LINE_ITEMS.values())
+    n_rows = n_tickers * n_periods * len(items)
+    values = rng.normal(1e9, 5e8, size=n_rows)
+    values[rng.random(n_rows) < 0.02] = np.nan  # some present-but-missing values
+    frame = pd.DataFrame({
+        'ticker': np.repeat(np.arange(n_tickers), n_periods * len(items)),
+        'period': np.tile(np.repeat(np.arange(n_periods), len(items)), n_tickers),
+        'line_item': np.tile(items, n_tickers * n_periods),
+        'value': values,
+    })
+    # Drop some line items entirely (absent -> counts as 0)
+    return frame[rng.random(n_rows) >= 0.01]
+
+
+def scalar_scores(fundamentals, calculate_f_score):
+    """Per-ticker dictionaries scored one at a time, as piotroski_calc.py did before the engine."""
+    scores = {}
+    for ticker, group in fundamentals.groupby('ticker', sort=False):
+        periods = sorted(group['period'].unique())
+        if len(periods) < 2:
+            continue
+        t, t1 = periods[-1], periods[-2]
+        values = dict(zip(zip(group['period'], group['line_item']), group['value']))
+        data = {}
+        for field, label in LINE_ITEMS.items():
+            # Absent line items are 0, present-but-missing values stay NaN (as in get_yfinance_data)
+            data[f'{field}_t'] = values.get((t, label), 0)
+            data[f'{field}_t1'] = values.get((t1, label), 0)
+        data['netIssuanceOfStock_t'] = data['issuanceOfStock_t'] + data['repurchaseOfStock_t']
+        for ratio, (num, den) in {
+            'roa': ('netIncome', 'totalAssets'),
+            'currentRatio': ('currentAssets', 'currentLiabilities'),
+            'grossMargin': ('grossProfit', 'revenue'),
+            'assetTurnover': ('revenue', 'totalAssets'),
+        }.items():
+            for suffix in ('_t', '_t1'):
+                den_value = data[den + suffix]
+                data[ratio + suffix] = data[num + suffix] / den_value if den_value != 0 else 0
+        scores[ticker] = calculate_f_score(data)
+    return scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickers", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--periods", type=int, default=4)
+    parser.add_argument("--skip-scalar", action="store_true")
+    args = parser.parse_args()
+
+    calculate_f_score = load_scalar_scorer()
+    if not verify(calculate_f_score):
+        sys.exit("Engine does not reproduce companies.csv scores")
+
+    print(f"\n{'tickers':>8} {'periods':>8} {'rows':>10} {'engine (s)':>11} {'scalar (s)':>11} {'speedup':>8}")
+    for n_tickers in args.tickers:
+        fundamentals = synthetic_fundamentals(n_tickers, args.periods)
+
+        start = time.perf_counter()
+        scores = compute_f_scores(fundamentals)
+        engine_time = time.perf_counter() - start
+
+        scalar_time = None
+        if calculate_f_score is not None and not args.skip_scalar:
+            start = time.perf_counter()
+            reference = scalar_scores(fundamentals, calculate_f_score)
+            scalar_time = time.perf_counter() - start
+            latest = latest_f_scores(scores)['f_score']
+            assert all(latest[ticker] == score for ticker, score in reference.items())
+
+        scalar_text = f"{scalar_time:>11.2f}" if scalar_time else f"{'-':>11}"
+        speedup = f"{scalar_time / engine_time:>7.0f}x" if scalar_time else f"{'-':>8}"
+        print(f"{n_tickers:>8} {args.periods:>8} {len(scores):>10} {engine_time:>11.2f} {scalar_text} {speedup}")
+
+
+if __name__ == "__main__":
+    main()
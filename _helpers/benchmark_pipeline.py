@@ -0,0 +1,223 @@
+"""
+Offline end-to-end latency benchmark of the agent pipeline.
+
+Replays scripted conversations through the real PipelineEngine (Agent One -> Agent Two / research ->
+Agent Zero), with the LLM replaced by the local OpenAI-compatible stub server (stub_llm_server.py) and
+Yahoo Finance replaced by StubMarketDataProvider, so it runs on a laptop without network access and
+without API keys. The run happens in a temporary working directory (prompts are linked, the company data
+copied, the rate limiter database and the trace file pointed there), so caches, snapshots, decision logs,
+rate limiter state and traces of the repository are not touched.
+
+Reported per stage and end to end: p50/p95/p99 latency in milliseconds. Reported per turn type (N/R/Y):
+LLM calls per turn and prompt tokens per turn, as counted by the stub server.
+
+Stages:
+- agent_one: user message -> Agent One's evaluation
+- agent_two: evaluation -> risk profile ('R' turns)
+- research: evaluation -> Agent Zero starts answering ('Y' turns: snapshot or live research + summary)
+- first_token: user message -> first token of Agent Zero's reply shown
+- agent_zero: first -> last token of Agent Zero's reply shown
+- end_to_end: whole turn
+
+Usage:
+    python _helpers/benchmark_pipeline.py [--repeat 5] [--latency 0.3] [--token-rate 50]
+        [--market-latency 0.05] [--speculative] [--response-cache] [--snapshots] [--json out.json]
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from agents.model_router import percentile
+from stub_llm_server import StubLLMServer
+from stub_market_data import StubMarketDataProvider
+
+STAGES = ['agent_one', 'agent_two', 'research', 'first_token', 'agent_zero', 'end_to_end']
+
+SCRIPTED_CONVERSATIONS = [
+    ["Hi there", "Thanks, nice to meet you", "What can you help me with?"],
+    ["Hello", "I am 35 years old and can accept some losses", "My horizon is 20 years",
+     "Which stocks should I invest in?"],
+    ["Good morning", "Can you recommend some companies to buy?", "Thank you, goodbye"],
+]
+
+
+def make_events_class():
+    from pipeline.events import PipelineEvents
+
+    class BenchmarkEvents(PipelineEvents):
+        """Records when each pipeline event happens during one turn."""
+        def __init__(self):
+            self.marks = {}
+
+        def _mark(self, name):
+            self.marks.setdefault(name, time.perf_counter())
+
+        def on_user_message(self, text):
+            self._mark('user_message')
+
+        def on_evaluation(self, evaluation):
+            self._mark('evaluation')
+            self.evaluation = evaluation
+
+        def on_risk_profile(self, report):
+            self._mark('risk_profile')
+
+        def on_assistant_stream(self, chunks):
+            self._mark('reply_started')
+            text = []
+            for chunk in chunks:
+                self._mark('first_token')
+                text.append(chunk)
+            self._mark('reply_finished')
+            return "".join(text)
+
+        def on_assistant_message(self, text):
+            self._mark('reply_started')
+            self._mark('first_token')
+            self._mark('reply_finished')
+
+        def stages(self, finished_at):
+            m = self.marks
+            stages = {
+                'agent_one': m['evaluation'] - m['user_message'],
+                'first_token': m['first_token'] - m['user_message'],
+                'agent_zero': m['reply_finished'] - m['first_token'],
+                'end_to_end': finished_at - m['user_message'],
+            }
+            if 'risk_profile' in m:
+                stages['agent_two'] = m['risk_profile'] - m['evaluation']
+            if self.label() == 'Y':
+                stages['research'] = m['reply_started'] - m['evaluation']
+            return stages
+
+        def label(self):
+            match = re.search(r"'([NRY])'", getattr(self, 'evaluation', ''))
+            return match.group(1) if match else '?'
+
+    return BenchmarkEvents
+
+
+def prepare_workdir():
+    workdir = tempfile.mkdtemp(prefix="ava-bench-")
+    os.symlink(os.path.join(ROOT, 'prompts'), os.path.join(workdir, 'prompts'))
+    os.makedirs(os.path.join(workdir, 'data'))
+    for name in ('companies.csv', 'agent_one_utterances.csv'):
+        shutil.copy(os.path.join(ROOT, 'data', name), os.path.join(workdir, 'data', name))
+    return workdir
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", help="JSON file with a list of conversations (lists of user messages)")
+    parser.add_argument("--repeat", type=int, default=5, help="Replay every conversation this many times")
+    parser.add_argument("--warmup", type=int, default=1, help="Conversations run first and not measured")
+    parser.add_argument("--model", default="gpt-4o", help="Model name sent to the stub server")
+    parser.add_argument("--latency", type=float, default=0.3, help="Stub LLM seconds to first token")
+    parser.add_argument("--token-rate", type=float, default=50.0, help="Stub LLM output tokens per second")
+    parser.add_argument("--reply-tokens", type=int, default=60, help="Length of Agent Zero's stub replies")
+    parser.add_argument("--market-latency", type=float, default=0.05, help="Stub Yahoo Finance seconds per call")
+    parser.add_argument("--speculative", action="store_true", help="Start Agent Zero replies speculatively")
+    parser.add_argument("--response-cache", action="store_true", help="Enable the agent response cache")
+    parser.add_argument("--snapshots", action="store_true", help="Serve 'Y' turns from research snapshots")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    conversations = SCRIPTED_CONVERSATIONS
+    if args.conversations:
+        with open(args.conversations, encoding="utf-8") as f:
+            conversations = json.load(f)
+
+    server = StubLLMServer(latency=args.latency, token_rate=args.token_rate, reply_tokens=args.reply_tokens).start()
+    os.environ['OPENAI_BASE_URL'] = server.base_url
+    os.environ['OPENAI_API_KEY'] = 'stub'
+    workdir = prepare_workdir()
+    os.chdir(workdir)
+
+    # Keep the rate limiter's shared state and the spans in the temporary directory, not in the repo's data/
+    from utils import rate_limiter
+    from utils.tracing import tracer
+    rate_limiter.DEFAULT_DB_PATH = os.path.join(workdir, 'data', 'rate_limits.db')
+    tracer.path = os.path.join(workdir, 'data', 'traces.jsonl')
+
+    try:
+        from agents.agent_factory import AgentFactory
+        from pipeline.engine import PipelineEngine
+        from pipeline.session import SessionState
+        from utils.market_data import MarketDataFetcher
+        from utils.research_snapshots import ResearchSnapshotStore
+        from utils.research_utils import ResearchManager
+
+        selected_models = {role: args.model for role in ('agent_zero', 'agent_one', 'agent_two')}
+        research_manager = ResearchManager(
+            market_data_fetcher=MarketDataFetcher(provider=StubMarketDataProvider(latency=args.market_latency))
+        )
+        engine = PipelineEngine(
+            AgentFactory(selected_models, lambda model_name: 'stub'),
+            research_manager=research_manager,
+            research_snapshots=ResearchSnapshotStore(os.path.join('data', 'research_snapshots')) if args.snapshots else False,
+            speculative=args.speculative,
+            use_response_cache=args.response_cache,
+        )
+        BenchmarkEvents = make_events_class()
+
+        stage_samples = {stage: [] for stage in STAGES}
+        per_label = {}
+        runs = [(True, turns) for turns in conversations[:args.warmup]]
+        runs += [(False, turns) for _ in range(args.repeat) for turns in conversations]
+        for warmup, turns in runs:
+            session = SessionState()
+            for user_input in turns:
+                events = BenchmarkEvents()
+                before = server.snapshot()
+                engine.run_turn(session, user_input, events)
+                finished_at = time.perf_counter()
+                after = server.snapshot()
+                if warmup:
+                    continue
+                for stage, seconds in events.stages(finished_at).items():
+                    stage_samples[stage].append(seconds * 1000)
+                label = per_label.setdefault(events.label(), {'turns': 0, 'llm_calls': 0, 'prompt_tokens': 0})
+                label['turns'] += 1
+                label['llm_calls'] += after['calls'] - before['calls']
+                label['prompt_tokens'] += after['prompt_tokens'] - before['prompt_tokens']
+    finally:
+        server.stop()
+        os.chdir(ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    results = {'config': vars(args), 'stages': {}, 'turn_types': {}}
+    print(f"{'stage':<12} {'n':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for stage in STAGES:
+        samples = stage_samples[stage]
+        row = {'n': len(samples), **{f'p{q}': percentile(samples, q) for q in (50, 95, 99)}}
+        results['stages'][stage] = row
+        if samples:
+            print(f"{stage:<12} {row['n']:>5} {row['p50']:>9.1f} {row['p95']:>9.1f} {row['p99']:>9.1f}")
+
+    print(f"\n{'turn type':<10} {'turns':>6} {'LLM calls/turn':>15} {'prompt tokens/turn':>19}")
+    for label, totals in sorted(per_label.items()):
+        row = {
+            'turns': totals['turns'],
+            'llm_calls_per_turn': totals['llm_calls'] / totals['turns'],
+            'prompt_tokens_per_turn': totals['prompt_tokens'] / totals['turns'],
+        }
+        results['turn_types'][label] = row
+        print(f"{label:<10} {row['turns']:>6} {row['llm_calls_per_turn']:>15.2f} {row['prompt_tokens_per_turn']:>19.0f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Builds research-summary snapshots for the app (see utils/research_snapshots.py).
+
+Runs the same research as a 'Y' turn (screening, Yahoo Finance data, LLM summary) and publishes it as
+the latest snapshot, which the app then serves without doing the work on the request path. Run it once
+from cron, or with --interval to keep rebuilding on a schedule. The API key is read from OPENAI_API_KEY
+or ANTHROPIC_API_KEY depending on the model.
+
+Usage:
+    python _helpers/build_research_snapshot.py [--model gpt-4o] [--interval 900]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)  # ResearchManager resolves data/ relative to the working directory
+
+from agents.llm_clients import provider_for_model
+from utils.research_snapshots import SnapshotBuilder, get_research_snapshots
+from utils.research_utils import ResearchManager
+
+API_KEY_VARIABLES = {'openai': 'OPENAI_API_KEY', 'anthropic': 'ANTHROPIC_API_KEY'}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="gpt-4o", help="Model used to summarize the research")
+    parser.add_argument("--interval", type=float, help="Rebuild every N seconds instead of once")
+    args = parser.parse_args()
+
+    variable = API_KEY_VARIABLES.get(provider_for_model(args.model))
+    api_key = os.environ.get(variable) if variable else None
+    if not api_key:
+        parser.error(f"Set {variable or 'an API key variable'} for model '{args.model}'")
+
+    builder = SnapshotBuilder(ResearchManager(), get_research_snapshots(), args.model, api_key,
+                              interval=args.interval or 0)
+    if not args.interval:
+        print(f"Published research snapshot {builder.build_once()}")
+        return
+
+    builder.start()
+    try:
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        builder.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Runs many conversations through the headless PipelineEngine concurrently, without Streamlit.
+
+Each conversation is a list of user messages, played turn by turn against its own SessionState; the
+conversations themselves run in parallel on a thread pool sharing one engine (and therefore the model
+pool, caches and research snapshots). Transcripts are written as JSON lines, one per conversation, and
+per-turn latency is summarized at the end. API keys are read from OPENAI_API_KEY / ANTHROPIC_API_KEY.
+
+The conversations file is JSON: a list of conversations, each a list of user messages. Without one, a
+small built-in script is used.
+
+Usage:
+    python _helpers/run_pipeline_batch.py [--conversations convs.json] [--repeat 10] [--concurrency 8]
+        [--model gpt-4o] [--output transcripts.jsonl] [--speculative]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)  # agents and managers resolve prompts/ and data/ relative to the working directory
+
+from agents.agent_factory import AgentFactory
+from agents.llm_clients import provider_for_model
+from agents.model_router import percentile
+from configs.config import Config
+from pipeline.engine import PipelineEngine
+from pipeline.session import SessionState
+
+API_KEY_VARIABLES = {'openai': 'OPENAI_API_KEY', 'anthropic': 'ANTHROPIC_API_KEY'}
+
+SAMPLE_CONVERSATIONS = [
+    ["Hi there", "I am 35 and can handle some losses for higher growth", "What should I invest in?"],
+    ["Hello", "How does the Piotroski F-score work?", "Thanks, bye"],
+]
+
+
+def api_key_for_model(model_name):
+    variable = API_KEY_VARIABLES.get(provider_for_model(model_name))
+    return os.environ.get(variable) if variable else None
+
+
+def run_conversation(engine, turns):
+    session = SessionState()
+    transcript = []
+    for user_input in turns:
+        started_at = time.perf_counter()
+        reply = engine.run_turn(session, user_input)
+        transcript.append({
+            'user': user_input,
+            'assistant': reply,
+            'evaluation': next(m['content'] for m in reversed(session.conversation_history) if m['role'] == 'agent_one'),
+            'seconds': round(time.perf_counter() - started_at, 3),
+        })
+    return transcript
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", help="JSON file with a list of conversations (lists of user messages)")
+    parser.add_argument("--repeat", type=int, default=1, help="Play every conversation this many times")
+    parser.add_argument("--concurrency", type=int, default=8, help="Conversations running at the same time")
+    parser.add_argument("--model", default="gpt-4o", help="Model used by every agent")
+    parser.add_argument("--output", help="Write transcripts to this JSON lines file")
+    parser.add_argument("--speculative", action="store_true", help="Start Agent Zero replies speculatively")
+    args = parser.parse_args()
+
+    if not api_key_for_model(args.model):
+        parser.error(f"Set the API key variable for model '{args.model}'")
+
+    conversations = SAMPLE_CONVERSATIONS
+    if args.conversations:
+        with open(args.conversations, encoding="utf-8") as f:
+            conversations = json.load(f)
+    conversations = conversations * args.repeat
+
+    Config().setup()
+    selected_models = {role: args.model for role in ('agent_zero', 'agent_one', 'agent_two')}
+    engine = PipelineEngine(AgentFactory(selected_models, api_key_for_model), speculative=args.speculative)
+
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency, thread_name_prefix="conversation") as executor:
+        transcripts = list(executor.map(lambda turns: run_conversation(engine, turns), conversations))
+    elapsed = time.perf_counter() - started_at
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            for transcript in transcripts:
+                f.write(json.dumps(transcript) + "\n")
+
+    turn_seconds = sorted(turn['seconds'] for transcript in transcripts for turn in transcript)
+    print(f"{len(transcripts)} conversations, {len(turn_seconds)} turns in {elapsed:.1f}s "
+          f"({len(turn_seconds) / elapsed:.2f} turns/s, concurrency {args.concurrency})")
+    if turn_seconds:
+        print(f"turn latency: median {statistics.median(turn_seconds):.2f}s, "
+              f"p95 {percentile(turn_seconds, 95):.2f}s, max {turn_seconds[-1]:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Local OpenAI-compatible chat completions server for offline benchmarks.
+
+Answers POST /v1/chat/completions (streaming and non-streaming) like a real model would answer the
+agents of this app, without any network access: Agent One's mandate gets a classification, Agent Two's
+mandate gets a JSON risk profile, the research summary prompt gets a short summary and everything else
+(Agent Zero) gets a reply of `reply_tokens` words. Each response waits `latency` seconds before the first
+token and then emits tokens at `token_rate` tokens per second. Calls, prompt tokens and completion tokens
+are counted so a benchmark can attribute them to turns.
+
+Point the OpenAI SDK (and llmware, which uses it) at the server with:
+    OPENAI_BASE_URL=http://127.0.0.1:<port>/v1 OPENAI_API_KEY=stub
+
+Usage:
+    python _helpers/stub_llm_server.py [--port 8001] [--latency 0.3] [--token-rate 50]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.context_builder import count_tokens
+
+ADVICE_PATTERN = re.compile(r"\b(invest\w*|buy|stocks?|shares|recommend\w*|portfolio|companies|equit\w+)\b", re.I)
+RISK_PATTERN = re.compile(r"\d|\b(age|old|retire\w*|risk\w*|loss\w*|lose|safe\w*|years?|income|horizon)\b", re.I)
+
+
+def _classify(user_input):
+    if ADVICE_PATTERN.search(user_input):
+        return 'Y'
+    if RISK_PATTERN.search(user_input):
+        return 'R'
+    return 'N'
+
+
+def stub_reply(prompt, reply_tokens):
+    """Returns the text a model would plausibly answer to one of the app's prompts."""
+    if prompt.startswith("You are Agent One"):
+        user_input = prompt.rsplit("User input:", 1)[-1]
+        return f"{{'investment_advice': ['{_classify(user_input)}']}}"
+    if prompt.startswith("You are Agent Two"):
+        return json.dumps({"risk_ability": "moderate", "risk_willingness": "moderate", "age": "35", "NAV": "unknown"})
+    if prompt.startswith("Please provide a concise summary"):
+        return " ".join(["The screened companies show strong F-scores and fair valuations."] * max(reply_tokens // 10, 1))
+    return " ".join(["word"] * reply_tokens)
+
+
+class _QuietHTTPServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        # Clients dropping their connection (cancelled streams, closed pools) is expected here
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+
+class StubLLMServer:
+    def __init__(self, host="127.0.0.1", port=0, latency=0.3, token_rate=50.0, reply_tokens=60):
+        self.latency = latency
+        self.token_rate = token_rate
+        self.reply_tokens = reply_tokens
+        self.counters = {'calls': 0, 'prompt_tokens': 0, 'completion_tokens': 0}
+        self._lock = threading.Lock()
+        self._server = _QuietHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.counters)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-llm", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _count(self, prompt_tokens, completion_tokens):
+        with self._lock:
+            self.counters['calls'] += 1
+            self.counters['prompt_tokens'] += prompt_tokens
+            self.counters['completion_tokens'] += completion_tokens
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                self._send_json({"object": "list", "data": [{"id": "stub", "object": "model"}]})
+
+            def do_POST(self):
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self.send_error(404)
+                    return
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                prompt = "\n".join(str(m.get("content", "")) for m in request.get("messages", []))
+                words = stub_reply(prompt, stub.reply_tokens).split(" ")
+                prompt_tokens = count_tokens(prompt)
+                stub._count(prompt_tokens, len(words))
+                model = request.get("model", "stub")
+
+                time.sleep(stub.latency)
+                if request.get("stream"):
+                    self._stream(words, model)
+                    return
+                time.sleep(len(words) / stub.token_rate)
+                self._send_json({
+                    "id": "chatcmpl-stub",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": " ".join(words)},
+                        "finish_reason": "stop",
+                    }],
+                    "usage": {
+                        "prompt_tokens": prompt_tokens,
+                        "completion_tokens": len(words),
+                        "total_tokens": prompt_tokens + len(words),
+                    },
+                })
+
+            def _send_json(self, payload):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _stream(self, words, model):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                try:
+                    for i, word in enumerate(words):
+                        delta = {"content": word if i == 0 else " " + word}
+                        self._chunk({"id": "chatcmpl-stub", "object": "chat.completion.chunk", "model": model,
+                                     "choices": [{"index": 0, "delta": delta, "finish_reason": None}]})
+                        time.sleep(1 / stub.token_rate)
+                    self._chunk({"id": "chatcmpl-stub", "object": "chat.completion.chunk", "model": model,
+                                 "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+                    self._write_chunk(b"data: [DONE]\n\n")
+                    self._write_chunk(b"")
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client cancelled the stream (e.g. a discarded speculative reply); don't read the
+                    # next request from the dead connection
+                    self.close_connection = True
+
+            def _chunk(self, payload):
+                self._write_chunk(f"data: {json.dumps(payload)}\n\n".encode("utf-8"))
+
+            def _write_chunk(self, data):
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.3, help="Seconds before the first token")
+    parser.add_argument("--token-rate", type=float, default=50.0, help="Output tokens per second")
+    parser.add_argument("--reply-tokens", type=int, default=60, help="Length of Agent Zero's replies")
+    args = parser.parse_args()
+
+    server = StubLLMServer(port=args.port, latency=args.latency, token_rate=args.token_rate,
+                           reply_tokens=args.reply_tokens).start()
+    print(f"Stub LLM server listening on {server.base_url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Local stand-in for the Yahoo Finance summary calls used by ResearchManager.
+
+StubMarketDataProvider exposes the same `get_stock_summary`, `get_financial_summary` and
+`get_company_summary` methods as utils.market_data.YFinanceProvider (`max_wait` is accepted and ignored, there
+is no rate limiter to wait for), sleeping for a configurable
+latency instead of going to the network. It is used by the benchmark scripts in this folder so they
+run offline and produce repeatable numbers.
+"""
+
+import random
+import threading
+import time
+
+
+class StubMarketDataProvider:
+    def __init__(self, latency=0.05, jitter=0.0, failure_rate=0.0, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _respond(self, ticker, payload):
+        with self._lock:
+            self.calls += 1
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            fail = self._random.random() < self.failure_rate
+        time.sleep(delay)
+        if fail:
+            raise ConnectionError(f"stub failure for '{ticker}'")
+        return payload
+
+    def get_stock_summary(self, ticker, max_wait=None):
+        return self._respond(ticker, {
+            "currentPrice": 100.0,
+            "fiftyTwoWeekHigh": 120.0,
+            "fiftyTwoWeekLow": 80.0,
+            "trailingPE": 18.5,
+            "forwardPE": 16.2,
+            "volume": 1_000_000,
+        })
+
+    def get_financial_summary(self, ticker, max_wait=None):
+        return self._respond(ticker, {
+            "marketCap": 50_000_000_000,
+            "priceToSalesTrailing12Months": 4.2,
+            "revenueGrowth": 0.08,
+            "ebitda": 9_000_000_000,
+            "grossMargins": 0.55,
+            "currency": "USD",
+        })
+
+    def get_company_summary(self, ticker, max_wait=None):
+        return self._respond(ticker, {
+            "sector": "Technology",
+            "website": f"https://www.{ticker.lower()}.example",
+            "industry": "Software",
+        })
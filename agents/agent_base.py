@@ -16,16 +16,102 @@ for agents to be easily added to the app with unique capabilities.
 Attributes:
 - model_name: The name of the LLM model each agent will use.
 - api_key: Access key for LLM model requests.
-- prompter: Instance of the loaded model to manage interactions with user inputs.
+- prompter: Instance of the loaded model to manage interactions with user inputs, shared through the
+  process-wide ModelPool so that reruns reuse an already loaded model. Calls on it hold the pool's lock
+  for the handle, as concurrent sessions share it. Only models without a direct client in llm_clients
+  need one; for OpenAI and Anthropic models it stays None and LLMWare is never imported.
 
 Methods:
 - __init__: Initializes model configuration.
-- load_model: Loads the chosen model using LLMWare’s API.
-- get_mandate: Placeholder for mandate retrieval (to be defined by each agent).
+- load_model: Fetches the chosen model from the shared ModelPool, loading it with LLMWare’s API on first use
+  (skipped for models served by llm_clients).
+- prompt_model: Calls the model once and returns its text, traced as an 'llm' span with token counts.
+  Prompts are split into stable system segments (mandate first, then slow-changing context) and the
+  volatile user message, so providers can reuse the cached prefix; cached input tokens are recorded on
+  the span (cached_tokens). Models without chat messages get the segments joined into one prompt.
+  OpenAI and Anthropic models are called through the pooled async client of llm_clients (connections
+  kept alive and reused process-wide); other models through LLMWare's prompt_main.
+- aprompt_model: Awaitable prompt_model. For agents that enable the model cascade (cascade_enabled), the
+  provider's fast model answers first and the selected model is only called when the output fails
+  validate_output; every attempt is an 'llm' span with its tier, and latencies and escalations are
+  recorded by the process-wide ModelRouter. use_cascade=False uses the selected model only for that call.
+- model_cascade: Returns the models to try, in order.
+- validate_output: Whether an output is usable (always, unless a cascading agent overrides it).
+- complete: Returns the model's completion for a prompt, through the opt-in response cache when the agent
+  enables it (response_cache_enabled). Entries are keyed by model, mandate version and normalized prompt,
+  expire after response_cache_ttl, are evicted LRU beyond response_cache_max_entries and live in SQLite
+  (data/memo_cache.db), so every process shares them. use_cache=False skips the cache for that call.
+- complete_with_source: Same as complete, also telling whether the answer came from the cache.
+- acomplete / acomplete_with_source: Awaitable complete / complete_with_source, so several completions can
+  run concurrently (asyncio.gather) on the process-wide event loop (utils/async_runner.run_async).
+- response_cache: Returns the agent class's LRUStore, whose stats() report the cache hits and misses.
+- stream_main: Yields the model's completion for a prompt token by token, falling back to a single chunk
+  from prompt_main for models without a streaming client. Traced as an 'llm.stream' span with the time to
+  the first token and, once the stream ends, the cached input tokens.
+- get_mandate: Placeholder for mandate retrieval (to be defined by each agent, usually via load_mandate,
+  which keeps the mandate files in memory).
 - process_input: Placeholder for input processing (to be defined by each agent).
 '''
 
+import asyncio
+import hashlib
+import os
+import re
+import threading
+import time
+
+from utils.context_builder import count_tokens
+from utils.lru_store import LRUStore, content_key
+from utils.model_pool import model_pool
+from utils.tracing import set_attributes, span, start_span
+from utils.async_runner import run_async
+from .llm_clients import acomplete, flatten_prompt, provider_for_model, stream_completion
+from .model_router import model_router
+
+RESPONSE_CACHE_PATH = os.path.join("data", "memo_cache.db")
+MANDATES_DIR = "prompts"
+
+_mandates = {}
+_mandates_lock = threading.Lock()
+
+def load_mandate(filename):
+    """
+    Returns the text of a mandate in prompts/, kept in memory and only read again when the file changes, so
+    every call starts with the identical prefix.
+    """
+    path = os.path.join(MANDATES_DIR, filename)
+    modified_at = os.stat(path).st_mtime_ns
+    with _mandates_lock:
+        cached = _mandates.get(path)
+        if cached is None or cached[0] != modified_at:
+            with open(path, 'r') as f:
+                cached = _mandates[path] = (modified_at, f.read())
+        return cached[1]
+
+_response_caches = {}
+_response_caches_lock = threading.Lock()
+
+def get_response_cache(namespace, ttl, max_entries):
+    """Returns the process-wide LRUStore of an agent class, so hit counters cover every instance."""
+    with _response_caches_lock:
+        if namespace not in _response_caches:
+            _response_caches[namespace] = LRUStore(
+                RESPONSE_CACHE_PATH, namespace=namespace, max_entries=max_entries, ttl=ttl
+            )
+        return _response_caches[namespace]
+
+def normalize_prompt(text):
+    # Case, repeated whitespace and surrounding punctuation do not change the answer ("Hi!" == "hi")
+    return re.sub(r"\s+", " ", text).strip().strip(".!?,;: ").casefold()
+
 class AgentBase:
+    # Opt-in response cache for agents whose answer depends only on the mandate and the prompt
+    response_cache_enabled = False
+    response_cache_ttl = 7 * 24 * 60 * 60
+    response_cache_max_entries = 5000
+    # Opt-in model cascade for agents whose output validate_output can check (agents/model_router.py)
+    cascade_enabled = False
+
     def __init__(self, model_name, api_key):
         self.model_name = model_name
         self.api_key = api_key
@@ -33,8 +119,149 @@ class AgentBase:
         self.load_model()
 
     def load_model(self):
-        from llmware.prompts import Prompt
-        self.prompter = Prompt().load_model(self.model_name, api_key=self.api_key)
+        if provider_for_model(self.model_name) is not None:
+            return  # served by the pooled provider clients of llm_clients
+        with span('load_model', agent=type(self).__name__, model=self.model_name):
+            self.prompter = model_pool.acquire(self.model_name, self.api_key)
+
+    def prompt_model(self, prompt, system=None, use_cascade=True):
+        """
+        Calls the model with the volatile `prompt` as the user message, preceded by `system`: a string or a list
+        of segments ordered from the most stable (the mandate) to the least, so providers can cache the prefix.
+        Agents are shared across sessions, so per-session choices such as `use_cascade` are passed per call.
+        """
+        if provider_for_model(self.model_name) is None:
+            with span('llm', agent=type(self).__name__, model=self.model_name):
+                full_prompt = flatten_prompt(prompt, system)
+                return self._record_usage(full_prompt, self._prompt_main(full_prompt))
+        # Served by the pooled async client, so connections are reused across calls and sessions
+        return run_async(self.aprompt_model(prompt, system, use_cascade))
+
+    async def aprompt_model(self, prompt, system=None, use_cascade=True):
+        if provider_for_model(self.model_name) is None:
+            with span('llm', agent=type(self).__name__, model=self.model_name):
+                full_prompt = flatten_prompt(prompt, system)
+                response = await asyncio.to_thread(self._prompt_main, full_prompt)
+                return self._record_usage(full_prompt, response)
+
+        # Cheapest model first; an output failing validate_output escalates to the next model
+        agent = type(self).__name__
+        models = self.model_cascade(use_cascade)
+        for tier, model_name in enumerate(models):
+            with span('llm', agent=agent, model=model_name, tier=tier):
+                started_at = time.monotonic()
+                response = await acomplete(model_name, self.api_key, prompt, system=system)
+                llm_response = self._record_usage(flatten_prompt(prompt, system), response)
+                valid = self.validate_output(llm_response)
+                model_router.record_call(agent, model_name, time.monotonic() - started_at, valid)
+                set_attributes(valid=valid)
+            if valid or tier == len(models) - 1:
+                return llm_response
+            model_router.record_escalation(agent, model_name, models[tier + 1])
+            set_attributes(escalated=True)
+
+    def _prompt_main(self, prompt):
+        # The pooled Prompt handle is shared by concurrent sessions and is not safe to call concurrently
+        with model_pool.lock_for(self.prompter):
+            return self.prompter.prompt_main(prompt)
+
+    def model_cascade(self, use_cascade=True):
+        """Models to try in order: the provider's fast model first when the agent enables the cascade."""
+        if not self.cascade_enabled or not use_cascade:
+            return [self.model_name]
+        return model_router.cascade_for(self.model_name)
+
+    def validate_output(self, llm_response):
+        """Whether an output is usable; agents with a cascade override it with their output schema."""
+        return True
+
+    def _record_usage(self, prompt, response):
+        llm_response = response['llm_response']
+        usage = response.get('usage') or {}
+        set_attributes(
+            prompt_tokens=usage.get('input') or count_tokens(prompt),
+            completion_tokens=usage.get('output') or count_tokens(llm_response),
+        )
+        if 'cached' in usage:
+            set_attributes(cached_tokens=usage['cached'])
+        return llm_response
+
+    def mandate_version(self):
+        return hashlib.sha256(self.get_mandate().encode("utf-8")).hexdigest()[:16]
+
+    def response_cache(self):
+        return get_response_cache(
+            f"agent_responses:{type(self).__name__}", self.response_cache_ttl, self.response_cache_max_entries
+        )
+
+    def complete(self, prompt, cache_input=None, system=None, use_cache=True, use_cascade=True):
+        """
+        Returns the model's completion for `prompt`. With the response cache enabled (and `use_cache`), the answer
+        is keyed by (model, mandate version, normalized `cache_input`, or the prompt itself) and a hit skips the
+        model call. `system` holds the stable prompt segments and `use_cascade` is passed on, as in prompt_model.
+        """
+        return self.complete_with_source(prompt, cache_input, system, use_cache, use_cascade)[0]
+
+    def complete_with_source(self, prompt, cache_input=None, system=None, use_cache=True, use_cascade=True):
+        """Like complete, but returns (response, cached) so callers can tell cache hits apart."""
+        cache, cache_key, cached = self._cached_response(flatten_prompt(prompt, system), cache_input, use_cache)
+        if cached is not None:
+            return cached, True
+
+        response = self.prompt_model(prompt, system, use_cascade).strip()
+        if response and cache is not None:
+            cache.set(cache_key, response)
+        return response, False
+
+    async def acomplete(self, prompt, cache_input=None, system=None, use_cache=True, use_cascade=True):
+        """Awaitable complete; several calls (of one or many agents) can be gathered concurrently."""
+        return (await self.acomplete_with_source(prompt, cache_input, system, use_cache, use_cascade))[0]
+
+    async def acomplete_with_source(self, prompt, cache_input=None, system=None, use_cache=True, use_cascade=True):
+        cache, cache_key, cached = self._cached_response(flatten_prompt(prompt, system), cache_input, use_cache)
+        if cached is not None:
+            return cached, True
+
+        response = (await self.aprompt_model(prompt, system, use_cascade)).strip()
+        if response and cache is not None:
+            cache.set(cache_key, response)
+        return response, False
+
+    def _cached_response(self, prompt, cache_input, use_cache=True):
+        """Returns (cache, cache key, cached response or None); the cache is None when it is not used."""
+        if not self.response_cache_enabled or not use_cache:
+            return None, None, None
+
+        with span('response_cache', agent=type(self).__name__):
+            cache = self.response_cache()
+            cache_key = content_key(self.model_name, self.mandate_version(), normalize_prompt(cache_input or prompt))
+            cached = cache.get(cache_key)
+            set_attributes(cache='hit' if cached is not None else 'miss')
+        return cache, cache_key, cached
+
+    def stream_main(self, prompt, system=None):
+        # The generator runs whenever the consumer pulls, so its span is detached rather than made current
+        full_prompt = flatten_prompt(prompt, system)
+        stream_span = start_span('llm.stream', agent=type(self).__name__, model=self.model_name,
+                                 prompt_tokens=count_tokens(full_prompt))
+        chunks = 0
+        usage = {}
+        try:
+            if provider_for_model(self.model_name) is None:
+                chunks = 1
+                yield self._prompt_main(full_prompt)['llm_response']
+                return
+            for chunk in stream_completion(self.model_name, self.api_key, prompt, system=system, usage=usage):
+                if chunks == 0 and stream_span is not None:
+                    stream_span.set_attributes(first_token_ms=round((time.time() - stream_span.start) * 1000, 3))
+                chunks += 1
+                yield chunk
+        finally:
+            if stream_span is not None:
+                stream_span.set_attributes(completion_chunks=chunks)
+                if usage:
+                    stream_span.set_attributes(prompt_tokens=usage['input'], cached_tokens=usage['cached'])
+                stream_span.end()
 
     def get_mandate(self):
         raise NotImplementedError("Subclasses must implement get_mandate method.")
@@ -0,0 +1,53 @@
+'''
+🏭 AgentFactory Class - Lazy Agent Creation for Interactive Financial Advisory App
+---------------------------------------------------------------------------------
+Technical Overview:
+AgentFactory implements the Factory Method pattern for the agents in the pipeline. Instead of building
+every agent up front on each Streamlit rerun, the factory only records which model each agent role uses
+and builds the agent the first time that role is requested. Combined with the shared ModelPool, this
+means a turn that never needs AgentTwo never constructs it, and agents that are constructed reuse model
+handles that were already loaded by earlier turns or other sessions.
+
+In Simple Terms:
+AgentFactory is like a staffing desk. It knows which agents exist and which model each one should use,
+but it only calls an agent in when there is actual work for it.
+
+Attributes:
+- selected_models: Mapping of agent role (e.g. 'agent_zero') to model name.
+- api_key_resolver: Callable returning the API key for a given model name.
+
+Methods:
+- get: Returns the agent for a role, creating it on first use.
+- is_created: Tells whether the agent for a role has been created yet.
+'''
+
+import threading
+
+from .agent_zero import AgentZero
+from .agent_one import AgentOne
+from .agent_two import AgentTwo
+
+AGENT_CLASSES = {
+    'agent_zero': AgentZero,
+    'agent_one': AgentOne,
+    'agent_two': AgentTwo,
+}
+
+class AgentFactory:
+    def __init__(self, selected_models, api_key_resolver):
+        self.selected_models = selected_models
+        self.api_key_resolver = api_key_resolver
+        self._agents = {}
+        self._lock = threading.Lock()
+
+    def get(self, role):
+        # Locked so that concurrent conversations sharing a factory build each agent once
+        with self._lock:
+            if role not in self._agents:
+                model_name = self.selected_models[role]
+                api_key = self.api_key_resolver(model_name)
+                self._agents[role] = AGENT_CLASSES[role](model_name, api_key)
+            return self._agents[role]
+
+    def is_created(self, role):
+        return role in self._agents
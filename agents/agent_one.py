@@ -16,28 +16,90 @@ categorize the user's input. It combines a set of evaluation rules with the user
 rules to get a structured response from the model. This makes it easier for the app to handle different 
 types of requests and respond accurately.
 
+Before calling the LLM, AgentOne asks a local IntentClassifier for a label. Confident local predictions 
+are returned immediately in the same structured format the LLM would produce; anything below the 
+confidence threshold goes to the LLM as before. Every decision is logged so the classifier can be 
+retrained on the LLM's answers.
+
 Attributes:
 - Inherits all attributes from AgentBase, including model_name, api_key, and prompter.
+- confidence_threshold: Minimum calibrated local classifier confidence to skip the LLM call (the classifier
+  also withholds its label on inputs with unknown words or without a clear winner).
+- use_local_classifier: Set to False to always use the LLM.
+- response_cache_enabled: Agent One's classification under a fixed mandate is deterministic, so LLM answers
+  are cached per normalized user input (see AgentBase.complete).
+- cascade_enabled: Classification is a short, checkable answer, so the provider's fast model answers first
+  and the selected model only when the answer is malformed (see AgentBase.aprompt_model).
 
 Methods:
 - get_mandate: Retrieves the agent’s evaluation criteria from a text file, outlining how user input should 
   be interpreted.
+- validate_output: Accepts only the {'investment_advice': ['N' | 'R' | 'Y']} format.
 - evaluate_input: Combines the mandate and user input, then prompts the model to generate an evaluation, 
-  which classifies and refines the input for further processing by other agents.
+  which classifies and refines the input for further processing by other agents. Confidently classified 
+  inputs are answered by the local classifier without an LLM call, and repeated inputs by the response cache.
+  use_response_cache and use_cascade turn the cache and the model cascade off for that call. Each
+  evaluation is traced with its label and source (local, cache or llm).
 '''
 
-from .agent_base import AgentBase
-import os
+from .agent_base import AgentBase, load_mandate
+from utils.intent_classifier import get_intent_classifier
+from utils.tracing import set_attributes, span
+import ast
+import re
+
+def format_evaluation(label):
+    return f"{{'investment_advice': ['{label}']}}"
 
 class AgentOne(AgentBase):
+    # Local decisions at this threshold agree with the LLM on the held-out set (tests/test_intent_classifier.py)
+    confidence_threshold = 0.8
+    use_local_classifier = True
+    response_cache_enabled = True
+    cascade_enabled = True
+
     def get_mandate(self):
-        with open(os.path.join('prompts', 'agent_one_mandate.txt'), 'r') as f:
-            return f.read()
+        return load_mandate('agent_one_mandate.txt')
+
+    def validate_output(self, llm_response):
+        # The pipeline expects exactly {'investment_advice': ['N' | 'R' | 'Y']}
+        match = re.search(r"\{.*\}", llm_response, re.DOTALL)
+        try:
+            evaluation = ast.literal_eval(match.group(0)) if match else None
+        except (ValueError, SyntaxError):
+            return False
+        labels = evaluation.get('investment_advice') if isinstance(evaluation, dict) else None
+        return isinstance(labels, list) and len(labels) == 1 and labels[0] in ('N', 'R', 'Y')
 
-    def evaluate_input(self, user_input):
+    def evaluate_input(self, user_input, use_response_cache=True, use_cascade=True):
+        with span('agent_one.evaluate_input', model=self.model_name) as current:
+            evaluation = self._evaluate_input(user_input, use_response_cache, use_cascade)
+            if current is not None:
+                match = re.search(r"'([NRY])'", evaluation)
+                current.set_attributes(label=match.group(1) if match else None)
+            return evaluation
+
+    def _evaluate_input(self, user_input, use_response_cache, use_cascade):
+        classifier = get_intent_classifier() if self.use_local_classifier else None
+        if classifier is not None:
+            label, confidence = classifier.predict(user_input)
+            if label is not None and confidence >= self.confidence_threshold:
+                classifier.log_decision(user_input, label, 'local', confidence)
+                set_attributes(source='local', confidence=round(confidence, 4))
+                return format_evaluation(label)
+
+        # The mandate is the stable system prefix, the user input the only volatile part
         evaluation_mandate = self.get_mandate()
-        evaluation_input = f"{evaluation_mandate}\n\nUser input: {user_input}"
-        response = self.prompter.prompt_main(evaluation_input)
-        llm_response = response['llm_response'].strip()
+        evaluation_input = f"User input: {user_input}"
+        llm_response, cached = self.complete_with_source(
+            evaluation_input, cache_input=user_input, system=evaluation_mandate,
+            use_cache=use_response_cache, use_cascade=use_cascade,
+        )
+        set_attributes(source='cache' if cached else 'llm')
+
+        if classifier is not None:
+            match = re.search(r"'([NRY])'", llm_response)
+            source = 'cache' if cached else 'llm'
+            classifier.log_decision(user_input, match.group(1) if match else None, source)
         return llm_response
 
@@ -18,40 +18,67 @@ profile, making it a key part of personalizing the advice given.
 
 Attributes:
 - Inherits all attributes from AgentBase, including model_name, api_key, and prompter.
+- context_budget: Token budget for the conversation transcript; older turns are folded into a rolling 
+  summary by the ContextBuilder.
+- cascade_enabled: The provider's fast model writes the report first; the selected model is only called when
+  the report is not valid JSON with the profile's fields (see AgentBase.aprompt_model).
 
 Methods:
 - get_mandate: Retrieves the agent’s risk profiling criteria from a text file, outlining how to interpret 
   conversation history.
+- validate_output: Accepts a JSON object carrying at least one of the risk profile's fields.
 - generate_risk_profile: Combines the mandate with the user’s conversation history, creating a prompt 
   to generate a detailed risk profile report, which informs the app about the user’s risk tolerance.
+- update_risk_profile: Incremental variant that only sends the previous JSON profile, the messages exchanged
+  since it was produced and the session's cached rolling summary of the earlier conversation, so the prompt
+  size does not grow with the length of the conversation and earlier turns are only summarized once.
+  Both take use_cascade=False to call the selected model only.
 '''
 
-from .agent_base import AgentBase
-import os
+from .agent_base import AgentBase, load_mandate
+from utils.context_builder import ContextBuilder, CONTEXT_BUDGETS
+from utils.risk_profile_utils import RiskProfile
 
 class AgentTwo(AgentBase):
+    context_budget = CONTEXT_BUDGETS['agent_two']
+    cascade_enabled = True
+
+    def validate_output(self, llm_response):
+        # A usable report is a JSON object with at least one of the profile's fields
+        profile = RiskProfile.from_json(llm_response)
+        return profile is not None and any(getattr(profile, field) is not None for field in RiskProfile.FIELDS)
+
     def get_mandate(self):
-        with open(os.path.join('prompts', 'agent_two_mandate.txt'), 'r') as f:
-            return f.read()
+        return load_mandate('agent_two_mandate.txt')
 
-    def generate_risk_profile(self, conversation_history):
-        agent_two_mandate = self.get_mandate()
+    def format_conversation(self, messages, context_state=None, verbatim_from=0):
+        # Prepare the conversation history as text, within the agent's token budget
+        context_state = context_state if context_state is not None else {}
+        return ContextBuilder(self.context_budget).build(messages, context_state, verbatim_from)
 
-        # Prepare the conversation history as text
-        conversation_text = ""
-        for message in conversation_history:
-            role = message['role']
-            content = message['content']
-            if role == "user":
-                conversation_text += f"User: {content}\n"
-            elif role == "assistant":
-                conversation_text += f"Assistant: {content}\n"
+    def generate_risk_profile(self, conversation_history, context_state=None, use_cascade=True):
+        agent_two_mandate = self.get_mandate()
+        conversation_text = self.format_conversation(conversation_history, context_state)
 
-        # Prepare the input for Agent Two
-        risk_profile_input = f"{agent_two_mandate}\n\nConversation:\n{conversation_text}\n\nGenerate the risk profile report."
+        # Prepare the input for Agent Two; the mandate is sent as the stable system prefix
+        risk_profile_input = f"Conversation:\n{conversation_text}\n\nGenerate the risk profile report."
 
         # Get the response from Agent Two
-        response = self.prompter.prompt_main(risk_profile_input)
-        risk_profile_report = response['llm_response'].strip()
+        risk_profile_report = self.prompt_model(risk_profile_input, system=agent_two_mandate, use_cascade=use_cascade).strip()
         return risk_profile_report
 
+    def update_risk_profile(self, previous_profile_json, conversation_history, since, context_state=None,
+                            use_cascade=True):
+        agent_two_mandate = self.get_mandate()
+        # Messages before `since` are already in the report; they only appear in the cached rolling summary
+        conversation_text = self.format_conversation(conversation_history, context_state, verbatim_from=since)
+
+        # Only the previous profile, the summary and the new part of the conversation are sent
+        risk_profile_input = (
+            f"Current risk profile report:\n{previous_profile_json}\n\n"
+            f"Conversation (the recent part, since this report was generated, is verbatim):\n{conversation_text}\n\n"
+            "Update the risk profile report with any new information from this conversation and return the complete report."
+        )
+
+        risk_profile_report = self.prompt_model(risk_profile_input, system=agent_two_mandate, use_cascade=use_cascade).strip()
+        return risk_profile_report
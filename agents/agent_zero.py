@@ -21,34 +21,44 @@ Attributes:
 - Inherits all attributes from AgentBase, including model_name, api_key, and prompter.
 
 Methods:
-- get_mandate: Retrieves the agent’s mandate from a text file, defining rules for user interactions.
+- get_mandate: Retrieves the agent’s mandate from a text file (kept in memory), defining rules for user
+  interactions.
+- build_conversation_input: Returns the system segments, ordered from the most stable (mandate, research
+  summary, risk profile), and the client's input as the user message, so the provider can cache the prefix.
 - generate_response: Prepares and sends a conversation prompt to the model, incorporating the mandate, 
   user input, and optional data (e.g., report summaries) to produce a well-rounded, personalized response.
+- stream_response: Same prompt as generate_response, but yields the response token by token so the UI can 
+  render it while it is being generated.
 '''
 
-from .agent_base import AgentBase
-import os
+from .agent_base import AgentBase, load_mandate
 
 class AgentZero(AgentBase):
     def get_mandate(self):
-        with open(os.path.join('prompts', 'agent_zero_mandate.txt'), 'r') as f:
-            return f.read()
+        return load_mandate('agent_zero_mandate.txt')
 
-    def generate_response(self, user_input, report_summary=None, risk_profile_report=None):
-        agent_zero_mandate = self.get_mandate()
+    def build_conversation_input(self, user_input, report_summary=None, risk_profile_report=None):
+        # Stable segments first (mandate, then the research summary shared by every client until the next
+        # snapshot, then the client's risk profile), so consecutive calls share the longest cached prefix
+        system = [self.get_mandate()]
 
         # Include report summary and risk profile report if available
         if report_summary is not None:
-            agent_zero_mandate += f"\nYou have access to the following research report summary:\n{report_summary}\nUse this information to assist the client."
+            system.append(f"You have access to the following research report summary:\n{report_summary}\nUse this information to assist the client.")
 
         if risk_profile_report is not None:
-            agent_zero_mandate += f"\nYou have access to the following risk profile report:\n{risk_profile_report}\nUse this information to assist the client."
+            system.append(f"You have access to the following risk profile report:\n{risk_profile_report}\nUse this information to assist the client.")
+
+        # The client's input is the only volatile part
+        return system, f"Client: {user_input}\n\nAgent Zero:"
 
-        # Prepare conversation input
-        conversation_input = f"{agent_zero_mandate}\nClient: {user_input}\n\nAgent Zero:"
+    def generate_response(self, user_input, report_summary=None, risk_profile_report=None):
+        system, conversation_input = self.build_conversation_input(user_input, report_summary, risk_profile_report)
 
         # Get the response from the model
-        response = self.prompter.prompt_main(conversation_input)
-        llm_response = response['llm_response'].strip()
+        llm_response = self.prompt_model(conversation_input, system=system).strip()
         return llm_response
 
+    def stream_response(self, user_input, report_summary=None, risk_profile_report=None):
+        system, conversation_input = self.build_conversation_input(user_input, report_summary, risk_profile_report)
+        yield from self.stream_main(conversation_input, system=system)
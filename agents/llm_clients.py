@@ -0,0 +1,217 @@
+'''
+🔌 LLM Clients - Direct Provider Access for Streaming Generation
+----------------------------------------------------------------
+Technical Overview:
+LLMWare's Prompt.prompt_main returns a completion only once it is fully generated. For the client-facing
+agent that means the user stares at an empty chat bubble for the whole generation time. This module
+talks to the OpenAI and Anthropic SDKs directly to stream completions token by token. SDK clients are
+created once per (provider, API key fingerprint) and reused through a ModelPool, so connection setup is
+not repeated on every call. Models that are not served by one of these providers are reported as
+unsupported, and callers fall back to the regular LLMWare path.
+
+For non-streaming generation, `acomplete` is an asyncio-native interface on the providers' async SDK
+clients. Each provider gets one persistent httpx.AsyncClient (keep-alive, HTTP/2 when the `h2` package is
+installed), shared by the SDK clients of every API key and owned by the process-wide event loop of
+utils/async_runner.py, so TLS and connection setup are paid once per process. At most
+MAX_CONCURRENT_REQUESTS calls per provider are in flight at once; further calls wait their turn.
+
+Prompts are sent as a system message made of stable segments (the agent's mandate first, then slower
+changing context such as a research summary) followed by the volatile user message, so consecutive calls
+share the longest possible identical prefix. OpenAI caches such prefixes automatically; for Anthropic each
+system segment carries a cache_control breakpoint. The cached part of the input is reported in the usage
+('cached') and counted per provider by prompt_cache_stats.
+
+In Simple Terms:
+This module lets an agent show its answer while it is still being written, instead of waiting for the
+whole answer before showing anything. It also sends the unchanging part of every question first, so the
+provider can recognize it from the previous call and does not have to read it again.
+
+Methods:
+- provider_for_model: Returns 'openai', 'anthropic' or None for a model name.
+- get_client: Returns the shared SDK client for a provider and API key.
+- flatten_prompt: Joins system segments and prompt into one string, for models without chat messages.
+- stream_completion: Yields text chunks for a single-turn prompt, filling `usage` once the stream ends.
+- acomplete: Awaitable completion for a single-turn prompt, shaped like LLMWare's prompt_main result.
+- prompt_cache_stats: Returns per-provider input and cached token totals.
+'''
+
+import asyncio
+import importlib.util
+import threading
+
+from utils.model_pool import ModelPool
+
+DEFAULT_MAX_TOKENS = 1024
+MAX_CONCURRENT_REQUESTS = 16
+KEEPALIVE_EXPIRY = 120
+# Anthropic accepts at most four cache_control breakpoints per request
+MAX_CACHE_BREAKPOINTS = 4
+
+def provider_for_model(model_name):
+    if model_name.startswith(('gpt-', 'o1', 'o3', 'o4')):
+        return 'openai'
+    if model_name.startswith('claude'):
+        return 'anthropic'
+    return None
+
+def _create_client(provider, api_key):
+    if provider == 'openai':
+        from openai import OpenAI
+        return OpenAI(api_key=api_key)
+    if provider == 'anthropic':
+        from anthropic import Anthropic
+        return Anthropic(api_key=api_key)
+    raise ValueError(f"Unsupported provider: {provider}")
+
+# SDK clients hold connection pools, so they are shared like model handles
+_client_pool = ModelPool(max_size=16, loader=_create_client)
+
+def get_client(provider, api_key):
+    return _client_pool.acquire(provider, api_key)
+
+def _system_segments(system):
+    if not system:
+        return []
+    return [system] if isinstance(system, str) else [segment for segment in system if segment]
+
+def flatten_prompt(prompt, system=None):
+    """Returns `system` (a string or list of segments) and `prompt` as the single string of a one-part prompt."""
+    return "\n".join(_system_segments(system) + [prompt])
+
+def _build_request(provider, prompt, system):
+    segments = _system_segments(system)
+    if provider == 'openai':
+        # OpenAI reuses the cached prefix automatically, as long as it is byte-identical to the previous call's
+        messages = [{"role": "system", "content": "\n".join(segments)}] if segments else []
+        return {"messages": messages + [{"role": "user", "content": prompt}]}
+
+    request = {"messages": [{"role": "user", "content": prompt}]}
+    if segments:
+        # A breakpoint after each stable segment: a changed later segment still reuses the earlier ones
+        request["system"] = [{"type": "text", "text": segment} for segment in segments]
+        for block in request["system"][-MAX_CACHE_BREAKPOINTS:]:
+            block["cache_control"] = {"type": "ephemeral"}
+    return request
+
+def _parse_usage(provider, usage):
+    if usage is None:
+        return {}
+    if provider == 'openai':
+        details = getattr(usage, 'prompt_tokens_details', None)
+        parsed = {
+            'input': usage.prompt_tokens,
+            'output': usage.completion_tokens,
+            'cached': getattr(details, 'cached_tokens', None) or 0,
+        }
+    else:
+        # Anthropic counts cache reads and writes separately from the uncached input tokens
+        cached = getattr(usage, 'cache_read_input_tokens', None) or 0
+        written = getattr(usage, 'cache_creation_input_tokens', None) or 0
+        parsed = {'input': usage.input_tokens + cached + written, 'output': usage.output_tokens, 'cached': cached}
+    _record_prompt_cache(provider, parsed)
+    return parsed
+
+_prompt_cache_stats = {}
+_prompt_cache_lock = threading.Lock()
+
+def _record_prompt_cache(provider, usage):
+    with _prompt_cache_lock:
+        stats = _prompt_cache_stats.setdefault(provider, {'requests': 0, 'input_tokens': 0, 'cached_tokens': 0})
+        stats['requests'] += 1
+        stats['input_tokens'] += usage['input']
+        stats['cached_tokens'] += usage['cached']
+
+def prompt_cache_stats():
+    """Returns {provider: {'requests', 'input_tokens', 'cached_tokens', 'cached_rate'}} for this process."""
+    with _prompt_cache_lock:
+        return {
+            provider: dict(stats, cached_rate=stats['cached_tokens'] / stats['input_tokens'] if stats['input_tokens'] else 0.0)
+            for provider, stats in _prompt_cache_stats.items()
+        }
+
+def stream_completion(model_name, api_key, prompt, system=None, usage=None, max_tokens=DEFAULT_MAX_TOKENS,
+                      temperature=None):
+    """
+    Yields the completion for `prompt` as text chunks, as soon as the provider sends them. `system` is a string
+    or a list of stable segments sent before the prompt; `usage`, when given, is filled with the token counts
+    once the stream is exhausted.
+    """
+    provider = provider_for_model(model_name)
+    client = get_client(provider, api_key)
+    request = _build_request(provider, prompt, system)
+    options = {} if temperature is None else {"temperature": temperature}
+
+    if provider == 'openai':
+        stream = client.chat.completions.create(
+            model=model_name, max_tokens=max_tokens, stream=True, stream_options={"include_usage": True},
+            **request, **options
+        )
+        # Closing the stream releases the HTTP connection when the consumer stops early (e.g. a cancelled reply)
+        with stream:
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+                if chunk.usage is not None and usage is not None:
+                    usage.update(_parse_usage(provider, chunk.usage))
+    else:
+        with client.messages.stream(model=model_name, max_tokens=max_tokens, **request, **options) as stream:
+            for text in stream.text_stream:
+                yield text
+            if usage is not None:
+                usage.update(_parse_usage(provider, stream.get_final_message().usage))
+
+def _create_http_client():
+    import httpx
+    return httpx.AsyncClient(
+        http2=importlib.util.find_spec('h2') is not None,
+        limits=httpx.Limits(
+            max_connections=MAX_CONCURRENT_REQUESTS,
+            max_keepalive_connections=MAX_CONCURRENT_REQUESTS,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        ),
+    )
+
+# Only touched from the event loop thread of utils/async_runner.py
+_http_clients = {}
+_semaphores = {}
+
+def _create_async_client(provider, api_key):
+    if provider not in _http_clients:
+        _http_clients[provider] = _create_http_client()
+    if provider == 'openai':
+        from openai import AsyncOpenAI
+        return AsyncOpenAI(api_key=api_key, http_client=_http_clients[provider])
+    if provider == 'anthropic':
+        from anthropic import AsyncAnthropic
+        return AsyncAnthropic(api_key=api_key, http_client=_http_clients[provider])
+    raise ValueError(f"Unsupported provider: {provider}")
+
+_async_client_pool = ModelPool(max_size=16, loader=_create_async_client)
+
+async def acomplete(model_name, api_key, prompt, system=None, max_tokens=DEFAULT_MAX_TOKENS, temperature=None):
+    """
+    Returns {'llm_response': text, 'usage': {'input', 'output', 'cached' tokens}} for `prompt`, preceded by the
+    stable `system` segments. Must run on the event loop of utils/async_runner.py (await it there, or call
+    run_async from synchronous code).
+    """
+    provider = provider_for_model(model_name)
+    client = _async_client_pool.acquire(provider, api_key)
+    if provider not in _semaphores:
+        _semaphores[provider] = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    semaphore = _semaphores[provider]
+    request = _build_request(provider, prompt, system)
+    options = {} if temperature is None else {"temperature": temperature}
+
+    async with semaphore:
+        if provider == 'openai':
+            response = await client.chat.completions.create(
+                model=model_name, max_tokens=max_tokens, **request, **options
+            )
+            return {
+                'llm_response': response.choices[0].message.content or "",
+                'usage': _parse_usage(provider, response.usage),
+            }
+
+        response = await client.messages.create(model=model_name, max_tokens=max_tokens, **request, **options)
+        text = "".join(block.text for block in response.content if getattr(block, 'type', None) == 'text')
+        return {'llm_response': text, 'usage': _parse_usage(provider, response.usage)}
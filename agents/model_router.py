@@ -0,0 +1,104 @@
+'''
+🪜 ModelRouter Class - Latency-Aware Model Cascades for the Agents
+-----------------------------------------------------------------
+Technical Overview:
+Some agents produce short, machine-checkable outputs: Agent One answers with a one-label dictionary and
+Agent Two with a JSON report. For those, the selected (often large) model is overkill on most calls. An
+agent that enables its cascade (AgentBase.cascade_enabled) is served by a cascade of models of the
+selected model's provider: the provider's fast, cheap model (FAST_MODELS) first, then the selected model.
+Each output is checked with the agent's validator (AgentBase.validate_output); only an output that fails
+validation escalates the call to the next model. Models without a fast sibling, or already the fast
+model, are used alone.
+
+The router records, per model, the number of calls, the share of invalid outputs and the latency
+distribution (mean and p50/p95 over the most recent calls), and per agent how many calls were escalated,
+so the cost of the cascade can be compared with always using the large model.
+
+In Simple Terms:
+The ModelRouter sends easy questions to the junior analyst first, and only when the junior's answer is
+not in the right format does it bother the senior analyst.
+
+Attributes:
+- fast_models: Mapping of provider to its fast model.
+- window: Number of recent latencies kept per model for the percentiles.
+
+Methods:
+- cascade_for: Returns the models to try, in order, for a selected model.
+- record_call: Records one model call (agent, model, latency, whether the output was valid).
+- record_escalation: Records that an agent's call escalated to the next model.
+- stats: Returns per-model latency and validity stats and per-agent escalation rates.
+- model_router: Process-wide ModelRouter (Singleton pattern).
+- percentile: Nearest-rank percentile, shared with the latency benchmarks in _helpers/.
+'''
+
+import collections
+import math
+import threading
+
+from .llm_clients import provider_for_model
+
+FAST_MODELS = {
+    'openai': 'gpt-4o-mini',
+    'anthropic': 'claude-3-haiku-20240307',
+}
+
+
+def percentile(values, q):
+    # Nearest-rank percentile, None without values
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(math.ceil(q / 100 * len(ordered)) - 1, 0)]
+
+
+class ModelRouter:
+    def __init__(self, fast_models=None, window=200):
+        self.fast_models = fast_models if fast_models is not None else dict(FAST_MODELS)
+        self.window = window
+        self._lock = threading.Lock()
+        self._models = {}
+        self._agents = {}
+
+    def cascade_for(self, model_name):
+        fast_model = self.fast_models.get(provider_for_model(model_name))
+        if fast_model is None or fast_model == model_name:
+            return [model_name]
+        return [fast_model, model_name]
+
+    def record_call(self, agent, model_name, latency, valid):
+        with self._lock:
+            model = self._models.setdefault(model_name, {
+                'calls': 0, 'invalid': 0, 'total_s': 0.0, 'latencies': collections.deque(maxlen=self.window),
+            })
+            model['calls'] += 1
+            model['invalid'] += int(not valid)
+            model['total_s'] += latency
+            model['latencies'].append(latency)
+            self._agents.setdefault(agent, {'calls': 0, 'escalations': 0})['calls'] += 1
+
+    def record_escalation(self, agent, from_model, to_model):
+        with self._lock:
+            self._agents.setdefault(agent, {'calls': 0, 'escalations': 0})['escalations'] += 1
+
+    def stats(self):
+        with self._lock:
+            models = {
+                name: {
+                    'calls': model['calls'],
+                    'invalid_rate': model['invalid'] / model['calls'],
+                    'mean_s': model['total_s'] / model['calls'],
+                    'p50_s': percentile(model['latencies'], 50),
+                    'p95_s': percentile(model['latencies'], 95),
+                }
+                for name, model in self._models.items()
+            }
+            agents = {}
+            for name, agent in self._agents.items():
+                # First-tier calls = all calls minus the escalated ones
+                requests = agent['calls'] - agent['escalations']
+                agents[name] = dict(agent, escalation_rate=agent['escalations'] / requests if requests else 0.0)
+        return {'models': models, 'agents': agents}
+
+
+# Process-wide router shared by every session (Singleton pattern)
+model_router = ModelRouter()
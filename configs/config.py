@@ -19,12 +19,26 @@ Attributes:
 
 Methods:
 - setup: Configures the active database and enables Milvus Lite, setting up storage systems to manage 
-  the app’s data requirements effectively.
+  the app’s data requirements effectively. The configuration is process-wide, so it runs once per process;
+  later calls (e.g. on every Streamlit rerun) return immediately. LLMWare entry points (model loading,
+  YFinance) call it themselves right before first use, so the app does not import LLMWare at start-up.
 '''
 
+import threading
+
+_configured = False
+_setup_lock = threading.Lock()
+
 class Config:
     def setup(self):
-        from llmware.configs import LLMWareConfig, MilvusConfig
-        # Configuration
-        LLMWareConfig().set_active_db("sqlite")
-        MilvusConfig().set_config("lite", True)  # Enable Milvus Lite
+        global _configured
+        if _configured:
+            return
+        with _setup_lock:
+            if _configured:
+                return
+            from llmware.configs import LLMWareConfig, MilvusConfig
+            # Configuration
+            LLMWareConfig().set_active_db("sqlite")
+            MilvusConfig().set_config("lite", True)  # Enable Milvus Lite
+            _configured = True
@@ -0,0 +1,158 @@
+'''
+⚡ **Vectorized Piotroski F-Score Engine** 📊
+
+Computes the Piotroski F-score for a whole universe of tickers in one pass, using pandas/NumPy column
+operations instead of scoring one dictionary per ticker.
+
+---
+
+### 📥 Input: long-format fundamentals
+One row per **ticker × period × line item**:
+
+| ticker | period     | line_item        | value   |
+|--------|------------|------------------|---------|
+| AAPL   | 2023-09-30 | Net Income       | 9.70e10 |
+| AAPL   | 2023-09-30 | Total Assets     | 3.53e11 |
+
+Line items use the yfinance statement labels (see `LINE_ITEMS`). Every period of a ticker that has a
+prior period is scored, so the output covers the full history available, not only the latest year.
+
+### 🧮 Semantics (identical to `calculate_f_score` in `piotroski_calc.py`)
+- A line item that is **absent** for a ticker/period counts as `0`; a line item that is present with a
+  missing value stays `NaN`, and every comparison involving `NaN` fails.
+- Ratios divide only when the denominator is non-zero and are `0` otherwise.
+- `netIssuanceOfStock = issuanceOfStock + repurchaseOfStock` for the current period.
+
+### 📤 Output
+`compute_f_scores` returns one row per (ticker, period) with the ratios, the nine boolean criteria and
+`f_score`. `latest_f_scores` keeps the most recent period per ticker. `wide_to_long` converts the
+`_t`/`_t1` columns of `companies.csv` (or of the dictionaries built by `piotroski_calc.py`) into the long
+format, which is how the engine is checked against today's scores.
+'''
+
+import numpy as np
+import pandas as pd
+
+# Engine field name -> yfinance statement label
+LINE_ITEMS = {
+    'netIncome': 'Net Income',
+    'totalAssets': 'Total Assets',
+    'currentAssets': 'Current Assets',
+    'currentLiabilities': 'Current Liabilities',
+    'operatingCashFlow': 'Operating Cash Flow',
+    'longTermDebt': 'Long Term Debt',
+    'grossProfit': 'Gross Profit',
+    'revenue': 'Total Revenue',
+    'issuanceOfStock': 'Issuance Of Capital Stock',
+    'repurchaseOfStock': 'Repurchase Of Capital Stock',
+}
+
+CRITERIA = [
+    'positive_net_income',
+    'positive_operating_cash_flow',
+    'increasing_roa',
+    'cash_flow_above_net_income',
+    'decreasing_long_term_debt',
+    'increasing_current_ratio',
+    'no_new_shares',
+    'increasing_gross_margin',
+    'increasing_asset_turnover',
+]
+
+def _safe_ratio(numerator, denominator):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator != 0, numerator / denominator, 0.0)
+
+def compute_f_scores(fundamentals):
+    """
+    Scores every (ticker, period) that has a prior period.
+
+    Args:
+        fundamentals (pd.DataFrame): Long frame with columns ticker, period, line_item, value.
+
+    Returns:
+        pd.DataFrame: Indexed by (ticker, period), with ratio columns (`*_t`, `*_t1`), the nine
+        criteria and `f_score`.
+    """
+    items = list(LINE_ITEMS.values())
+    fields = list(LINE_ITEMS)
+
+    # Integer codes for (ticker, period) rows and line-item columns
+    ticker_codes, tickers = pd.factorize(fundamentals['ticker'])
+    period_codes, periods = pd.factorize(fundamentals['period'], sort=True)
+    n_periods = max(len(periods), 1)
+    item_codes = pd.Categorical(fundamentals['line_item'], categories=items).codes
+    row_codes, row_keys = pd.factorize(ticker_codes.astype('int64') * n_periods + period_codes)
+
+    # Scatter values into a (rows x items) matrix; the first occurrence of a duplicate wins
+    keep = item_codes >= 0
+    keep &= ~pd.Series(row_codes.astype('int64') * len(items) + item_codes).duplicated().to_numpy()
+    values = np.full((len(row_keys), len(items)), np.nan)
+    present = np.zeros((len(row_keys), len(items)), dtype=bool)
+    values[row_codes[keep], item_codes[keep]] = fundamentals['value'].to_numpy(dtype='float64')[keep]
+    present[row_codes[keep], item_codes[keep]] = True
+
+    # Absent line items count as zero, present-but-missing values stay NaN
+    values = np.where(present, values, 0.0)
+
+    # Order rows by ticker, then period, so the prior period is the previous row
+    row_tickers, row_periods = row_keys // n_periods, row_keys % n_periods
+    order = np.lexsort((row_periods, row_tickers))
+    values, row_tickers, row_periods = values[order], row_tickers[order], row_periods[order]
+    column = {field: values[:, i] for i, field in enumerate(fields)}
+
+    column['roa'] = _safe_ratio(column['netIncome'], column['totalAssets'])
+    column['currentRatio'] = _safe_ratio(column['currentAssets'], column['currentLiabilities'])
+    column['grossMargin'] = _safe_ratio(column['grossProfit'], column['revenue'])
+    column['assetTurnover'] = _safe_ratio(column['revenue'], column['totalAssets'])
+
+    # Row i is scored against row i - 1 when both belong to the same ticker
+    has_prior = np.zeros(len(row_tickers), dtype=bool)
+    has_prior[1:] = row_tickers[1:] == row_tickers[:-1]
+    current = np.flatnonzero(has_prior)
+    previous = current - 1
+
+    result = {}
+    for field in ['netIncome', 'operatingCashFlow', 'longTermDebt', 'roa', 'currentRatio', 'grossMargin', 'assetTurnover']:
+        result[f'{field}_t'] = column[field][current]
+        result[f'{field}_t1'] = column[field][previous]
+    result['netIssuanceOfStock_t'] = column['issuanceOfStock'][current] + column['repurchaseOfStock'][current]
+
+    result['positive_net_income'] = result['netIncome_t'] > 0
+    result['positive_operating_cash_flow'] = result['operatingCashFlow_t'] > 0
+    result['increasing_roa'] = result['roa_t'] > result['roa_t1']
+    result['cash_flow_above_net_income'] = result['operatingCashFlow_t'] > result['netIncome_t']
+    result['decreasing_long_term_debt'] = result['longTermDebt_t'] < result['longTermDebt_t1']
+    result['increasing_current_ratio'] = result['currentRatio_t'] > result['currentRatio_t1']
+    result['no_new_shares'] = result['netIssuanceOfStock_t'] <= 0
+    result['increasing_gross_margin'] = result['grossMargin_t'] > result['grossMargin_t1']
+    result['increasing_asset_turnover'] = result['assetTurnover_t'] > result['assetTurnover_t1']
+    result['f_score'] = np.sum([result[criterion] for criterion in CRITERIA], axis=0, dtype='int64')
+
+    index = pd.MultiIndex.from_arrays(
+        [tickers[row_tickers[current]], periods[row_periods[current]]], names=['ticker', 'period']
+    )
+    return pd.DataFrame(result, index=index)
+
+def latest_f_scores(scores):
+    """Keeps the most recent scored period of each ticker."""
+    return scores.groupby(level='ticker', sort=False).tail(1).reset_index(level='period')
+
+def wide_to_long(frame, id_column='ticker'):
+    """
+    Converts `<field>_t` / `<field>_t1` columns (as in companies.csv) into the long format, with the
+    current year as period 1 and the prior year as period 0. Empty cells are kept as present NaN values.
+    """
+    records = []
+    for field, label in LINE_ITEMS.items():
+        for suffix, period in (('_t', 1), ('_t1', 0)):
+            column = f'{field}{suffix}'
+            if column not in frame.columns:
+                continue
+            records.append(pd.DataFrame({
+                'ticker': frame[id_column].to_numpy(),
+                'period': period,
+                'line_item': label,
+                'value': pd.to_numeric(frame[column], errors='coerce').to_numpy(),
+            }))
+    return pd.concat(records, ignore_index=True)
@@ -2,6 +2,17 @@ import yfinance as yf
 import pandas as pd
 import os
 
+import argparse
+import sys
+
+# The utils package lives in the repository root, next to this script's directory
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(script_dir))
+
+from fscore_engine import compute_f_scores, latest_f_scores, wide_to_long
+from fundamentals_fetcher import FundamentalsFetcher, PermanentFetchError
+from statement_store import StatementStore
+
 '''
 📊 **Piotroski F-Score Calculation Using Open Source APIs** 📈
 
@@ -42,11 +53,19 @@ This script uses **`yfinance`** to gather the required data:
 ---
 
 ### 🛠️ **Step-by-Step Process:**
-1️⃣ Fetch financial data for the last two years using **`yfinance`**.
+1️⃣ Fetch financial data for the last two years using **`yfinance`**, for many tickers in parallel, retrying
+   throttled requests with exponential backoff (see `fundamentals_fetcher.py`). Raw statements are kept in a
+   local store (see `statement_store.py`): each run probes the latest fiscal year end of every ticker and
+   refetches only the tickers that reported a new period or whose entry expired (`--full-refresh` refetches all).
+   Every Yahoo request goes through the host-wide rate limiter and circuit breaker shared with the app
+   (see `utils/rate_limiter.py`); while the circuit is open, stored statements are used instead.
 2️⃣ Compute key financial ratios (e.g., ROA, Current Ratio, Gross Margin, Asset Turnover).
 3️⃣ Evaluate each of the **9 Piotroski F-score criteria** based on the data.
-4️⃣ Aggregate the scores to calculate the final **Piotroski F-score**.
+4️⃣ Aggregate the scores to calculate the final **Piotroski F-score** (for all tickers at once, with the
+   vectorized engine in `fscore_engine.py`; `calculate_f_score` is kept as the scalar reference).
 5️⃣ Save the results, including raw data and scores, to a **CSV file** for easy analysis. 📂
+   A columnar copy (`companies.arrow`, with the descriptions in `companies_descriptions.arrow`) is written
+   next to it for the app to memory-map (see `utils/companies_dataset.py`).
 
 ---
 
@@ -64,106 +83,140 @@ The enriched CSV includes:
 🚀 Use this script to make data-driven decisions and enhance your financial analysis toolkit!
 '''
 
-# Read company list. These are the companies for which we want to calculate the f-score.
-script_dir = os.path.dirname(os.path.abspath(__file__))
+# Company list. These are the companies for which we want to calculate the f-score.
+from utils.companies_dataset import build_companies_dataset
+from utils.rate_limiter import RETRYABLE, CircuitOpenError, classify_error, get_upstream_limiter
+
+# Every Yahoo request shares the host-wide limiter of the app; only throttling and transient errors count
+# as upstream failures (an unknown ticker does not trip the circuit breaker)
+yahoo = get_upstream_limiter('yahoo_finance')
+
+def is_upstream_failure(error):
+    return classify_error(error) == RETRYABLE
 file_path = os.path.join(script_dir, 'equity_list.csv')
-current_csv = pd.read_csv(file_path)
 
-# Function to fetch data from yfinance
-def get_yfinance_data(ticker):
-    try:
-        stock = yf.Ticker(ticker)
-        print(f"Fetching data for '{ticker}'...")
+# Function to fetch the raw statements from yfinance. Raises PermanentFetchError when the ticker cannot be
+# scored; network and throttling errors propagate so the fetcher can retry them.
+def fetch_statements(ticker, stock=None):
+    stock = stock or yf.Ticker(ticker)
+    print(f"Fetching data for '{ticker}'...")
 
-        # Fetch data for the last two years
-        financials = stock.financials
-        balance_sheet = stock.balance_sheet
-        cashflow = stock.cashflow
+    # Fetch data for the last two years
+    financials = yahoo.call(lambda: stock.financials, is_failure=is_upstream_failure)
+    balance_sheet = yahoo.call(lambda: stock.balance_sheet, is_failure=is_upstream_failure)
+    cashflow = yahoo.call(lambda: stock.cashflow, is_failure=is_upstream_failure)
 
-        # Check if data is empty
-        if financials.empty or balance_sheet.empty or cashflow.empty:
-            print(f"No financial data found for ticker '{ticker}'. Please check if the ticker is correct.")
-            return {}
+    # Check if data is empty
+    if financials.empty or balance_sheet.empty or cashflow.empty:
+        raise PermanentFetchError(f"No financial data found for ticker '{ticker}'. Please check if the ticker is correct.")
 
-        dates_financials = financials.columns
-        dates_balance_sheet = balance_sheet.columns
-        dates_cashflow = cashflow.columns
+    # Ensure we have at least two years of data
+    if len(financials.columns) < 2 or len(balance_sheet.columns) < 2 or len(cashflow.columns) < 2:
+        raise PermanentFetchError(f"Not enough data for ticker '{ticker}'. At least two years of data are required.")
 
-        # Ensure we have at least two years of data
-        if len(dates_financials) < 2 or len(dates_balance_sheet) < 2 or len(dates_cashflow) < 2:
-            print(f"Not enough data for ticker '{ticker}'. At least two years of data are required.")
-            return {}
+    shares_outstanding = yahoo.call(lambda: stock.info, is_failure=is_upstream_failure).get('sharesOutstanding', 0)
+    return financials, balance_sheet, cashflow, shares_outstanding
 
-        date_t = dates_financials[0]  # most recent year
-        date_t1 = dates_financials[1]  # prior year
+# Function to fetch data from yfinance and extract the fundamentals
+def get_yfinance_data(ticker):
+    return extract_fundamentals(*fetch_statements(ticker))
+
+# Function to probe the latest fiscal year end of a ticker with a single `info` call (None if unknown)
+def probe_latest_period(stock):
+    last_fiscal_year_end = yahoo.call(lambda: stock.info, is_failure=is_upstream_failure).get('lastFiscalYearEnd')
+    if not last_fiscal_year_end:
+        return None
+    return pd.Timestamp(last_fiscal_year_end, unit='s')
+
+# Function to refetch the statements of a ticker only when the store is missing or behind. Returns the
+# refresh reason ('new', 'new period', 'lagging', 'expired', 'forced') or 'cached' when the store is current (or
+# Yahoo's circuit breaker is open and the store has the ticker).
+def refresh_ticker(ticker, store, force=False):
+    stock = yf.Ticker(ticker)
+    try:
+        # The probed period is stored with the statements, which may not include it yet
+        probed_period = probe_latest_period(stock)
+        reason = 'forced' if force else store.needs_refresh(ticker, probed_period)
+        if reason is None:
+            return 'cached'
+        store.save(ticker, *fetch_statements(ticker, stock), probed_period=probed_period)
+        return reason
+    except CircuitOpenError:
+        if store.load(ticker) is None:
+            raise
+        return 'cached'
+
+# Function to extract the fundamentals needed for the F-score from the raw statements
+def extract_fundamentals(financials, balance_sheet, cashflow, shares_outstanding):
+    dates_financials = financials.columns
+
+    date_t = dates_financials[0]  # most recent year
+    date_t1 = dates_financials[1]  # prior year
 
-        data = {}
+    data = {}
 
-        # Net Income
-        data['netIncome_t'] = financials.loc['Net Income', date_t] if 'Net Income' in financials.index else 0
-        data['netIncome_t1'] = financials.loc['Net Income', date_t1] if 'Net Income' in financials.index else 0
+    # Net Income
+    data['netIncome_t'] = financials.loc['Net Income', date_t] if 'Net Income' in financials.index else 0
+    data['netIncome_t1'] = financials.loc['Net Income', date_t1] if 'Net Income' in financials.index else 0
 
-        # Total Assets
-        data['totalAssets_t'] = balance_sheet.loc['Total Assets', date_t] if 'Total Assets' in balance_sheet.index else 0
-        data['totalAssets_t1'] = balance_sheet.loc['Total Assets', date_t1] if 'Total Assets' in balance_sheet.index else 0
+    # Total Assets
+    data['totalAssets_t'] = balance_sheet.loc['Total Assets', date_t] if 'Total Assets' in balance_sheet.index else 0
+    data['totalAssets_t1'] = balance_sheet.loc['Total Assets', date_t1] if 'Total Assets' in balance_sheet.index else 0
 
-        # Current Assets
-        data['currentAssets_t'] = balance_sheet.loc['Current Assets', date_t] if 'Current Assets' in balance_sheet.index else 0
-        data['currentAssets_t1'] = balance_sheet.loc['Current Assets', date_t1] if 'Current Assets' in balance_sheet.index else 0
+    # Current Assets
+    data['currentAssets_t'] = balance_sheet.loc['Current Assets', date_t] if 'Current Assets' in balance_sheet.index else 0
+    data['currentAssets_t1'] = balance_sheet.loc['Current Assets', date_t1] if 'Current Assets' in balance_sheet.index else 0
 
-        # Current Liabilities
-        data['currentLiabilities_t'] = balance_sheet.loc['Current Liabilities', date_t] if 'Current Liabilities' in balance_sheet.index else 0
-        data['currentLiabilities_t1'] = balance_sheet.loc['Current Liabilities', date_t1] if 'Current Liabilities' in balance_sheet.index else 0
+    # Current Liabilities
+    data['currentLiabilities_t'] = balance_sheet.loc['Current Liabilities', date_t] if 'Current Liabilities' in balance_sheet.index else 0
+    data['currentLiabilities_t1'] = balance_sheet.loc['Current Liabilities', date_t1] if 'Current Liabilities' in balance_sheet.index else 0
 
-        # Operating Cash Flow
-        data['operatingCashFlow_t'] = cashflow.loc['Operating Cash Flow', date_t] if 'Operating Cash Flow' in cashflow.index else 0
-        data['operatingCashFlow_t1'] = cashflow.loc['Operating Cash Flow', date_t1] if 'Operating Cash Flow' in cashflow.index else 0
+    # Operating Cash Flow
+    data['operatingCashFlow_t'] = cashflow.loc['Operating Cash Flow', date_t] if 'Operating Cash Flow' in cashflow.index else 0
+    data['operatingCashFlow_t1'] = cashflow.loc['Operating Cash Flow', date_t1] if 'Operating Cash Flow' in cashflow.index else 0
 
-        # Long Term Debt
-        data['longTermDebt_t'] = balance_sheet.loc['Long Term Debt', date_t] if 'Long Term Debt' in balance_sheet.index else 0
-        data['longTermDebt_t1'] = balance_sheet.loc['Long Term Debt', date_t1] if 'Long Term Debt' in balance_sheet.index else 0
+    # Long Term Debt
+    data['longTermDebt_t'] = balance_sheet.loc['Long Term Debt', date_t] if 'Long Term Debt' in balance_sheet.index else 0
+    data['longTermDebt_t1'] = balance_sheet.loc['Long Term Debt', date_t1] if 'Long Term Debt' in balance_sheet.index else 0
 
-        # Shares Outstanding (current only)
-        data['sharesOutstanding'] = stock.info.get('sharesOutstanding', 0)
+    # Shares Outstanding (current only)
+    data['sharesOutstanding'] = shares_outstanding
 
-        # Gross Profit
-        data['grossProfit_t'] = financials.loc['Gross Profit', date_t] if 'Gross Profit' in financials.index else 0
-        data['grossProfit_t1'] = financials.loc['Gross Profit', date_t1] if 'Gross Profit' in financials.index else 0
+    # Gross Profit
+    data['grossProfit_t'] = financials.loc['Gross Profit', date_t] if 'Gross Profit' in financials.index else 0
+    data['grossProfit_t1'] = financials.loc['Gross Profit', date_t1] if 'Gross Profit' in financials.index else 0
 
-        # Revenue
-        data['revenue_t'] = financials.loc['Total Revenue', date_t] if 'Total Revenue' in financials.index else 0
-        data['revenue_t1'] = financials.loc['Total Revenue', date_t1] if 'Total Revenue' in financials.index else 0
+    # Revenue
+    data['revenue_t'] = financials.loc['Total Revenue', date_t] if 'Total Revenue' in financials.index else 0
+    data['revenue_t1'] = financials.loc['Total Revenue', date_t1] if 'Total Revenue' in financials.index else 0
 
-        # Issuance and Repurchase of Stock
-        data['issuanceOfStock_t'] = cashflow.loc['Issuance Of Capital Stock', date_t] if 'Issuance Of Capital Stock' in cashflow.index else 0.0
-        data['repurchaseOfStock_t'] = cashflow.loc['Repurchase Of Capital Stock', date_t] if 'Repurchase Of Capital Stock' in cashflow.index else 0.0
+    # Issuance and Repurchase of Stock
+    data['issuanceOfStock_t'] = cashflow.loc['Issuance Of Capital Stock', date_t] if 'Issuance Of Capital Stock' in cashflow.index else 0.0
+    data['repurchaseOfStock_t'] = cashflow.loc['Repurchase Of Capital Stock', date_t] if 'Repurchase Of Capital Stock' in cashflow.index else 0.0
 
-        # Ensure values are floats
-        data['issuanceOfStock_t'] = float(data['issuanceOfStock_t'])
-        data['repurchaseOfStock_t'] = float(data['repurchaseOfStock_t'])
+    # Ensure values are floats
+    data['issuanceOfStock_t'] = float(data['issuanceOfStock_t'])
+    data['repurchaseOfStock_t'] = float(data['repurchaseOfStock_t'])
 
-        data['netIssuanceOfStock_t'] = data['issuanceOfStock_t'] + data['repurchaseOfStock_t']
+    data['netIssuanceOfStock_t'] = data['issuanceOfStock_t'] + data['repurchaseOfStock_t']
 
-        # Compute ratios
-        data['roa_t'] = data['netIncome_t'] / data['totalAssets_t'] if data['totalAssets_t'] != 0 else 0
-        data['roa_t1'] = data['netIncome_t1'] / data['totalAssets_t1'] if data['totalAssets_t1'] != 0 else 0
+    # Compute ratios
+    data['roa_t'] = data['netIncome_t'] / data['totalAssets_t'] if data['totalAssets_t'] != 0 else 0
+    data['roa_t1'] = data['netIncome_t1'] / data['totalAssets_t1'] if data['totalAssets_t1'] != 0 else 0
 
-        # Current Ratio
-        data['currentRatio_t'] = data['currentAssets_t'] / data['currentLiabilities_t'] if data['currentLiabilities_t'] != 0 else 0
-        data['currentRatio_t1'] = data['currentAssets_t1'] / data['currentLiabilities_t1'] if data['currentLiabilities_t1'] != 0 else 0
+    # Current Ratio
+    data['currentRatio_t'] = data['currentAssets_t'] / data['currentLiabilities_t'] if data['currentLiabilities_t'] != 0 else 0
+    data['currentRatio_t1'] = data['currentAssets_t1'] / data['currentLiabilities_t1'] if data['currentLiabilities_t1'] != 0 else 0
 
-        # Gross Margin
-        data['grossMargin_t'] = data['grossProfit_t'] / data['revenue_t'] if data['revenue_t'] != 0 else 0
-        data['grossMargin_t1'] = data['grossProfit_t1'] / data['revenue_t1'] if data['revenue_t1'] != 0 else 0
+    # Gross Margin
+    data['grossMargin_t'] = data['grossProfit_t'] / data['revenue_t'] if data['revenue_t'] != 0 else 0
+    data['grossMargin_t1'] = data['grossProfit_t1'] / data['revenue_t1'] if data['revenue_t1'] != 0 else 0
 
-        # Asset Turnover
-        data['assetTurnover_t'] = data['revenue_t'] / data['totalAssets_t'] if data['totalAssets_t'] != 0 else 0
-        data['assetTurnover_t1'] = data['revenue_t1'] / data['totalAssets_t1'] if data['totalAssets_t1'] != 0 else 0
+    # Asset Turnover
+    data['assetTurnover_t'] = data['revenue_t'] / data['totalAssets_t'] if data['totalAssets_t'] != 0 else 0
+    data['assetTurnover_t1'] = data['revenue_t1'] / data['totalAssets_t1'] if data['totalAssets_t1'] != 0 else 0
 
-        return data
-    except Exception as e:
-        print(f"An error occurred while fetching data for ticker '{ticker}': {e}")
-        return {}
+    return data
 
 # Function to compute the Piotroski F-score
 def calculate_f_score(data):
@@ -211,34 +264,71 @@ def calculate_f_score(data):
     # The maximum possible score is 9
     return score
 
-# Enrich the CSV with fundamental data
-enriched_data = []
-for index, row in current_csv.iterrows():
-    ticker = row['ticker']
-    yf_data = get_yfinance_data(ticker)
-    if not yf_data:
-        print(f"Skipping ticker '{ticker}' due to insufficient data.\n")
-        continue  # Skip if data is insufficient
-    f_score = calculate_f_score(yf_data)
-    # Optionally drop the original 'f_score' to avoid confusion
-    row = row.drop('f_score', errors='ignore')
-    enriched_row = {
-        **row,
-        **yf_data,
-        'f_score': f_score  # Changed 'calculated_f_score' to 'f_score'
-    }
-    enriched_data.append(enriched_row)
-    print(f"Calculated Piotroski F-score for '{ticker}': {f_score}\n")
-
-# Define the script directory
-script_dir = os.path.dirname(os.path.abspath(__file__))
-output_file = os.path.join(script_dir, 'companies.csv')
-
-# Create a new DataFrame and save it to CSV
-enriched_csv = pd.DataFrame(enriched_data)
-enriched_csv.to_csv(output_file, index=False)
-
-print(f"\nEnriched fundamentals data saved to '{output_file}'.")
-
-# Open the CSV file in Numbers on Mac (optional)
-os.system(f"open -a 'Numbers' {output_file}")
+def main():
+    parser = argparse.ArgumentParser(description="Calculate Piotroski F-scores for equity_list.csv")
+    parser.add_argument("--workers", type=int, default=8, help="Number of tickers fetched in parallel")
+    parser.add_argument("--max-retries", type=int, default=5, help="Retries per ticker on throttling/transient errors")
+    parser.add_argument("--base-delay", type=float, default=1.0, help="Initial backoff delay in seconds")
+    parser.add_argument("--max-age-days", type=int, default=90, help="Refetch stored statements older than this")
+    parser.add_argument("--full-refresh", action="store_true", help="Refetch every ticker, ignoring the statement store")
+    args = parser.parse_args()
+
+    current_csv = pd.read_csv(file_path)
+    store = StatementStore(max_age_days=args.max_age_days)
+
+    # Probe all tickers in parallel and refetch only those with a newer period or an expired entry
+    fetcher = FundamentalsFetcher(
+        lambda ticker: refresh_ticker(ticker, store, force=args.full_refresh),
+        max_workers=args.workers,
+        max_retries=args.max_retries,
+        base_delay=args.base_delay,
+    )
+    report = fetcher.run(current_csv['ticker'])
+    for ticker, (kind, message) in report.failures.items():
+        print(f"Skipping refresh of '{ticker}' ({kind} error): {message}")
+    refreshed = sum(1 for reason in report.results.values() if reason != 'cached')
+    print(f"\n{report.summary()}")
+    print(f"Refetched statements for {refreshed} of {len(report.results)} tickers, the rest are current in the store\n")
+
+    # Enrich the CSV with fundamental data, re-scored from the store
+    fundamentals = {}
+    enriched_data = []
+    for index, row in current_csv.iterrows():
+        ticker = row['ticker']
+        if ticker not in fundamentals:
+            statements = store.load(ticker)
+            fundamentals[ticker] = extract_fundamentals(*statements) if statements else None
+        yf_data = fundamentals[ticker]
+        if not yf_data:
+            continue  # Skip if data is insufficient
+        # Optionally drop the original 'f_score' to avoid confusion
+        row = row.drop('f_score', errors='ignore')
+        enriched_data.append({**row, **yf_data})
+
+    # Create a new DataFrame
+    enriched_csv = pd.DataFrame(enriched_data)
+
+    # Score every ticker in one vectorized pass (rows are keyed by position, tickers may repeat)
+    if not enriched_csv.empty:
+        enriched_csv['row_id'] = range(len(enriched_csv))
+        scores = latest_f_scores(compute_f_scores(wide_to_long(enriched_csv, id_column='row_id')))
+        enriched_csv['f_score'] = scores['f_score'].reindex(enriched_csv['row_id']).to_numpy()
+        enriched_csv = enriched_csv.drop(columns='row_id')
+        for ticker, f_score in zip(enriched_csv['ticker'], enriched_csv['f_score']):
+            print(f"Calculated Piotroski F-score for '{ticker}': {f_score}")
+
+    # Save it to CSV
+    output_file = os.path.join(script_dir, 'companies.csv')
+    enriched_csv.to_csv(output_file, index=False)
+
+    print(f"\nEnriched fundamentals data saved to '{output_file}'.")
+
+    # Write the columnar, memory-mappable copy the app screens from
+    arrow_file = build_companies_dataset(output_file)
+    print(f"Columnar companies dataset saved to '{arrow_file}'.")
+
+    # Open the CSV file in Numbers on Mac (optional)
+    os.system(f"open -a 'Numbers' {output_file}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+'''
+🗃️ **Incremental Raw-Statement Store** 💾
+
+Persists the raw yfinance `financials`, `balance_sheet` and `cashflow` statements per ticker in a local
+SQLite database, so an F-score refresh only refetches the tickers that actually reported.
+
+---
+
+### 🧱 Layout
+- `statement_values`: one row per **ticker × statement × period × line item** (the long format used by
+  `fscore_engine.py`). Missing cells are stored as `NULL`, so "present but missing" and "absent" line items
+  stay distinguishable when the frames are rebuilt.
+- `statement_meta`: one row per ticker with its **latest fiscal period** in the stored statements, the
+  **probed fiscal period** (`lastFiscalYearEnd` when it was fetched), the time it was fetched and the `info`
+  fields the score needs (`sharesOutstanding`).
+
+### 🔄 Refresh policy
+A refresh first **probes** each ticker with a single cheap `info` call and reads its latest fiscal year
+end (`lastFiscalYearEnd`). Statements are refetched only when:
+1. the ticker is not in the store yet,
+2. the probe reports a fiscal period newer than the one probed at the last fetch,
+3. the statements still lack the probed period (Yahoo announces a fiscal year end before its statements
+   include it) and were fetched more than `lag_retry_days` ago, or
+4. the stored entry is older than `max_age_days` (also used when the probe has no fiscal year end).
+
+Comparing the probe with the previous probe rather than with the statements' own latest period keeps a
+ticker whose statements lag behind its announced fiscal year from being refetched every night.
+
+Everything else is re-scored straight from the store.
+'''
+
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+STATEMENTS = ('financials', 'balance_sheet', 'cashflow')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS statement_values (
+    ticker TEXT NOT NULL,
+    statement TEXT NOT NULL,
+    period TEXT NOT NULL,
+    line_item TEXT NOT NULL,
+    value REAL
+);
+CREATE INDEX IF NOT EXISTS idx_statement_values_ticker ON statement_values (ticker);
+CREATE TABLE IF NOT EXISTS statement_meta (
+    ticker TEXT PRIMARY KEY,
+    latest_period TEXT,
+    fetched_at REAL,
+    shares_outstanding REAL,
+    probed_period TEXT
+);
+"""
+
+def _period_key(period):
+    return pd.Timestamp(period).strftime('%Y-%m-%d')
+
+
+class StatementStore:
+    def __init__(self, db_path=None, max_age_days=90, lag_retry_days=7):
+        self.db_path = db_path or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'statements.db')
+        self.max_age_days = max_age_days
+        self.lag_retry_days = lag_retry_days
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(statement_meta)")]
+            if 'probed_period' not in columns:
+                # Stores created before the probe was recorded
+                conn.execute("ALTER TABLE statement_meta ADD COLUMN probed_period TEXT")
+                conn.commit()
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=60)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def needs_refresh(self, ticker, probed_period=None):
+        """Returns the reason a ticker must be refetched, or None when the stored statements are current."""
+        with self._connect() as conn:
+            meta = conn.execute(
+                "SELECT latest_period, fetched_at, probed_period FROM statement_meta WHERE ticker = ?", (ticker,)
+            ).fetchone()
+        if meta is None:
+            return 'new'
+        latest_period, fetched_at, last_probed_period = meta
+        age_days = (time.time() - fetched_at) / (24 * 60 * 60)
+        if probed_period is not None and _period_key(probed_period) > (last_probed_period or latest_period):
+            return 'new period'
+        if last_probed_period is not None and latest_period < last_probed_period and age_days > self.lag_retry_days:
+            return 'lagging'
+        if age_days > self.max_age_days:
+            return 'expired'
+        return None
+
+    def save(self, ticker, financials, balance_sheet, cashflow, shares_outstanding, probed_period=None):
+        rows = []
+        for statement, frame in zip(STATEMENTS, (financials, balance_sheet, cashflow)):
+            for period in frame.columns:
+                period_key = _period_key(period)
+                for line_item, value in frame[period].items():
+                    rows.append((ticker, statement, period_key, line_item, None if pd.isna(value) else float(value)))
+        latest_period = _period_key(max(financials.columns))
+
+        with self._lock, self._connect() as conn:
+            with conn:
+                conn.execute("DELETE FROM statement_values WHERE ticker = ?", (ticker,))
+                conn.executemany(
+                    "INSERT INTO statement_values (ticker, statement, period, line_item, value) VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO statement_meta "
+                    "(ticker, latest_period, fetched_at, shares_outstanding, probed_period) VALUES (?, ?, ?, ?, ?)",
+                    (ticker, latest_period, time.time(), shares_outstanding,
+                     _period_key(probed_period) if probed_period is not None else None),
+                )
+
+    def load(self, ticker):
+        """
+        Rebuilds the statements of a ticker as yfinance-shaped frames (line items x periods, most recent
+        period first). Returns (financials, balance_sheet, cashflow, shares_outstanding) or None.
+        """
+        with self._connect() as conn:
+            meta = conn.execute(
+                "SELECT shares_outstanding FROM statement_meta WHERE ticker = ?", (ticker,)
+            ).fetchone()
+            if meta is None:
+                return None
+            values = pd.read_sql_query(
+                "SELECT statement, period, line_item, value FROM statement_values WHERE ticker = ?",
+                conn,
+                params=(ticker,),
+            )
+
+        frames = []
+        for statement in STATEMENTS:
+            rows = values[values['statement'] == statement].drop_duplicates(['period', 'line_item'])
+            frame = rows.pivot(index='line_item', columns='period', values='value')
+            frame.columns = pd.to_datetime(frame.columns)
+            frames.append(frame[sorted(frame.columns, reverse=True)])
+        return (*frames, meta[0])
+
+    def tickers(self):
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute("SELECT ticker FROM statement_meta")]
@@ -2,10 +2,28 @@
 This is the main entry point of the AVA application. It sets up the Streamlit app and orchestrates the interaction between the user and the various agents in the RAG pipeline. Specifically, it:
 
 - Initializes the Streamlit interface, including API key input and model selection for each agent.
-- Sets up configuration using the Singleton pattern from `configs.config`.
-- Instantiates the agents (`AgentZero`, `AgentOne`, `AgentTwo`) and utility managers (`ConversationManager`, `ResearchManager`, `RiskProfileManager`).
-- Manages conversation history and session state using `st.session_state`.
-- Processes user inputs and directs them through the appropriate agents using the Chain of Responsibility pattern.
+- Starts fast: LLMWare is configured (`configs.config`) once per process, right before its first use, and heavy
+  libraries (LLMWare, pandas, pyarrow, tiktoken, streamlit-lottie) are imported by the code paths that need them,
+  so the first render does not wait for them (measured by `_helpers/benchmark_cold_start.py`).
+- Creates the agents (`AgentZero`, `AgentOne`, `AgentTwo`) lazily through `AgentFactory`, on first use within a turn.
+  The factory is cached process-wide per model selection and API key fingerprint, so reruns and sessions with the
+  same settings share the agents.
+- Keeps the conversation's `SessionState` (`pipeline/session.py`) in `st.session_state`.
+- Hands each user input to the UI-independent `PipelineEngine` (`pipeline/engine.py`), which directs it through the
+  appropriate agents using the Chain of Responsibility pattern; this script only renders the engine's events
+  (`ui/pipeline_events.py`).
+- Serves investment-advice turns from the latest precomputed research snapshot (`utils/research_snapshots.py`),
+  generating the research live only when no fresh snapshot exists.
+- Lets agents that opt in (Agent One) answer repeated inputs from the shared response cache, with a sidebar
+  toggle to bypass it and its hit rate shown in the sidebar.
+- Routes Agent One and Agent Two through a model cascade (`agents/model_router.py`): the provider's fast model
+  answers first and the selected model only when the output fails validation, with a sidebar toggle and the
+  escalation rate and per-model latency shown in the sidebar.
+- Sends every agent prompt as stable system segments (mandate first, then slow-changing context) followed by the
+  volatile user input, so providers can serve the prefix from their prompt cache; the cached share of input
+  tokens is shown in the sidebar.
+- Optionally (sidebar toggle, off by default) starts Agent Zero's reply speculatively while Agent One classifies
+  the input, keeping it for 'N' turns and discarding it for 'R'/'Y' turns, and records the latency saved per turn.
 - Ensures seamless interaction between the user interface and the backend logic.
 
 **Updates:**
@@ -23,17 +41,20 @@ from ui.header import display_header
 from ui.how_it_works import display_how_it_works
 from ui.model_selection import model_selection
 from ui.api_keys import prompt_for_api_keys
-from ui.conversation import initialize_conversation, display_conversation, get_user_input
+from ui.conversation import initialize_conversation, display_conversation, get_user_input, get_pipeline_session
+from ui.pipeline_events import StreamlitEvents
 from ui.session_state import initialize_session_state
+from ui.trace_waterfall import display_trace_waterfall
 
 # Import other necessary modules
-from configs.config import Config
-from agents.agent_zero import AgentZero
-from agents.agent_one import AgentOne
-from agents.agent_two import AgentTwo
-from utils.conversation_utils import ConversationManager
-from utils.research_utils import ResearchManager
-from utils.risk_profile_utils import RiskProfileManager
+from agents.agent_factory import AgentFactory
+from utils.model_pool import model_pool
+from agents.model_router import model_router
+from agents.llm_clients import prompt_cache_stats
+from pipeline.engine import PipelineEngine
+from utils.research_snapshots import get_research_snapshots
+from utils.intent_classifier import get_intent_classifier
+from utils.research_utils import get_summary_cache
 
 # Initialize session state
 initialize_session_state()
@@ -48,12 +69,14 @@ display_how_it_works()
 gpt_models = [
     'gpt-3.5-turbo',
     'gpt-4',
-    'gpt-4o'
+    'gpt-4o',
+    'gpt-4o-mini'
 ]
 
 claude_models = [
     'claude-3-opus-20240229',
-    'claude-3-sonnet-20240229'
+    'claude-3-sonnet-20240229',
+    'claude-3-haiku-20240307'
 ]
 
 # Model selection
@@ -70,84 +93,108 @@ for model in selected_models.values():
 # Prompt for API keys
 prompt_for_api_keys(required_api_keys)
 
-# Configuration setup
-config = Config()
-config.setup()
-
-# Initialize agents with the appropriate API keys
-def get_api_key_for_model(model_name):
-    if model_name in gpt_models:
-        return st.session_state['api_keys']['openai']
-    elif model_name in claude_models:
-        return st.session_state['api_keys']['anthropic']
-    else:
-        return None
-
-agent_zero_api_key = get_api_key_for_model(selected_models['agent_zero'])
-agent_zero = AgentZero(selected_models['agent_zero'], agent_zero_api_key)
-
-agent_one_api_key = get_api_key_for_model(selected_models['agent_one'])
-agent_one = AgentOne(selected_models['agent_one'], agent_one_api_key)
+# Agents are only built when a turn needs them; model handles come from the shared pool.
+# The factory is shared by every rerun and session with the same models and keys; the keys
+# themselves are not hashed into the cache key (underscore argument), only their fingerprints.
+@st.cache_resource(max_entries=32)
+def get_agent_factory(model_selection, key_fingerprints, _api_keys):
+    api_keys = dict(_api_keys)
+
+    def get_api_key_for_model(model_name):
+        if model_name in gpt_models:
+            return api_keys.get('openai')
+        elif model_name in claude_models:
+            return api_keys.get('anthropic')
+        else:
+            return None
 
-agent_two_api_key = get_api_key_for_model(selected_models['agent_two'])
-agent_two = AgentTwo(selected_models['agent_two'], agent_two_api_key)
+    return AgentFactory(dict(model_selection), get_api_key_for_model)
 
-# Initialize managers
-conversation_manager = ConversationManager()
-research_manager = ResearchManager()
-risk_profile_manager = RiskProfileManager()
+api_keys = st.session_state['api_keys']
+agent_factory = get_agent_factory(
+    tuple(sorted(selected_models.items())),
+    tuple(sorted((provider, model_pool.fingerprint(key)) for provider, key in api_keys.items())),
+    api_keys,
+)
 
 # Initialize conversation
 initialize_conversation()
+session = get_pipeline_session()
 
 # Display conversation history
 display_conversation()
 
+# Speculative mode starts Agent Zero's reply while Agent One is still classifying the input
+speculative_mode = st.sidebar.toggle("Speculative replies", value=False)
+
+# Agents that opt in answer repeated prompts from the shared response cache; the toggle bypasses it
+response_cache_mode = st.sidebar.toggle("Agent response cache", value=True)
+
+# Agents One and Two try the provider's fast model first and escalate only on malformed output
+cascade_mode = st.sidebar.toggle("Model cascade", value=True)
+
+# The pipeline engine runs the turn; this script only renders its events
+engine = PipelineEngine(
+    agent_factory,
+    research_snapshots=get_research_snapshots(),
+    speculative=speculative_mode,
+    use_response_cache=response_cache_mode,
+    use_cascade=cascade_mode,
+)
+
 # Get user input
 user_input = get_user_input()
 
 if user_input:
-    # Add user message to conversation history
-    st.session_state['messages'].append({"role": "user", "content": user_input})
-    with st.chat_message("user"):
-        st.markdown(user_input)
-    st.session_state['conversation_history'].append({"role": "user", "content": user_input})
-
-    # Process the user input
-    def process_user_input(user_input):
-        # Agent One evaluates the user input
-        evaluation_response = agent_one.evaluate_input(user_input)
-        st.write(f"**Evaluation Report from Agent One:**\n{evaluation_response}")
-
-        # Append Agent One's evaluation to conversation history
-        st.session_state['conversation_history'].append({"role": "agent_one", "content": evaluation_response})
-
-        # Check evaluation response
-        if "'Y'" in evaluation_response:
-            # The user is requesting investment advice
-            with st.spinner('Generating detailed report...'):
-                research_summary = research_manager.generate_research_summary()
-                st.write(research_summary)
-                report_summary_text = research_manager.summarize_report(
-                    research_summary,
-                    selected_models['agent_zero'],
-                    agent_zero_api_key
-                )
-            assistant_response = conversation_manager.conversation(user_input, agent_zero, report_summary=report_summary_text)
-            return assistant_response
-        elif "'R'" in evaluation_response:
-            # The user is answering a risk profile question
-            risk_profile_report = risk_profile_manager.generate_risk_profile(st.session_state['conversation_history'], agent_two)
-            st.session_state['risk_profile_report'] = risk_profile_report
-            st.write(f"**Risk Profile Report from Agent Two:**\n{risk_profile_report}")
-            st.session_state['conversation_history'].append({"role": "agent_two", "content": risk_profile_report})
-            assistant_response = conversation_manager.conversation(user_input, agent_zero)
-            return assistant_response
-        else:
-            # Continue interaction with Agent Zero via conversation
-            assistant_response = conversation_manager.conversation(user_input, agent_zero)
-            return assistant_response
-
     # Process the user input
-    process_user_input(user_input)
-
+    engine.run_turn(session, user_input, StreamlitEvents())
+
+    # Latency saved by the speculative reply on this turn
+    last_turn = session.turn_metrics[-1] if session.turn_metrics else {}
+    if last_turn.get('speculative') is True:
+        st.sidebar.caption(
+            f"Last speculative turn: {last_turn['turn_wall_s']:.2f}s wall, "
+            f"{last_turn['latency_saved_s']:.2f}s saved"
+        )
+
+    # Share of Agent One evaluations answered by the local classifier or the response cache (no LLM call)
+    classifier_stats = get_intent_classifier().stats()
+    st.sidebar.caption(
+        f"Agent One fast path: {classifier_stats['skip_rate']:.0%} of evaluations skipped the LLM "
+        f"({classifier_stats['local']} local, {classifier_stats['cache']} cached, {classifier_stats['llm']} LLM)"
+    )
+    if agent_factory.is_created('agent_one'):
+        cache_stats = agent_factory.get('agent_one').response_cache().stats()
+        st.sidebar.caption(
+            f"Agent One response cache: {cache_stats['hit_rate']:.0%} hit rate "
+            f"({cache_stats['hits']} hits, {cache_stats['misses']} misses, {cache_stats['entries']} entries)"
+        )
+
+    # Research summaries memoized across sessions and reruns (same research, model and prompt version)
+    summary_stats = get_summary_cache().stats()
+    st.sidebar.caption(
+        f"Research summary cache: {summary_stats['hit_rate']:.0%} hit rate "
+        f"({summary_stats['hits']} hits, {summary_stats['misses']} misses, {summary_stats['entries']} entries)"
+    )
+
+    # How often the fast model's output had to be escalated, and what each model's calls cost in latency
+    router_stats = model_router.stats()
+    for agent, agent_stats in router_stats['agents'].items():
+        st.sidebar.caption(
+            f"{agent} cascade: {agent_stats['escalation_rate']:.0%} escalated ({agent_stats['escalations']} escalations)"
+        )
+    for model, model_stats in router_stats['models'].items():
+        st.sidebar.caption(
+            f"{model}: {model_stats['calls']} calls, p50 {model_stats['p50_s']:.2f}s, p95 {model_stats['p95_s']:.2f}s, "
+            f"{model_stats['invalid_rate']:.0%} invalid"
+        )
+
+    # Share of the prompt tokens the providers served from their prompt cache (stable mandate/context prefixes)
+    for provider, cache_stats in prompt_cache_stats().items():
+        st.sidebar.caption(
+            f"{provider} prompt cache: {cache_stats['cached_rate']:.0%} of input tokens cached "
+            f"({cache_stats['cached_tokens']} of {cache_stats['input_tokens']} over {cache_stats['requests']} requests)"
+        )
+
+# Where the latest turn's time went (agents, model loads, data calls, caches)
+display_trace_waterfall(session.last_trace)
@@ -0,0 +1,190 @@
+'''
+🚦 PipelineEngine Class - Headless Orchestration of the Agentic Pipeline
+-----------------------------------------------------------------------
+Technical Overview:
+The PipelineEngine runs one conversation turn through the agents, independent of any user interface.
+Agent One classifies the input; 'Y' turns get the research summary (from the latest precomputed snapshot
+or generated live) and a research-backed reply from Agent Zero; 'R' turns update the risk profile with
+Agent Two before Agent Zero answers; 'N' turns go straight to Agent Zero. Optionally (off by default),
+Agent Zero's reply is started speculatively while Agent One is still classifying. It is only kept for 'N'
+turns: 'Y' turns add the research summary and 'R' turns the updated risk profile to Agent Zero's prompt,
+so the speculative reply is discarded there. Inputs the local intent classifier already labels 'R' or 'Y'
+are not speculated on at all, so those turns are not billed twice.
+
+All state lives in an explicit SessionState passed to `run_turn`, and everything a user could see is
+reported through PipelineEvents callbacks, so the same engine serves the Streamlit app (main.py renders
+the events) and headless callers such as _helpers/run_pipeline_batch.py. The engine holds no
+per-conversation state of its own; turns of one session are serialized by the session's lock, and turns
+of different sessions can run concurrently on different threads.
+
+Every turn is traced as a 'turn' span (utils/tracing.py) with one child span per stage (Agent One,
+research, Agent Two, Agent Zero) and the agents' and data calls' spans below them; the finished trace is
+kept on session.last_trace for the UI's timing waterfall.
+
+In Simple Terms:
+The PipelineEngine is the switchboard of the app. It takes a client's message, routes it to the right
+agents and hands back the answer, without caring whether the client sits in front of a web page or is
+one of a thousand simulated conversations.
+
+Attributes:
+- agent_factory: AgentFactory providing the agents (and the model and API key of Agent Zero).
+- conversation_manager / research_manager / risk_profile_manager: The utility managers used per turn.
+- research_snapshots: Store of precomputed research snapshots (the shared one when None), or False to always
+  research live.
+- speculative: Start Agent Zero's reply while Agent One classifies the input (off by default).
+- use_response_cache: Let agents that opt in answer from the shared response cache.
+- use_cascade: Let agents that opt in (Agent One, Agent Two) try the provider's fast model before the selected
+  one (agents/model_router.py).
+
+Methods:
+- run_turn: Runs one user input through the pipeline and returns Agent Zero's reply.
+'''
+
+import time
+
+from pipeline.events import PipelineEvents
+from utils.conversation_utils import ConversationManager
+from utils.intent_classifier import get_intent_classifier
+from utils.research_snapshots import get_research_snapshots
+from utils.research_utils import ResearchManager
+from utils.risk_profile_utils import RiskProfileManager
+from utils.speculation import SpeculativeReply
+from utils.tracing import set_attributes, span
+
+
+class PipelineEngine:
+    def __init__(self, agent_factory, conversation_manager=None, research_manager=None, risk_profile_manager=None,
+                 research_snapshots=None, speculative=False, use_response_cache=True, use_cascade=True):
+        self.agent_factory = agent_factory
+        self.conversation_manager = conversation_manager or ConversationManager()
+        self.research_manager = research_manager or ResearchManager()
+        self.risk_profile_manager = risk_profile_manager or RiskProfileManager()
+        self.research_snapshots = research_snapshots if research_snapshots is not None else get_research_snapshots()
+        self.speculative = speculative
+        self.use_response_cache = use_response_cache
+        self.use_cascade = use_cascade
+
+    def run_turn(self, session, user_input, events=None):
+        events = events or PipelineEvents()
+        with session.lock, span('turn') as trace:
+            session.last_trace = trace
+            # Add user message to conversation history
+            session.messages.append({"role": "user", "content": user_input})
+            session.conversation_history.append({"role": "user", "content": user_input})
+            events.on_user_message(user_input)
+            return self._process_user_input(session, user_input, events)
+
+    def _process_user_input(self, session, user_input, events):
+        turn_started_at = time.monotonic()
+        agent_zero = self.agent_factory.get('agent_zero')
+
+        # Start Agent Zero speculatively; its prompt only stays the same on 'N' turns
+        speculative_reply = None
+        if self.speculative and self._may_speculate(user_input):
+            risk_profile_report = session.risk_profile_report
+            speculative_reply = SpeculativeReply(
+                lambda: agent_zero.stream_response(user_input, risk_profile_report=risk_profile_report)
+            )
+
+        # Agent One evaluates the user input
+        agent_one = self.agent_factory.get('agent_one')
+        # The factory (and its agents) is shared by every session with the same models and keys, so the
+        # engine's choices are passed per call
+        evaluation_response = agent_one.evaluate_input(
+            user_input, use_response_cache=self.use_response_cache, use_cascade=self.use_cascade
+        )
+        events.on_evaluation(evaluation_response)
+
+        # Append Agent One's evaluation to conversation history
+        session.conversation_history.append({"role": "agent_one", "content": evaluation_response})
+
+        # Check evaluation response
+        if "'Y'" in evaluation_response:
+            # The research summary changes Agent Zero's prompt, so the speculative reply is discarded
+            if speculative_reply is not None:
+                speculative_reply.cancel()
+                self._record_metrics(session, events, {'speculative': 'discarded', 'latency_saved_s': 0.0})
+
+            with span('research'):
+                report_summary_text = self._research(events)
+            with span('agent_zero'):
+                assistant_response = self.conversation_manager.conversation(
+                    session, user_input, agent_zero, events, report_summary=report_summary_text, stream=True
+                )
+        elif "'R'" in evaluation_response:
+            # The user is answering a risk profile question; the reply must see the updated profile
+            if speculative_reply is not None:
+                speculative_reply.cancel()
+                self._record_metrics(session, events, {'speculative': 'discarded', 'latency_saved_s': 0.0})
+                speculative_reply = None
+
+            with span('agent_two'):
+                agent_two = self.agent_factory.get('agent_two')
+                risk_profile_report = self.risk_profile_manager.generate_risk_profile(
+                    session.conversation_history, agent_two, session, use_cascade=self.use_cascade
+                )
+            session.risk_profile_report = risk_profile_report
+            events.on_risk_profile(risk_profile_report)
+            session.conversation_history.append({"role": "agent_two", "content": risk_profile_report})
+            assistant_response = self._respond_with(session, user_input, agent_zero, events, speculative_reply, turn_started_at)
+        else:
+            # Continue interaction with Agent Zero via conversation
+            assistant_response = self._respond_with(session, user_input, agent_zero, events, speculative_reply, turn_started_at)
+        return assistant_response
+
+    def _may_speculate(self, user_input):
+        # A reply started for an input the classifier labels 'R' or 'Y' would be discarded, and billed anyway
+        label, _ = get_intent_classifier().predict(user_input)
+        return label not in ('R', 'Y')
+
+    def _research(self, events):
+        # The user is requesting investment advice; serve the latest precomputed snapshot when fresh and
+        # summarized by the user's Agent Zero model
+        agent_zero_model = self.agent_factory.selected_models['agent_zero']
+        snapshot = self.research_snapshots.latest(agent_zero_model) if self.research_snapshots else None
+        set_attributes(source='snapshot' if snapshot is not None else 'live')
+        if snapshot is not None:
+            events.on_research(snapshot['research_summary'])
+            return snapshot['summary_text']
+
+        agent_zero_api_key = self.agent_factory.api_key_resolver(agent_zero_model)
+        with events.status('Generating detailed report...'):
+            research_summary = self.research_manager.generate_research_summary()
+            events.on_research(research_summary)
+            report_summary_text = self.research_manager.summarize_report(
+                research_summary,
+                agent_zero_model,
+                agent_zero_api_key,
+                status=events.status,
+            )
+        # Publish the live result so the next users within the window get it instantly
+        if self.research_snapshots:
+            self.research_snapshots.publish(research_summary, report_summary_text, agent_zero_model)
+        return report_summary_text
+
+    def _respond_with(self, session, user_input, agent_zero, events, speculative_reply, turn_started_at):
+        if speculative_reply is None:
+            with span('agent_zero'):
+                return self.conversation_manager.conversation(session, user_input, agent_zero, events, stream=True)
+
+        # Latency saved = (time before Agent Zero would have started + its generation time) - actual wall time
+        waited_for = time.monotonic() - turn_started_at
+        with span('agent_zero', speculative=True):
+            assistant_response = self.conversation_manager.conversation(
+                session, user_input, agent_zero, events, response_stream=speculative_reply.stream()
+            )
+        turn_wall_time = time.monotonic() - turn_started_at
+        generation_time = speculative_reply.duration() or 0.0
+        self._record_metrics(session, events, {
+            'speculative': True,
+            'pre_agent_zero_s': round(waited_for, 3),
+            'agent_zero_s': round(generation_time, 3),
+            'turn_wall_s': round(turn_wall_time, 3),
+            'latency_saved_s': round(max(waited_for + generation_time - turn_wall_time, 0.0), 3),
+        })
+        return assistant_response
+
+    def _record_metrics(self, session, events, metrics):
+        set_attributes(**metrics)
+        session.turn_metrics.append(metrics)
+        events.on_turn_metrics(metrics)
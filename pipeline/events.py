@@ -0,0 +1,53 @@
+'''
+📣 PipelineEvents Class - UI-Independent Callbacks of the Pipeline Engine
+------------------------------------------------------------------------
+Technical Overview:
+The PipelineEngine never talks to a user interface directly. Everything a user could see during a turn
+(Agent One's evaluation, the risk profile, the research summary, Agent Zero's streamed reply, progress
+messages and the turn's metrics) is reported through a PipelineEvents object. The base class is headless:
+callbacks do nothing, streamed replies are collected into a string and progress messages are ignored,
+which is what batch runners and benchmarks need. The Streamlit app subclasses it (ui/pipeline_events.py)
+to render the same events with st.write, st.write_stream, st.chat_message and st.spinner.
+
+In Simple Terms:
+PipelineEvents is the engine's announcer. The engine says what happened, and whoever is listening (a web
+page, a terminal, nobody) decides how to show it.
+
+Methods:
+- status: Context manager wrapping a slow step, e.g. to show a spinner.
+- on_user_message: The user's message was added to the conversation.
+- on_evaluation: Agent One classified the input.
+- on_risk_profile: Agent Two produced a risk profile report.
+- on_research: The research summary for an advice turn is ready.
+- on_assistant_stream: Consumes Agent Zero's streamed reply and returns the full text.
+- on_assistant_message: Agent Zero's complete (non-streamed) reply is ready.
+- on_turn_metrics: Metrics of the finished turn.
+'''
+
+import contextlib
+
+
+class PipelineEvents:
+    def status(self, message):
+        return contextlib.nullcontext()
+
+    def on_user_message(self, text):
+        pass
+
+    def on_evaluation(self, evaluation):
+        pass
+
+    def on_risk_profile(self, report):
+        pass
+
+    def on_research(self, research_summary):
+        pass
+
+    def on_assistant_stream(self, chunks):
+        return "".join(chunks)
+
+    def on_assistant_message(self, text):
+        pass
+
+    def on_turn_metrics(self, metrics):
+        pass
@@ -0,0 +1,43 @@
+'''
+🗂️ SessionState Class - Explicit Per-Conversation State for the Pipeline Engine
+------------------------------------------------------------------------------
+Technical Overview:
+The SessionState class holds everything the pipeline remembers about one conversation: the chat
+messages shown to the user, the full conversation history (including the agents' internal reports), the
+latest risk profile and how far into the history it has been read, the rolling context summaries and the
+per-turn metrics. The Streamlit app keeps one SessionState in st.session_state; a batch runner keeps one
+per simulated conversation. Each session has its own lock, so the engine runs at most one turn at a time
+per conversation while different conversations run concurrently.
+
+In Simple Terms:
+The SessionState is the case file of one client. Every agent reads from and writes to the client's file,
+and many files can be worked on side by side.
+
+Attributes:
+- messages: Chat messages shown to the user ({'role', 'content'}).
+- conversation_history: Every message of the conversation, including agent reports.
+- risk_profile_report: Latest risk profile report text, passed to Agent Zero.
+- risk_profile: Latest structured RiskProfile, or None.
+- risk_profile_cursor: Position in conversation_history up to which the risk profile has been built.
+- context_state: Per-agent rolling summary state used by the ContextBuilder.
+- turn_metrics: One metrics dict per turn.
+- last_trace: Root tracing span of the latest turn, whose spans feed the timing waterfall.
+- lock: Serializes turns of this conversation.
+'''
+
+import threading
+
+GREETING = "Hi, how can I help you today?"
+
+
+class SessionState:
+    def __init__(self, greeting=GREETING):
+        self.messages = [{"role": "assistant", "content": greeting}] if greeting else []
+        self.conversation_history = []
+        self.risk_profile_report = None
+        self.risk_profile = None
+        self.risk_profile_cursor = 0
+        self.context_state = {}
+        self.turn_metrics = []
+        self.last_trace = None
+        self.lock = threading.RLock()
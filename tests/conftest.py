@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(scope='session', autouse=True)
+def isolated_traces(tmp_path_factory):
+    # Spans of the code under test go to a temporary directory, not to the repository's data/traces.jsonl.
+    # Not restored afterwards: threads abandoned by a test (e.g. a timed-out market data call) may still
+    # end their spans after the session.
+    from utils.tracing import tracer
+    tracer.path = str(tmp_path_factory.mktemp('traces') / 'traces.jsonl')
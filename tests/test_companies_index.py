@@ -0,0 +1,56 @@
+import csv
+
+from utils import research_utils
+from utils.companies_dataset import CompaniesDataset
+from utils.companies_index import CompaniesIndex
+
+COLUMNS = ['name', 'ticker', 'theme', 'description', 'f_score']
+
+
+def write_companies(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        writer.writerows(rows)
+
+
+ROWS = [
+    ['Alpha Ltd', 'JSE:ALP', 'Mining', 'Gold', 9],
+    ['Beta Ltd', 'JSE:BET', 'Retail', 'Shops', 5],
+    ['Gamma Ltd', 'JSE:GAM', 'Banks', 'Loans', 8],
+]
+
+
+def test_sync_only_writes_changed_rows(tmp_path):
+    csv_path = tmp_path / 'companies.csv'
+    write_companies(csv_path, ROWS)
+    index = CompaniesIndex(str(csv_path))
+
+    assert index.sync() == 3
+    assert index.sync() == 0
+
+    write_companies(csv_path, [ROWS[0], ['Beta Holdings Ltd', 'JSE:BET', 'Retail', 'Shops', 9]])
+    # One row changed, one row deleted from the end
+    assert index.sync() == 2
+    assert [row['name'] for row in index.screen(min_f_score=8)] == ['Alpha Ltd', 'Beta Holdings Ltd']
+
+
+class EmptyFetcher:
+    def fetch(self, tickers):
+        return {ticker: {'get_stock_summary': {}, 'get_financial_summary': {}, 'get_company_summary': {}}
+                for ticker in tickers}, []
+
+
+def test_screening_falls_back_to_the_index_without_pyarrow(tmp_path, monkeypatch):
+    (tmp_path / 'data').mkdir()
+    write_companies(tmp_path / 'data' / 'companies.csv', ROWS)
+    monkeypatch.chdir(tmp_path)
+    manager = research_utils.ResearchManager(market_data_fetcher=EmptyFetcher(), summary_cache=object())
+
+    from_arrow = manager.generate_research_summary()
+    monkeypatch.setattr(CompaniesDataset, 'ensure_current', lambda self: False)
+    from_index = manager.generate_research_summary()
+
+    assert list(from_index) == list(from_arrow) == ['Alpha Ltd']
+    assert from_index['Alpha Ltd']['f_score'] == from_arrow['Alpha Ltd']['f_score'] == 9
+    assert (tmp_path / 'data' / 'companies_index.db').exists()
@@ -0,0 +1,68 @@
+from utils.context_builder import ContextBuilder, count_tokens
+
+
+def conversation(turns):
+    return [
+        {'role': 'user' if i % 2 == 0 else 'assistant', 'content': f"Message {i}. " + "detail " * 20}
+        for i in range(turns)
+    ]
+
+
+def test_short_history_is_kept_verbatim():
+    history = conversation(3)
+    state = {}
+
+    transcript = ContextBuilder(1000).build(history, state)
+
+    assert "Summary" not in transcript
+    assert all(message['content'] in transcript for message in history)
+    assert state['summarized_upto'] == 0
+
+
+def test_oldest_turns_are_folded_into_the_summary_within_the_budget():
+    history = conversation(20)
+    builder = ContextBuilder(300)
+
+    transcript = builder.build(history, {})
+
+    assert count_tokens(transcript) <= 300 * 1.1
+    assert transcript.startswith("Summary of the earlier conversation:\n- User: Message")
+    # The most recent turns are verbatim, the oldest ones only in the summary
+    assert history[-1]['content'] in transcript
+    assert history[0]['content'] not in transcript
+
+
+def test_each_turn_is_summarized_once():
+    summarized = []
+
+    def summarizer(previous_summary, turns):
+        summarized.extend(content for _, content in turns)
+        return "\n".join(filter(None, [previous_summary] + [f"- {label}: {content[:10]}" for label, content in turns]))
+
+    history = conversation(20)
+    builder = ContextBuilder(300, summarizer=summarizer)
+    state = {}
+    for end in range(10, 21):
+        builder.build(history[:end], state)
+
+    assert len(summarized) == len(set(summarized)) == state['summarized_upto']
+
+
+def test_oldest_summary_lines_are_dropped_first():
+    builder = ContextBuilder(100, summary_share=0.3, min_recent=1)
+    state = {'summary': "\n".join(f"- User: old fact {i}" for i in range(50)), 'summarized_upto': 1}
+    history = conversation(2)
+
+    builder.build(history, state)
+
+    assert "old fact 49" in state['summary'] and "old fact 0\n" not in state['summary']
+    assert count_tokens(state['summary']) <= 30
+
+
+def test_recent_turns_over_the_budget_are_shortened():
+    history = [{'role': 'user', 'content': "word " * 500}, {'role': 'assistant', 'content': "word " * 500}]
+
+    transcript = ContextBuilder(200, min_recent=2).build(history, {})
+
+    assert count_tokens(transcript) <= 200 * 1.1
+    assert transcript.count("…") == 2
@@ -0,0 +1,77 @@
+import csv
+import os
+import time
+
+import pytest
+
+from agents.agent_one import AgentOne
+from utils.intent_classifier import IntentClassifier, load_training_data, prune_decision_log
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HELDOUT_PATH = os.path.join(ROOT, "data", "agent_one_heldout.csv")
+
+
+@pytest.fixture(scope="module")
+def classifier():
+    # Seed utterances only, so the result does not depend on a local decision log
+    texts, labels = load_training_data(os.path.join(ROOT, "data", "agent_one_utterances.csv"), os.devnull)
+    return IntentClassifier().fit(texts, labels)
+
+
+def test_local_decisions_agree_with_the_llm_on_held_out_utterances(classifier):
+    with open(HELDOUT_PATH, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+
+    decisions = []
+    for row in rows:
+        label, confidence = classifier.predict(row['text'])
+        if label is not None and confidence >= AgentOne.confidence_threshold:
+            decisions.append((row['label'], label))
+
+    agreement = sum(expected == label for expected, label in decisions) / len(decisions)
+    assert agreement >= 0.95
+    # The fast path still has to skip a meaningful share of LLM calls
+    assert len(decisions) / len(rows) >= 0.25
+
+
+@pytest.mark.parametrize("text", [
+    "should I invest in crypto",
+    "I do not want investment advice, just tell me about yourself",
+])
+def test_ambiguous_inputs_go_to_the_llm(classifier, text):
+    label, confidence = classifier.predict(text)
+    assert label is None or confidence < AgentOne.confidence_threshold
+
+
+def test_decision_log_stores_only_a_hash_of_the_input_by_default(tmp_path):
+    log_path = str(tmp_path / 'decisions.jsonl')
+    IntentClassifier().log_decision("I am 35 and earn 80k", 'R', 'llm', log_path=log_path)
+
+    with open(log_path, encoding='utf-8') as f:
+        line = f.read()
+    assert "80k" not in line and "text_sha256" in line
+    # Without its text, the decision cannot be trained on
+    assert load_training_data(os.devnull, log_path) == ([], [])
+
+
+def test_training_uses_the_most_recent_logged_decisions_per_label(tmp_path):
+    log_path = str(tmp_path / 'decisions.jsonl')
+    classifier = IntentClassifier()
+    for i in range(5):
+        classifier.log_decision(f"hello number {i}", 'N', 'llm', log_path=log_path, store_text=True)
+    classifier.log_decision("buy shares", 'Y', 'llm', log_path=log_path, store_text=True)
+
+    texts, labels = load_training_data(os.devnull, log_path, max_per_label=2)
+
+    assert list(zip(texts, labels)) == [("hello number 3", 'N'), ("hello number 4", 'N'), ("buy shares", 'Y')]
+
+
+def test_expired_decisions_are_pruned(tmp_path, monkeypatch):
+    log_path = str(tmp_path / 'decisions.jsonl')
+    IntentClassifier().log_decision("hello", 'N', 'llm', log_path=log_path, store_text=True)
+
+    later = time.time() + 31 * 24 * 60 * 60
+    monkeypatch.setattr(time, 'time', lambda: later)
+    assert load_training_data(os.devnull, log_path) == ([], [])
+    assert prune_decision_log(log_path) == 1
+    assert os.path.getsize(log_path) == 0
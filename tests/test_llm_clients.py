@@ -0,0 +1,75 @@
+import asyncio
+from types import SimpleNamespace
+
+from agents import llm_clients
+from agents.llm_clients import MAX_CACHE_BREAKPOINTS, _build_request, _parse_usage, flatten_prompt
+from utils.async_runner import run_async
+
+
+def test_openai_gets_the_stable_segments_as_one_system_message():
+    request = _build_request('openai', "Client: hi", ["mandate", "", "research summary"])
+
+    assert request == {"messages": [
+        {"role": "system", "content": "mandate\nresearch summary"},
+        {"role": "user", "content": "Client: hi"},
+    ]}
+    assert _build_request('openai', "Client: hi", None) == {"messages": [{"role": "user", "content": "Client: hi"}]}
+
+
+def test_anthropic_marks_a_cache_breakpoint_after_each_of_the_last_segments():
+    segments = [f"segment {i}" for i in range(MAX_CACHE_BREAKPOINTS + 1)]
+
+    request = _build_request('anthropic', "Client: hi", segments)
+
+    assert request["messages"] == [{"role": "user", "content": "Client: hi"}]
+    assert [block["text"] for block in request["system"]] == segments
+    assert "cache_control" not in request["system"][0]
+    assert all(block["cache_control"] == {"type": "ephemeral"} for block in request["system"][1:])
+    assert "system" not in _build_request('anthropic', "Client: hi", "")
+
+
+def test_flatten_prompt_puts_the_segments_first():
+    assert flatten_prompt("Client: hi", ["mandate", "profile"]) == "mandate\nprofile\nClient: hi"
+    assert flatten_prompt("Client: hi", "mandate") == "mandate\nClient: hi"
+
+
+def test_usage_counts_cached_input_tokens_per_provider():
+    openai_usage = SimpleNamespace(prompt_tokens=1200, completion_tokens=50,
+                                   prompt_tokens_details=SimpleNamespace(cached_tokens=1024))
+    anthropic_usage = SimpleNamespace(input_tokens=20, output_tokens=50,
+                                      cache_read_input_tokens=1000, cache_creation_input_tokens=180)
+
+    assert _parse_usage('openai', openai_usage) == {'input': 1200, 'output': 50, 'cached': 1024}
+    assert _parse_usage('anthropic', anthropic_usage) == {'input': 1200, 'output': 50, 'cached': 1000}
+
+
+class FakeAsyncOpenAI:
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, model, max_tokens, messages, **options):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.02)
+        self.active -= 1
+        usage = SimpleNamespace(prompt_tokens=10, completion_tokens=2, prompt_tokens_details=None)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=messages[-1]['content']))],
+                               usage=usage)
+
+
+def test_concurrent_async_completions_are_bounded_per_provider(monkeypatch):
+    client = FakeAsyncOpenAI()
+    monkeypatch.setattr(llm_clients, '_async_client_pool', SimpleNamespace(acquire=lambda provider, api_key: client))
+    monkeypatch.setattr(llm_clients, '_semaphores', {})
+    monkeypatch.setattr(llm_clients, 'MAX_CONCURRENT_REQUESTS', 2)
+
+    async def complete_all():
+        return await asyncio.gather(*(llm_clients.acomplete('gpt-4o', 'key', f"prompt {i}") for i in range(6)))
+
+    responses = run_async(complete_all())
+
+    assert [response['llm_response'] for response in responses] == [f"prompt {i}" for i in range(6)]
+    assert responses[0]['usage'] == {'input': 10, 'output': 2, 'cached': 0}
+    assert client.max_active == 2
@@ -0,0 +1,51 @@
+import time
+
+from utils.lru_store import LRUStore, content_key
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path, monkeypatch):
+    clock = iter(range(1000))
+    monkeypatch.setattr(time, 'time', lambda: next(clock))
+    store = LRUStore(str(tmp_path / 'memo.db'), max_entries=2)
+
+    store.set('a', 1)
+    store.set('b', 2)
+    assert store.get('a') == 1  # 'b' is now the least recently used
+    store.set('c', 3)
+
+    assert store.get('b') is None
+    assert store.get('a') == 1 and store.get('c') == 3
+    assert store.stats()['evictions'] == 1
+
+
+def test_entries_expire_after_the_ttl(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, 'time', lambda: now[0])
+    store = LRUStore(str(tmp_path / 'memo.db'), ttl=60)
+
+    store.set('a', {'summary': 'text'})
+    now[0] += 59
+    assert store.get('a') == {'summary': 'text'}
+    now[0] += 2
+    assert store.get('a') is None
+
+    stats = store.stats()
+    assert (stats['hits'], stats['misses'], stats['expired'], stats['entries']) == (1, 1, 1, 0)
+
+
+def test_namespaces_share_the_file_but_not_the_entries(tmp_path):
+    path = str(tmp_path / 'memo.db')
+    summaries = LRUStore(path, namespace='summaries', max_entries=1)
+    responses = LRUStore(path, namespace='responses', max_entries=1)
+
+    summaries.set('key', 'summary')
+    responses.set('key', 'response')
+
+    assert summaries.get('key') == 'summary' and responses.get('key') == 'response'
+    summaries.clear()
+    assert responses.get('key') == 'response'
+
+
+def test_content_key_ignores_dict_ordering():
+    assert content_key({'a': 1, 'b': 2}, 'gpt-4o') == content_key({'b': 2, 'a': 1}, 'gpt-4o')
+    assert content_key({'a': 1}, 'gpt-4o') != content_key({'a': 1}, 'gpt-4o-mini')
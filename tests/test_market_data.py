@@ -0,0 +1,70 @@
+import threading
+import time
+
+from utils.market_data import MARKET_DATA_CALLS, MarketDataFetcher
+
+
+class FakeProvider:
+    def __init__(self, fail=(), hang=()):
+        self.fail = set(fail)
+        self.hang = set(hang)
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def _respond(self, call, ticker):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(0.05)
+            if (ticker, call) in self.hang:
+                time.sleep(1.0)
+            if (ticker, call) in self.fail:
+                raise ConnectionError(f"{call} failed for {ticker}")
+            return {'call': call, 'ticker': ticker}
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def get_stock_summary(self, ticker, max_wait=None):
+        return self._respond('get_stock_summary', ticker)
+
+    def get_financial_summary(self, ticker, max_wait=None):
+        return self._respond('get_financial_summary', ticker)
+
+    def get_company_summary(self, ticker, max_wait=None):
+        return self._respond('get_company_summary', ticker)
+
+
+def test_calls_run_concurrently_and_results_keep_the_input_order():
+    provider = FakeProvider()
+    fetcher = MarketDataFetcher(provider=provider, max_workers=4)
+
+    results, errors = fetcher.fetch(['BBB', 'AAA', 'BBB', 'CCC'])
+
+    assert errors == []
+    assert list(results) == ['BBB', 'AAA', 'CCC']
+    assert results['AAA']['get_company_summary'] == {'call': 'get_company_summary', 'ticker': 'AAA'}
+    assert 1 < provider.max_active <= 4
+
+
+def test_a_failed_call_only_blanks_out_that_call():
+    fetcher = MarketDataFetcher(provider=FakeProvider(fail=[('AAA', 'get_financial_summary')]))
+
+    results, errors = fetcher.fetch(['AAA', 'BBB'])
+
+    assert results['AAA']['get_financial_summary'] == {}
+    assert results['AAA']['get_stock_summary'] and all(results['BBB'][call] for call in MARKET_DATA_CALLS)
+    assert [(ticker, call) for ticker, call, _ in errors] == [('AAA', 'get_financial_summary')]
+
+
+def test_a_call_is_abandoned_after_its_timeout():
+    fetcher = MarketDataFetcher(provider=FakeProvider(hang=[('AAA', 'get_stock_summary')]), call_timeout=0.3)
+
+    started_at = time.monotonic()
+    results, errors = fetcher.fetch(['AAA'])
+
+    assert time.monotonic() - started_at < 0.9
+    assert results['AAA']['get_stock_summary'] == {}
+    assert errors[0][:2] == ('AAA', 'get_stock_summary') and 'timed out' in errors[0][2]
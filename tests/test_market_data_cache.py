@@ -0,0 +1,81 @@
+import time
+
+from utils import market_data_cache
+from utils.market_data import MarketDataFetcher
+from utils.market_data_cache import CachedMarketDataProvider
+
+
+class FakeProvider:
+    def __init__(self):
+        self.calls = 0
+        self.max_waits = []
+        self.stock_summary = {'currentPrice': 100.0, 'trailingPE': 18.5, 'volume': 1000}
+
+    def get_stock_summary(self, ticker, max_wait=None):
+        self.calls += 1
+        self.max_waits.append(max_wait)
+        return dict(self.stock_summary)
+
+
+class Clock:
+    def __init__(self):
+        self.now = time.time()
+
+    def time(self):
+        return self.now
+
+
+def make_cache(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(market_data_cache.time, 'time', clock.time)
+    provider = FakeProvider()
+    cache = CachedMarketDataProvider(provider=provider, db_path=str(tmp_path / 'cache.db'))
+    # Background refreshes would race the assertions
+    monkeypatch.setattr(cache, '_schedule_refresh', lambda call, ticker: None)
+    return cache, provider, clock
+
+
+def test_trailing_pe_is_cached_in_the_valuation_group(tmp_path, monkeypatch):
+    cache, _, _ = make_cache(tmp_path, monkeypatch)
+    cache.get_stock_summary('AAPL')
+
+    entries = cache._read('get_stock_summary', 'AAPL')
+    assert entries['quote'][0] == {'currentPrice': 100.0, 'volume': 1000}
+    assert entries['valuation'][0] == {'trailingPE': 18.5}
+
+
+def test_trailing_pe_outlives_the_quote_ttl(tmp_path, monkeypatch):
+    cache, provider, clock = make_cache(tmp_path, monkeypatch)
+    cache.get_stock_summary('AAPL')
+
+    # Past the quote's stale window the quote is fetched again; this response lacks trailingPE
+    clock.now += market_data_cache.FIELD_GROUPS['quote']['ttl'] + market_data_cache.FIELD_GROUPS['quote']['stale_ttl'] + 1
+    provider.stock_summary = {'currentPrice': 101.0, 'volume': 2000}
+    summary = cache.get_stock_summary('AAPL')
+
+    assert provider.calls == 2
+    assert summary == {'currentPrice': 101.0, 'volume': 2000, 'trailingPE': 18.5}
+
+
+def test_trailing_pe_expires_with_the_valuation_group(tmp_path, monkeypatch):
+    cache, provider, clock = make_cache(tmp_path, monkeypatch)
+    cache.get_stock_summary('AAPL')
+
+    valuation = market_data_cache.FIELD_GROUPS['valuation']
+    clock.now += valuation['ttl'] + valuation['stale_ttl'] + 1
+    provider.stock_summary = {'currentPrice': 90.0}
+    assert cache.get_stock_summary('AAPL') == {'currentPrice': 90.0}
+
+    # The dropped valuation entry no longer forces a fetch on every lookup
+    assert cache.get_stock_summary('AAPL') == {'currentPrice': 90.0}
+    assert provider.calls == 2
+
+
+def test_the_fetchers_call_timeout_caps_the_upstream_wait_through_the_cache(tmp_path, monkeypatch):
+    cache, provider, _ = make_cache(tmp_path, monkeypatch)
+    fetcher = MarketDataFetcher(provider=cache, call_timeout=2.5)
+
+    results, errors = fetcher.fetch(['AAPL'], calls=('get_stock_summary',))
+
+    assert errors == [] and results['AAPL']['get_stock_summary']['currentPrice'] == 100.0
+    assert provider.max_waits == [2.5]
@@ -0,0 +1,20 @@
+from agents import agent_base
+from agents.agent_one import AgentOne
+
+
+def test_cascade_choice_is_per_call_on_a_shared_agent(monkeypatch):
+    models = []
+
+    async def fake_acomplete(model_name, api_key, prompt, system=None):
+        models.append(model_name)
+        return {'llm_response': "{'investment_advice': ['N']}"}
+
+    monkeypatch.setattr(agent_base, 'acomplete', fake_acomplete)
+    agent_one = AgentOne('gpt-4o', 'key')
+    agent_one.use_local_classifier = False
+
+    agent_one.evaluate_input("hello", use_response_cache=False, use_cascade=False)
+    agent_one.evaluate_input("hello", use_response_cache=False)
+
+    # The first session's choice did not stick to the shared agent
+    assert models == ['gpt-4o', 'gpt-4o-mini']
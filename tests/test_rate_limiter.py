@@ -0,0 +1,73 @@
+import time
+
+import pytest
+
+from utils import rate_limiter
+from utils.rate_limiter import PERMANENT, RETRYABLE, CircuitOpenError, UpstreamLimiter, classify_error
+
+
+def fail():
+    raise ConnectionError("throttled")
+
+
+def open_circuit(limiter):
+    for _ in range(limiter.failure_threshold):
+        with pytest.raises(ConnectionError):
+            limiter.call(fail)
+    assert limiter.circuit_open()
+
+
+def test_late_success_does_not_close_the_circuit_but_the_probe_does(tmp_path, monkeypatch):
+    limiter = UpstreamLimiter('test', failure_threshold=2, reset_timeout=60.0, db_path=str(tmp_path / 'limits.db'))
+    open_circuit(limiter)
+
+    # A request admitted before the circuit opened finishes successfully afterwards
+    limiter._record(failure=False)
+    assert limiter.circuit_open()
+    with pytest.raises(CircuitOpenError):
+        limiter.call(lambda: 'ok')
+
+    later = time.time() + 61
+    monkeypatch.setattr(time, 'time', lambda: later)
+    assert limiter.call(lambda: 'ok') == 'ok'
+    assert not limiter.circuit_open()
+
+
+def test_is_failure_is_given_per_call(tmp_path):
+    limiter = UpstreamLimiter('test', failure_threshold=2, db_path=str(tmp_path / 'limits.db'))
+    for _ in range(3):
+        with pytest.raises(KeyError):
+            limiter.call(lambda: {}['unknown ticker'], is_failure=lambda error: not isinstance(error, KeyError))
+    assert not limiter.circuit_open()
+
+
+def test_token_wait_is_capped_by_the_callers_max_wait(tmp_path):
+    limiter = UpstreamLimiter('test', rate=0.1, burst=1, max_wait=30.0, db_path=str(tmp_path / 'limits.db'))
+    limiter.call(lambda: 'ok')
+
+    started_at = time.monotonic()
+    with pytest.raises(TimeoutError):
+        limiter.call(lambda: 'ok', max_wait=0.2)
+    assert time.monotonic() - started_at < 1.0
+
+
+def test_shared_limiter_rejects_conflicting_settings(tmp_path, monkeypatch):
+    monkeypatch.setattr(rate_limiter, '_limiters', {})
+    monkeypatch.setattr(rate_limiter, 'DEFAULT_DB_PATH', str(tmp_path / 'limits.db'))
+
+    limiter = rate_limiter.get_upstream_limiter('test', rate=2.0)
+    assert rate_limiter.get_upstream_limiter('test') is limiter
+    assert rate_limiter.get_upstream_limiter('test', rate=2.0) is limiter
+    with pytest.raises(ValueError):
+        rate_limiter.get_upstream_limiter('test', rate=1.0)
+
+
+def test_throttling_is_retryable_and_permanent_errors_are_not():
+    class PermanentError(Exception):
+        permanent = True
+
+    assert classify_error(CircuitOpenError('yahoo_finance', 10)) == RETRYABLE
+    assert classify_error(TimeoutError()) == RETRYABLE
+    assert classify_error(ValueError("429 Too Many Requests")) == RETRYABLE
+    assert classify_error(KeyError('sharesOutstanding')) == PERMANENT
+    assert classify_error(PermanentError("timed out")) == PERMANENT
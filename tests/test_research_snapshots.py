@@ -0,0 +1,33 @@
+import os
+import time
+
+from utils.research_snapshots import ResearchSnapshotStore
+
+
+def test_latest_only_returns_snapshots_summarized_by_the_requested_model(tmp_path):
+    store = ResearchSnapshotStore(str(tmp_path))
+
+    store.publish({'AAPL': {}}, "gpt summary", model_name='gpt-4o')
+
+    assert store.latest('gpt-4o')['summary_text'] == "gpt summary"
+    assert store.latest('claude-3-5-sonnet') is None
+
+    store.publish({'AAPL': {}}, "claude summary", model_name='claude-3-5-sonnet')
+
+    assert store.latest('gpt-4o')['summary_text'] == "gpt summary"
+    assert store.latest('claude-3-5-sonnet')['summary_text'] == "claude summary"
+
+
+def test_stale_snapshots_are_not_served_and_old_versions_are_pruned_per_model(tmp_path):
+    store = ResearchSnapshotStore(str(tmp_path), keep_versions=2)
+
+    store.publish({}, "other model", model_name='claude-3-5-sonnet')
+    for i in range(4):
+        time.sleep(0.002)  # versions are named by the millisecond
+        store.publish({}, f"summary {i}", model_name='gpt-4o')
+
+    assert store.latest('gpt-4o')['summary_text'] == "summary 3"
+    assert store.latest('gpt-4o', max_age=-1) is None
+    snapshots = [name for name in os.listdir(tmp_path) if name.startswith("snapshot-")]
+    assert len(snapshots) == 3
+    assert store.latest('claude-3-5-sonnet')['summary_text'] == "other model"
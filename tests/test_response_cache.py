@@ -0,0 +1,38 @@
+from agents import agent_base
+from agents.agent_one import AgentOne
+
+
+def make_agent(tmp_path, monkeypatch, calls):
+    async def fake_acomplete(model_name, api_key, prompt, system=None):
+        calls.append(prompt)
+        return {'llm_response': "{'investment_advice': ['N']}"}
+
+    monkeypatch.setattr(agent_base, 'acomplete', fake_acomplete)
+    monkeypatch.setattr(agent_base, 'RESPONSE_CACHE_PATH', str(tmp_path / 'memo_cache.db'))
+    monkeypatch.setattr(agent_base, '_response_caches', {})
+    agent = AgentOne('gpt-4o', 'key')
+    agent.use_local_classifier = False
+    return agent
+
+
+def test_normalized_repeats_are_answered_from_the_cache(tmp_path, monkeypatch):
+    calls = []
+    agent = make_agent(tmp_path, monkeypatch, calls)
+
+    first = agent.complete_with_source("User input: Hi!", cache_input="Hi!", use_cascade=False)
+    second = agent.complete_with_source("User input: hi", cache_input="  hi ", use_cascade=False)
+
+    assert first == ("{'investment_advice': ['N']}", False)
+    assert second == ("{'investment_advice': ['N']}", True)
+    assert len(calls) == 1
+    assert agent.response_cache().stats()['hits'] == 1
+
+
+def test_use_cache_false_skips_the_cache(tmp_path, monkeypatch):
+    calls = []
+    agent = make_agent(tmp_path, monkeypatch, calls)
+
+    agent.evaluate_input("Hi", use_cascade=False)
+    agent.evaluate_input("Hi", use_response_cache=False, use_cascade=False)
+
+    assert len(calls) == 2
@@ -0,0 +1,80 @@
+import pytest
+
+from pipeline.session import SessionState
+from utils.risk_profile_utils import RiskProfile, RiskProfileManager
+
+QUESTION = {'role': 'assistant', 'content': "If the market dropped 20% tomorrow, what would you do?"}
+
+
+class FakeAgentTwo:
+    def __init__(self):
+        self.calls = 0
+
+    def generate_risk_profile(self, *args, **kwargs):
+        self.calls += 1
+        return '{"risk_willingness": "high"}'
+
+    update_risk_profile = generate_risk_profile
+
+
+def session_with_profile():
+    session = SessionState()
+    session.risk_profile = RiskProfile(age=40)
+    return session
+
+
+@pytest.mark.parametrize("answer", ["High", "medium", "Yes", "No, I would hold", "I would sell everything",
+                                    "I would buy more", "Pretty high I guess"])
+def test_short_risk_answers_reach_agent_two(answer):
+    agent_two = FakeAgentTwo()
+    history = [QUESTION, {'role': 'user', 'content': answer}]
+
+    RiskProfileManager().generate_risk_profile(history, agent_two, session_with_profile())
+    assert agent_two.calls == 1
+
+
+def test_gate_reads_the_answer_with_its_question():
+    manager = RiskProfileManager()
+    assert manager.has_risk_content([QUESTION, {'role': 'user', 'content': "Yes"}], 1)
+    assert not manager.has_risk_content(
+        [{'role': 'assistant', 'content': "Nice to meet you!"}, {'role': 'user', 'content': "Yes"}], 1
+    )
+
+    agent_two = FakeAgentTwo()
+    history = [{'role': 'assistant', 'content': "Nice to meet you!"}, {'role': 'user', 'content': "Thanks"}]
+    manager.generate_risk_profile(history, agent_two, session_with_profile(), risk_answer=False)
+    assert agent_two.calls == 0
+
+
+def test_incremental_updates_reuse_the_cached_summary(monkeypatch):
+    from agents.agent_two import AgentTwo
+    from utils import context_builder
+
+    summarized = []
+    extractive_summarizer = context_builder.extractive_summarizer
+
+    def counting_summarizer(previous_summary, turns):
+        summarized.extend(content for _, content in turns)
+        return extractive_summarizer(previous_summary, turns)
+
+    monkeypatch.setattr(context_builder, 'extractive_summarizer', counting_summarizer)
+    agent_two = AgentTwo('gpt-4o', 'key')
+    prompts = []
+    monkeypatch.setattr(agent_two, 'prompt_model', lambda prompt, system=None, use_cascade=True: prompts.append(prompt) or '{"age": 40}')
+
+    manager = RiskProfileManager()
+    session = SessionState()
+    history = []
+    for turn in range(4):
+        history += [
+            {'role': 'assistant', 'content': f"Question {turn}: how much risk can you take? " + "detail " * 40},
+            {'role': 'user', 'content': f"Answer {turn}: moderate risk. " + "context " * 40},
+        ]
+        manager.generate_risk_profile(history, agent_two, session)
+
+    # Every turn is folded into the rolling summary once, and later prompts carry the cached summary
+    assert len(summarized) == len(set(summarized)) > 0
+    assert session.context_state['agent_two']['summary']
+    assert "Summary of the earlier conversation" in prompts[-1]
+    # Messages already in the profile are never resent verbatim
+    assert "Answer 0: moderate risk. context context" not in prompts[-1]
@@ -0,0 +1,71 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils.async_runner import run_async
+from utils.singleflight import SingleFlight
+
+
+def test_concurrent_calls_for_one_key_share_a_single_upstream_call():
+    group = SingleFlight('test')
+    calls = []
+    started = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return 'summary'
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        leader = executor.submit(group.do, 'key', fetch)
+        started.wait(1.0)
+        followers = [executor.submit(group.do, 'key', fetch) for _ in range(4)]
+        results = [leader.result()] + [future.result() for future in followers]
+
+    assert len(calls) == 1
+    assert results[0] == ('summary', False)
+    assert all(result == ('summary', True) for result in results[1:])
+    assert group.stats()['shared'] == 4 and group.stats()['in_flight'] == 0
+
+
+def test_the_leaders_error_reaches_every_waiting_caller_and_is_not_cached():
+    group = SingleFlight('test')
+    started = threading.Event()
+
+    def failing():
+        started.set()
+        time.sleep(0.1)
+        raise ConnectionError("upstream down")
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        leader = executor.submit(group.do, 'key', failing)
+        started.wait(1.0)
+        follower = executor.submit(group.do, 'key', failing)
+        for future in (leader, follower):
+            with pytest.raises(ConnectionError):
+                future.result()
+
+    # The failure is not remembered: the next call runs again
+    assert group.do('key', lambda: 'ok') == ('ok', False)
+
+
+def test_async_callers_share_one_call():
+    group = SingleFlight('test')
+    calls = []
+
+    async def summarize():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 'summary'
+
+    async def gather():
+        return await asyncio.gather(*(group.ado('key', summarize) for _ in range(3)))
+
+    results = run_async(gather())
+
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False, True, True]
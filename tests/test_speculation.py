@@ -0,0 +1,62 @@
+import threading
+import time
+
+import pytest
+
+from utils.speculation import SpeculativeReply
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_buffered_chunks_are_replayed_before_the_remaining_ones():
+    release = threading.Event()
+
+    def generate():
+        yield "Hello"
+        release.wait(2.0)
+        yield " there"
+
+    reply = SpeculativeReply(generate)
+    assert wait_for(lambda: reply.first_chunk_at is not None)
+    release.set()
+
+    assert list(reply.stream()) == ["Hello", " there"]
+    assert reply.duration() is not None
+
+
+def test_generation_errors_are_raised_by_stream():
+    def generate():
+        yield "partial"
+        raise ConnectionError("stream dropped")
+
+    reply = SpeculativeReply(generate)
+    stream = reply.stream()
+    assert next(stream) == "partial"
+    with pytest.raises(ConnectionError):
+        next(stream)
+
+
+def test_cancel_stops_consuming_and_closes_the_provider_stream():
+    produced, closed = [], threading.Event()
+
+    def generate():
+        try:
+            for i in range(1000):
+                produced.append(i)
+                yield str(i)
+                time.sleep(0.01)
+        finally:
+            closed.set()
+
+    reply = SpeculativeReply(generate)
+    assert wait_for(lambda: produced)
+    reply.cancel()
+
+    assert closed.wait(2.0)
+    assert wait_for(lambda: reply.finished_at is not None)
+    assert len(produced) < 1000
@@ -0,0 +1,36 @@
+import time
+
+import pandas as pd
+
+from data.statement_store import StatementStore
+
+
+def statements(*periods):
+    frame = pd.DataFrame({pd.Timestamp(period): [1.0, 2.0] for period in periods}, index=['Net Income', 'Total Assets'])
+    return frame, frame.copy(), frame.copy()
+
+
+def test_announced_period_missing_from_statements_is_not_refetched_nightly(tmp_path):
+    store = StatementStore(db_path=str(tmp_path / 'statements.db'))
+    # Yahoo already announces FY2024, but the statements end with FY2023
+    store.save('AAA', *statements('2023-12-31', '2022-12-31'), 1000, probed_period=pd.Timestamp('2024-12-31'))
+
+    assert store.needs_refresh('AAA', pd.Timestamp('2024-12-31')) is None
+    assert store.needs_refresh('AAA', pd.Timestamp('2025-12-31')) == 'new period'
+
+
+def test_lagging_statements_are_retried_after_the_retry_interval(tmp_path, monkeypatch):
+    store = StatementStore(db_path=str(tmp_path / 'statements.db'), lag_retry_days=7)
+    store.save('AAA', *statements('2023-12-31', '2022-12-31'), 1000, probed_period=pd.Timestamp('2024-12-31'))
+
+    later = time.time() + 8 * 24 * 60 * 60
+    monkeypatch.setattr(time, 'time', lambda: later)
+    assert store.needs_refresh('AAA', pd.Timestamp('2024-12-31')) == 'lagging'
+
+
+def test_current_statements_are_kept(tmp_path):
+    store = StatementStore(db_path=str(tmp_path / 'statements.db'))
+    store.save('AAA', *statements('2024-12-31', '2023-12-31'), 1000, probed_period=pd.Timestamp('2024-12-31'))
+
+    assert store.needs_refresh('AAA', pd.Timestamp('2024-12-31')) is None
+    assert store.needs_refresh('BBB', pd.Timestamp('2024-12-31')) == 'new'
@@ -0,0 +1,67 @@
+from agents import agent_base
+from agents.agent_zero import AgentZero
+from pipeline.events import PipelineEvents
+from pipeline.session import SessionState
+from utils.conversation_utils import ConversationManager
+
+
+class RecordingEvents(PipelineEvents):
+    def __init__(self):
+        self.chunks = []
+
+    def on_assistant_stream(self, chunks):
+        for chunk in chunks:
+            self.chunks.append(chunk)
+        return "".join(self.chunks)
+
+
+def fake_stream(chunks, calls, closed):
+    def stream_completion(model_name, api_key, prompt, system=None, usage=None, **kwargs):
+        calls.append((prompt, system))
+        try:
+            yield from chunks
+            if usage is not None:
+                usage.update({'input': 10, 'output': len(chunks), 'cached': 0})
+        finally:
+            closed.append(True)
+    return stream_completion
+
+
+def test_reply_is_streamed_chunk_by_chunk_and_stored_once_complete(monkeypatch):
+    calls, closed = [], []
+    monkeypatch.setattr(agent_base, 'stream_completion', fake_stream(["Hello", " there", "!\n\n"], calls, closed))
+    session = SessionState(greeting=None)
+    events = RecordingEvents()
+
+    reply = ConversationManager().conversation(session, "Hi", AgentZero('gpt-4o', 'key'), events, stream=True)
+
+    assert events.chunks == ["Hello", " there", "!\n\n"]
+    assert reply == "Hello there!"
+    assert session.conversation_history[-1] == {'role': 'assistant', 'content': "Hello there!"}
+    # The mandate is sent as the stable system prefix, the client's input as the prompt
+    prompt, system = calls[0]
+    assert "Client: Hi" in prompt and system[0] == AgentZero('gpt-4o', 'key').get_mandate()
+
+
+def test_stopping_early_closes_the_provider_stream(monkeypatch):
+    calls, closed = [], []
+    monkeypatch.setattr(agent_base, 'stream_completion', fake_stream(["a", "b", "c"], calls, closed))
+
+    stream = AgentZero('gpt-4o', 'key').stream_response("Hi")
+    assert next(stream) == "a"
+    stream.close()
+
+    assert closed == [True]
+
+
+def test_models_without_a_streaming_client_answer_in_one_chunk(monkeypatch):
+    class FakePrompter:
+        def prompt_main(self, prompt):
+            return {'llm_response': "whole reply"}
+
+    monkeypatch.setattr(agent_base.model_pool, 'loader', lambda model_name, api_key: FakePrompter())
+    try:
+        agent = AgentZero('local-test-model', 'key')
+        assert list(agent.stream_response("Hi")) == ["whole reply"]
+    finally:
+        agent_base.model_pool.evict('local-test-model', 'key')
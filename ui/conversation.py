@@ -2,25 +2,26 @@
 
 import streamlit as st
 
+from pipeline.session import SessionState
+
 def initialize_conversation():
     """
-    Initializes the conversation history and risk profile report in session state.
+    Initializes the pipeline session (messages, conversation history, risk profile) in session state.
     """
-    if 'messages' not in st.session_state:
-        st.session_state['messages'] = []
-        st.session_state['messages'].append({"role": "assistant", "content": "Hi, how can I help you today?"})
-
-    if 'conversation_history' not in st.session_state:
-        st.session_state['conversation_history'] = []
+    if 'pipeline_session' not in st.session_state:
+        st.session_state['pipeline_session'] = SessionState()
 
-    if 'risk_profile_report' not in st.session_state:
-        st.session_state['risk_profile_report'] = None
+def get_pipeline_session():
+    """
+    Returns the pipeline SessionState of the current Streamlit session.
+    """
+    return st.session_state['pipeline_session']
 
 def display_conversation():
     """
     Displays the conversation history in the Streamlit app.
     """
-    for message in st.session_state['messages']:
+    for message in get_pipeline_session().messages:
         if message['role'] == 'user':
             with st.chat_message("user"):
                 st.markdown(message['content'])
@@ -1,10 +1,29 @@
 import streamlit as st
-from streamlit_lottie import st_lottie
 import json
 
+LOTTIE_PATH = "assets/lottie/Hexagone Loader.json"
+
+# Custom font (Google Fonts) and title style; the browser caches the font stylesheet across reruns
+HEADER_CSS = """
+<style>
+    @import url('https://fonts.googleapis.com/css2?family=Sitzer:wght@200&display=swap');
+
+    .custom-title {
+        font-family: 'Sitzer', sans-serif;
+        font-size: 2.5rem;
+        font-weight: 200; /* Light weight */
+        background: linear-gradient(to right, #ffc44d, white);
+        -webkit-background-clip: text;
+        -webkit-text-fill-color: transparent;
+        margin: 7px 0 0 0; /* Shift title down by 5px */
+    }
+</style>
+"""
+
+@st.cache_resource(show_spinner=False)
 def load_lottie(filepath: str):
     """
-    Load a Lottie JSON file from a given filepath.
+    Load a Lottie JSON file from a given filepath, once per process (reruns reuse the parsed animation).
     """
     with open(filepath, "r") as file:
         return json.load(file)
@@ -14,28 +33,10 @@ def display_header():
     Displays the header section of the Streamlit app, including the logo, title, and Lottie animation.
     """
     # Import custom font using Google Fonts
-    st.markdown(
-        """
-        <style>
-            @import url('https://fonts.googleapis.com/css2?family=Sitzer:wght@200&display=swap');
-
-            .custom-title {
-                font-family: 'Sitzer', sans-serif;
-                font-size: 2.5rem;
-                font-weight: 200; /* Light weight */
-                background: linear-gradient(to right, #ffc44d, white);
-                -webkit-background-clip: text;
-                -webkit-text-fill-color: transparent;
-                margin: 7px 0 0 0; /* Shift title down by 5px */
-            }
-        </style>
-        """,
-        unsafe_allow_html=True,
-    )
+    st.markdown(HEADER_CSS, unsafe_allow_html=True)
 
-    # Load the Lottie file
-    lottie_path = "assets/lottie/Hexagone Loader.json"
-    lottie_loader = load_lottie(lottie_path)
+    # Load the Lottie file (parsed once per process)
+    lottie_loader = load_lottie(LOTTIE_PATH)
 
     # Set the logo in the header navbar
     st.logo(
@@ -47,6 +48,8 @@ def display_header():
     col1, col2 = st.columns([1, 6])  # Adjust the column widths as needed
 
     with col1:
+        # Imported here so that importing the UI modules stays cheap
+        from streamlit_lottie import st_lottie
         st_lottie(lottie_loader, height=100, width=100, key="title_loader")  # Display the Lottie animation
 
     with col2:
@@ -0,0 +1,33 @@
+# ui/pipeline_events.py
+
+import streamlit as st
+
+from pipeline.events import PipelineEvents
+
+class StreamlitEvents(PipelineEvents):
+    """
+    Renders the PipelineEngine's events in the Streamlit app.
+    """
+    def status(self, message):
+        return st.spinner(message)
+
+    def on_user_message(self, text):
+        with st.chat_message("user"):
+            st.markdown(text)
+
+    def on_evaluation(self, evaluation):
+        st.write(f"**Evaluation Report from Agent One:**\n{evaluation}")
+
+    def on_risk_profile(self, report):
+        st.write(f"**Risk Profile Report from Agent Two:**\n{report}")
+
+    def on_research(self, research_summary):
+        st.write(research_summary)
+
+    def on_assistant_stream(self, chunks):
+        with st.chat_message("assistant"):
+            return st.write_stream(chunks)
+
+    def on_assistant_message(self, text):
+        with st.chat_message("assistant"):
+            st.markdown(text)
@@ -0,0 +1,49 @@
+# ui/trace_waterfall.py
+
+import streamlit as st
+
+BAR_WIDTH = 30
+SHOWN_ATTRIBUTES = ('model', 'source', 'cache', 'pool', 'label', 'ticker', 'prompt_tokens', 'cached_tokens',
+                    'completion_tokens', 'first_token_ms', 'error')
+
+def _ordered_spans(trace):
+    # Parents before children, siblings by start time
+    children = {}
+    for span in trace.spans:
+        if span is not trace:
+            children.setdefault(span.parent.span_id if span.parent else None, []).append(span)
+    ordered = []
+    stack = [trace]
+    while stack:
+        span = stack.pop()
+        ordered.append(span)
+        stack.extend(sorted(children.get(span.span_id, []), key=lambda child: child.start, reverse=True))
+    return ordered
+
+def waterfall_lines(trace):
+    """
+    Formats a finished trace as one text line per span: a bar placed on the turn's timeline, the duration,
+    the span name indented by depth and its most telling attributes.
+    """
+    total_ms = max(trace.duration_ms, 1e-3)
+    lines = []
+    for span in _ordered_spans(trace):
+        offset = int((span.start - trace.start) * 1000 / total_ms * BAR_WIDTH)
+        duration_ms = span.duration_ms or 0.0
+        length = max(int(round(duration_ms / total_ms * BAR_WIDTH)), 1)
+        offset = min(offset, BAR_WIDTH - length)
+        bar = " " * offset + "█" * length + " " * (BAR_WIDTH - offset - length)
+        attributes = " ".join(f"{key}={span.attributes[key]}" for key in SHOWN_ATTRIBUTES if key in span.attributes)
+        label = "  " * (span.depth - trace.depth) + span.name
+        lines.append(f"{bar} {duration_ms:8.1f} ms  {label}  {attributes}".rstrip())
+    return lines
+
+def display_trace_waterfall(trace):
+    """
+    Displays the spans of the latest turn as a timing waterfall in a collapsible sidebar section.
+    """
+    if trace is None or trace.duration_ms is None:
+        return
+
+    with st.sidebar.expander(f"⏱️ Last turn timing ({trace.duration_ms / 1000:.2f}s)", expanded=False):
+        st.code("\n".join(waterfall_lines(trace)), language=None)
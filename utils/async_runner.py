@@ -0,0 +1,97 @@
+'''
+🔁 AsyncRunner Class - Process-Wide Event Loop for Asynchronous I/O
+------------------------------------------------------------------
+Technical Overview:
+The Streamlit script thread, the pipeline engine and the batch helpers are all synchronous, while the
+pooled asynchronous HTTP clients (agents/llm_clients.py) are bound to the event loop they were created
+on. The AsyncRunner owns one event loop running forever on a daemon thread, started on first use. Every
+asynchronous client of the process is created and used on this loop, so their keep-alive connections
+(and TLS sessions) are reused by every call, every session and every rerun. Synchronous code hands a
+coroutine to `run`, which blocks until the result is ready; `submit` returns a concurrent Future instead.
+Coroutines run in a copy of the caller's context, so tracing spans keep their parent.
+
+In Simple Terms:
+The AsyncRunner is a switchboard operator who keeps the lines to the model providers open. Anyone can hand
+them several questions at once, and they ask them all over the open lines instead of dialing each time.
+
+Attributes:
+- name: Name of the event loop thread.
+
+Methods:
+- loop: Returns the running event loop, starting its thread on first use.
+- submit: Schedules a coroutine on the loop and returns a concurrent.futures.Future.
+- run: Runs a coroutine on the loop and returns its result (blocking the calling thread).
+- run_async: Runs a coroutine on the process-wide AsyncRunner (Singleton pattern).
+'''
+
+import asyncio
+import concurrent.futures
+import contextvars
+import threading
+
+
+class AsyncRunner:
+    def __init__(self, name="async-io"):
+        self.name = name
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def loop(self):
+        with self._lock:
+            if self._loop is None:
+                ready = threading.Event()
+                self._thread = threading.Thread(target=self._serve, args=(ready,), name=self.name, daemon=True)
+                self._thread.start()
+                ready.wait()
+            return self._loop
+
+    def _serve(self, ready):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        ready.set()
+        self._loop.run_forever()
+
+    def submit(self, coroutine):
+        loop = self.loop()
+        if threading.current_thread() is self._thread:
+            coroutine.close()
+            raise RuntimeError("AsyncRunner.submit called from its own event loop; await the coroutine instead")
+
+        future = concurrent.futures.Future()
+        context = contextvars.copy_context()
+
+        def start():
+            # The task copies the current context, which is the caller's inside context.run
+            task = context.run(loop.create_task, coroutine)
+            task.add_done_callback(lambda task: _copy_result(task, future))
+            future.add_done_callback(lambda future: future.cancelled() and loop.call_soon_threadsafe(task.cancel))
+
+        loop.call_soon_threadsafe(start)
+        return future
+
+    def run(self, coroutine, timeout=None):
+        future = self.submit(coroutine)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+
+def _copy_result(task, future):
+    if future.done():
+        return
+    if task.cancelled():
+        future.cancel()
+    elif task.exception() is not None:
+        future.set_exception(task.exception())
+    else:
+        future.set_result(task.result())
+
+
+# Process-wide runner owning the event loop of the pooled asynchronous clients (Singleton pattern)
+async_runner = AsyncRunner()
+
+def run_async(coroutine, timeout=None):
+    return async_runner.run(coroutine, timeout)
@@ -0,0 +1,140 @@
+'''
+🧊 CompaniesDataset Class - Columnar, Memory-Mapped Companies Data for Advisory App
+----------------------------------------------------------------------------------
+Technical Overview:
+The CompaniesDataset class reads a binary, columnar copy of companies.csv stored in the Arrow IPC file
+format (companies.arrow), which piotroski_calc.py writes next to the CSV. The file is uncompressed so it
+can be memory-mapped: opening it only reads the schema and footer, and a column's pages are touched only
+when that column is used. Readers ask for the columns they need (projection), so screening by f_score
+reads name, ticker and f_score and never touches the rest. The long free-text descriptions are written to
+a separate file (companies_descriptions.arrow) and are only opened by `descriptions`. Compact dtypes are
+used: `theme` is dictionary-encoded (categorical), ratios are float32, f_score is int8. The raw
+fundamentals stay float64, because float32 would round away differences the F-score criteria compare.
+
+In Simple Terms:
+The CompaniesDataset is a compact, ready-to-read version of the company spreadsheet. Instead of reading
+the whole spreadsheet as text every time, the app opens only the columns it needs, straight from disk.
+
+Attributes:
+- arrow_path: Path of the columnar companies file.
+- descriptions_path: Path of the separate descriptions file.
+
+Methods:
+- build_companies_dataset: Writes the columnar files from companies.csv.
+- is_current: Tells whether the columnar file exists and is at least as recent as the CSV.
+- ensure_current: Rebuilds the columnar files when the CSV has changed since they were written.
+- read: Returns the requested columns as a pyarrow Table (memory-mapped, zero-copy).
+- screen: Returns name, ticker and f_score for companies with an f_score above a threshold, in CSV order.
+- descriptions: Returns the descriptions of the given tickers.
+'''
+
+import os
+
+# pandas and pyarrow take a few hundred milliseconds to import, so they are imported on first use
+# rather than when the app starts
+pa = None
+pc = None
+_pyarrow_checked = False
+
+def _import_pyarrow():
+    """Imports pyarrow on first use; returns False when it is not installed."""
+    global pa, pc, _pyarrow_checked
+    if not _pyarrow_checked:
+        try:
+            import pyarrow
+            import pyarrow.compute
+            pa, pc = pyarrow, pyarrow.compute
+        except ImportError:
+            pass
+        _pyarrow_checked = True
+    return pa is not None
+
+DESCRIPTION_COLUMN = 'description'
+RATIO_COLUMNS = [
+    'roa_t', 'roa_t1', 'currentRatio_t', 'currentRatio_t1',
+    'grossMargin_t', 'grossMargin_t1', 'assetTurnover_t', 'assetTurnover_t1',
+]
+
+def default_paths(csv_path):
+    base = os.path.splitext(csv_path)[0]
+    return base + ".arrow", base + "_descriptions.arrow"
+
+def _write_ipc(table, path):
+    # Write to a temporary file first so readers never map a half-written file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+def build_companies_dataset(csv_path, arrow_path=None, descriptions_path=None):
+    """Writes the columnar companies file and the separate descriptions file from the CSV."""
+    default_arrow_path, default_descriptions_path = default_paths(csv_path)
+    arrow_path = arrow_path or default_arrow_path
+    descriptions_path = descriptions_path or default_descriptions_path
+
+    import pandas as pd
+    if not _import_pyarrow():
+        raise ImportError("pyarrow is required to build the columnar companies dataset")
+
+    companies = pd.read_csv(csv_path)
+    companies['position'] = range(len(companies))
+
+    descriptions = companies[['position', 'ticker', DESCRIPTION_COLUMN]] if DESCRIPTION_COLUMN in companies else None
+    companies = companies.drop(columns=DESCRIPTION_COLUMN, errors='ignore')
+
+    if 'theme' in companies:
+        companies['theme'] = companies['theme'].astype('category')
+    for column in RATIO_COLUMNS:
+        if column in companies:
+            companies[column] = companies[column].astype('float32')
+    if 'f_score' in companies:
+        companies['f_score'] = pd.to_numeric(companies['f_score'], errors='coerce').astype('Int8')
+    companies['position'] = companies['position'].astype('int32')
+
+    _write_ipc(pa.Table.from_pandas(companies, preserve_index=False), arrow_path)
+    if descriptions is not None:
+        _write_ipc(pa.Table.from_pandas(descriptions, preserve_index=False), descriptions_path)
+    return arrow_path
+
+
+class CompaniesDataset:
+    def __init__(self, csv_path, arrow_path=None, descriptions_path=None):
+        default_arrow_path, default_descriptions_path = default_paths(csv_path)
+        self.csv_path = csv_path
+        self.arrow_path = arrow_path or default_arrow_path
+        self.descriptions_path = descriptions_path or default_descriptions_path
+
+    def is_current(self):
+        if not _import_pyarrow() or not os.path.exists(self.arrow_path):
+            return False
+        return os.stat(self.arrow_path).st_mtime_ns >= os.stat(self.csv_path).st_mtime_ns
+
+    def ensure_current(self):
+        """Rebuilds the columnar files when the CSV is newer. Returns False when pyarrow is not installed."""
+        if not _import_pyarrow():
+            return False
+        if not self.is_current():
+            build_companies_dataset(self.csv_path, self.arrow_path, self.descriptions_path)
+        return True
+
+    def _read(self, path, columns=None):
+        _import_pyarrow()
+        with pa.memory_map(path, 'r') as source:
+            table = pa.ipc.open_file(source).read_all()
+        return table.select(columns) if columns else table
+
+    def read(self, columns=None):
+        return self._read(self.arrow_path, columns)
+
+    def screen(self, min_f_score):
+        table = self.read(['name', 'ticker', 'f_score'])
+        table = table.filter(pc.greater(table['f_score'], min_f_score))
+        return table.to_pylist()
+
+    def descriptions(self, tickers):
+        if not os.path.exists(self.descriptions_path):
+            return {}
+        table = self._read(self.descriptions_path, ['ticker', DESCRIPTION_COLUMN])
+        table = table.filter(pc.is_in(table['ticker'], value_set=pa.array(list(tickers), pa.string())))
+        return dict(zip(table['ticker'].to_pylist(), table[DESCRIPTION_COLUMN].to_pylist()))
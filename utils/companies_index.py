@@ -0,0 +1,160 @@
+'''
+🗂️ CompaniesIndex Class - Persistent Companies Store for Advisory App
+---------------------------------------------------------------------
+Technical Overview:
+The CompaniesIndex class keeps the contents of companies.csv in a local SQLite database with indexes on
+`f_score` and `ticker`, so screening for strong companies is an indexed query instead of a reparse of the
+whole CSV. The CSV is ingested once; afterwards, `sync` only looks at the file's modification time and
+size. When the file has changed, every row is hashed and only rows whose content hash differs from the
+stored one are upserted; rows that disappeared from the end of the file are deleted. Rows are keyed by
+their position in the CSV because tickers (and even whole rows) are not unique in the source data, and
+the position also preserves the CSV order that the research summary relies on.
+
+pyarrow is a requirement of the app, so the research summary normally screens the columnar
+CompaniesDataset; this index is the fallback it uses when pyarrow cannot be imported (a broken or minimal
+install), so screening keeps working without reparsing the CSV on every request.
+
+In Simple Terms:
+The CompaniesIndex is the app's filing cabinet for the company list. It files the CSV once, and only
+re-files the pages that changed when the CSV is updated, so looking up the best-scoring companies is fast.
+
+Attributes:
+- csv_path: Path of the source CSV file.
+- db_path: Path of the SQLite database holding the index.
+
+Methods:
+- sync: Brings the index up to date with the CSV, returning the number of rows written or deleted.
+- screen: Returns name, ticker and f_score for companies with an f_score above a threshold, in CSV order.
+- get_companies_index: Returns the shared index for a CSV path (one per path and process).
+'''
+
+import csv
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS companies (
+    position INTEGER PRIMARY KEY,
+    name TEXT,
+    ticker TEXT,
+    theme TEXT,
+    f_score NUMERIC,
+    record TEXT,
+    content_hash TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_companies_f_score ON companies (f_score);
+CREATE INDEX IF NOT EXISTS idx_companies_ticker ON companies (ticker);
+CREATE TABLE IF NOT EXISTS sync_state (
+    source TEXT PRIMARY KEY,
+    mtime_ns INTEGER,
+    size INTEGER
+);
+"""
+
+class CompaniesIndex:
+    def __init__(self, csv_path, db_path=None):
+        self.csv_path = csv_path
+        self.db_path = db_path or os.path.splitext(csv_path)[0] + "_index.db"
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def sync(self):
+        stat = os.stat(self.csv_path)
+        with self._lock, self._connect() as conn:
+            state = conn.execute(
+                "SELECT mtime_ns, size FROM sync_state WHERE source = ?", (self.csv_path,)
+            ).fetchone()
+            if state == (stat.st_mtime_ns, stat.st_size):
+                return 0
+
+            # Take the write lock before reading so concurrent processes do not sync twice
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                state = conn.execute(
+                    "SELECT mtime_ns, size FROM sync_state WHERE source = ?", (self.csv_path,)
+                ).fetchone()
+                if state == (stat.st_mtime_ns, stat.st_size):
+                    conn.execute("COMMIT")
+                    return 0
+                changed = self._ingest(conn, stat)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return changed
+
+    def _ingest(self, conn, stat):
+        existing = dict(conn.execute("SELECT position, content_hash FROM companies"))
+
+        upserts = []
+        with open(self.csv_path, newline='', encoding='utf-8-sig') as f:
+            rows = list(csv.DictReader(f, delimiter=','))
+        for position, row in enumerate(rows):
+            record = json.dumps(row, sort_keys=True)
+            content_hash = hashlib.sha1(record.encode('utf-8')).hexdigest()
+            if existing.get(position) == content_hash:
+                continue
+            f_score = row.get('f_score')
+            upserts.append((
+                position,
+                row.get('name'),
+                row.get('ticker'),
+                row.get('theme'),
+                f_score if f_score not in (None, '') else None,
+                record,
+                content_hash,
+            ))
+
+        conn.executemany(
+            """
+            INSERT INTO companies (position, name, ticker, theme, f_score, record, content_hash)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (position) DO UPDATE SET
+                name = excluded.name,
+                ticker = excluded.ticker,
+                theme = excluded.theme,
+                f_score = excluded.f_score,
+                record = excluded.record,
+                content_hash = excluded.content_hash
+            """,
+            upserts,
+        )
+        deleted = conn.execute("DELETE FROM companies WHERE position >= ?", (len(rows),)).rowcount
+        conn.execute(
+            "INSERT OR REPLACE INTO sync_state (source, mtime_ns, size) VALUES (?, ?, ?)",
+            (self.csv_path, stat.st_mtime_ns, stat.st_size),
+        )
+        return len(upserts) + deleted
+
+    def screen(self, min_f_score):
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT name, ticker, f_score FROM companies WHERE f_score > ? ORDER BY position",
+                (min_f_score,),
+            ).fetchall()
+        return [{'name': name, 'ticker': ticker, 'f_score': f_score} for name, ticker, f_score in rows]
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def get_companies_index(csv_path):
+    """Returns the process-wide CompaniesIndex for a CSV path."""
+    csv_path = os.path.abspath(csv_path)
+    with _indexes_lock:
+        if csv_path not in _indexes:
+            _indexes[csv_path] = CompaniesIndex(csv_path)
+        return _indexes[csv_path]
@@ -0,0 +1,160 @@
+'''
+🧱 ContextBuilder Class - Token-Budgeted Conversation Context for Agents
+-----------------------------------------------------------------------
+Technical Overview:
+The session keeps the full conversation history, which grows without bound over a long advisory session.
+The ContextBuilder turns that history into a transcript that fits a per-agent token budget: the most
+recent turns are kept verbatim, and older turns are folded into a rolling summary. The summary is cached
+in a small state dict (kept per agent in the session) together with the position up to which it has
+been built, so each call only folds in the turns that have just fallen out of the verbatim window
+instead of re-summarizing the whole conversation. Callers that have already consumed the start of the
+history (Agent Two's incremental profile updates) pass `verbatim_from`: messages before it only ever
+appear in the summary. Tokens are counted with tiktoken when it is installed
+and estimated from the character count otherwise, so no network call is ever needed. The default
+summarizer is extractive and local (the first sentence of each turn); an LLM-backed summarizer can be
+plugged in through the `summarizer` argument.
+
+In Simple Terms:
+The ContextBuilder is like taking minutes in a long meeting. The last few exchanges are kept word for
+word, and everything before that is condensed into short notes, so the agents always get a conversation
+of manageable size.
+
+Attributes:
+- budget_tokens: Maximum number of tokens the transcript may use.
+- summary_share: Fraction of the budget reserved for the rolling summary.
+- min_recent: Number of most recent turns always kept verbatim (trimmed only if they alone exceed the budget).
+- roles: Conversation roles included in the transcript and their labels.
+- summarizer: Callable (previous_summary, turns) -> new summary.
+
+Methods:
+- build: Returns the budgeted transcript for a conversation history, updating the cached summary.
+- count_tokens: Counts the tokens in a text.
+- extractive_summarizer: Default local summarizer.
+'''
+
+import math
+import re
+
+DEFAULT_ROLES = {'user': 'User', 'assistant': 'Assistant'}
+
+# Per-agent transcript budgets in tokens
+CONTEXT_BUDGETS = {
+    'agent_two': 1500,
+}
+
+_encoding = None
+_encoding_loaded = False
+
+def _get_encoding():
+    # Loaded on first use: importing tiktoken and loading the BPE ranks slows down app start
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoding = None
+        _encoding_loaded = True
+    return _encoding
+
+def count_tokens(text):
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    # Roughly four characters per token for English text
+    return math.ceil(len(text) / 4)
+
+def _truncate_to_tokens(text, max_tokens):
+    if count_tokens(text) <= max_tokens:
+        return text
+    words = text.split()
+    while len(words) > 1 and count_tokens(" ".join(words)) > max_tokens:
+        words = words[:int(len(words) * 0.9)] if len(words) > 10 else words[:-1]
+    return " ".join(words) + " …"
+
+def _trim_summary(summary, max_tokens):
+    # The oldest summary lines are dropped first
+    lines = summary.split("\n")
+    while len(lines) > 1 and count_tokens("\n".join(lines)) > max_tokens:
+        lines.pop(0)
+    return _truncate_to_tokens("\n".join(lines), max_tokens)
+
+def extractive_summarizer(previous_summary, turns, max_words=25):
+    """Folds `turns` into the summary by keeping the first sentence of each, capped at `max_words` words."""
+    lines = [previous_summary] if previous_summary else []
+    for label, content in turns:
+        first_sentence = re.split(r"(?<=[.!?])\s", content.strip(), maxsplit=1)[0]
+        words = first_sentence.split()
+        if len(words) > max_words:
+            first_sentence = " ".join(words[:max_words]) + " …"
+        lines.append(f"- {label}: {first_sentence}")
+    return "\n".join(lines)
+
+
+class ContextBuilder:
+    def __init__(self, budget_tokens, summary_share=0.3, min_recent=2, roles=None, summarizer=None):
+        self.budget_tokens = budget_tokens
+        self.summary_share = summary_share
+        self.min_recent = min_recent
+        self.roles = roles or DEFAULT_ROLES
+        self.summarizer = summarizer or extractive_summarizer
+
+    def build(self, conversation_history, state, verbatim_from=0):
+        """
+        Returns the transcript of `conversation_history` within the token budget.
+
+        Args:
+            conversation_history (list): Messages with 'role' and 'content'.
+            state (dict): Per-agent cache for the rolling summary; updated in place.
+            verbatim_from (int): Index of the first message that may be kept verbatim; earlier messages are
+                folded into the summary.
+        """
+        turns = [
+            (self.roles[message['role']], message['content'])
+            for message in conversation_history
+            if message['role'] in self.roles
+        ]
+        first_verbatim = sum(message['role'] in self.roles for message in conversation_history[:verbatim_from])
+        lines = [f"{label}: {content}\n" for label, content in turns]
+
+        # Start the verbatim window where the cached summary ends, so summarized turns stay summarized
+        summarized_upto = min(state.get('summarized_upto', 0), len(turns))
+        summary = state.get('summary', "") if summarized_upto else ""
+        summary_budget = int(self.budget_tokens * self.summary_share)
+
+        # Reserve room for the summary as soon as the history no longer fits verbatim
+        verbatim_budget = self.budget_tokens
+        if summary or first_verbatim > summarized_upto or \
+                sum(count_tokens(line) for line in lines[summarized_upto:]) > verbatim_budget:
+            verbatim_budget -= summary_budget
+
+        start = len(turns)
+        used = 0
+        while start > max(summarized_upto, first_verbatim):
+            cost = count_tokens(lines[start - 1])
+            if used + cost > verbatim_budget and len(turns) - start >= self.min_recent:
+                break
+            used += cost
+            start -= 1
+
+        if start > summarized_upto:
+            # Fold only the turns that just left the verbatim window into the rolling summary
+            summary = self.summarizer(summary, turns[summarized_upto:start])
+            summarized_upto = start
+
+        summary = _trim_summary(summary, summary_budget) if summary else ""
+        state['summary'] = summary
+        state['summarized_upto'] = summarized_upto
+
+        # Only the always-kept recent turns can exceed the budget; shorten them evenly if so
+        recent = lines[summarized_upto:]
+        if recent and sum(count_tokens(line) for line in recent) > verbatim_budget:
+            per_line = max(verbatim_budget // len(recent), 1)
+            recent = [_truncate_to_tokens(line.rstrip("\n"), per_line) + "\n" for line in recent]
+
+        transcript = "".join(recent)
+        if summary:
+            transcript = f"Summary of the earlier conversation:\n{summary}\n\nRecent conversation:\n{transcript}"
+        return transcript
@@ -5,9 +5,10 @@ Technical Overview:
 The ConversationManager class manages the flow of dialogue between the user and AgentZero. It combines 
 user input, optional report summaries, and risk profile reports to generate a coherent assistant response. 
 The conversation method retrieves the latest risk profile report, if available, and passes relevant context 
-to AgentZero to generate a response. The response is then cleaned, stored in session state, and displayed 
-on the interface, ensuring continuity and consistency in user interactions. This class helps centralize 
-dialogue management, facilitating clear communication within the app.
+to AgentZero to generate a response. The response is then cleaned, stored in the conversation's SessionState, 
+and reported through the pipeline events (which the Streamlit app renders), ensuring continuity and 
+consistency in user interactions. This class helps centralize dialogue management, facilitating clear 
+communication within the app.
 
 In Simple Terms:
 The ConversationManager is like the chat handler. It takes what the user says, combines it with any extra 
@@ -15,31 +16,44 @@ information like risk reports, and gets a response from AgentZero. This response
 the chat history, and shown to the user, making sure the conversation feels smooth and on-topic.
 
 Attributes:
-- None specific to this class; it relies on session state for data storage.
+- None specific to this class; it reads and writes the SessionState passed to each call.
 
 Methods:
 - conversation: Manages the chat flow by combining user input, reports, and agent responses, cleaning 
-  the output, and saving it to the chat history for seamless interaction.
+  the output, and saving it to the chat history for seamless interaction. With stream=True the response 
+  is handed token by token to events.on_assistant_stream and cleaned once it is complete; a response_stream 
+  that is already running (e.g. a speculative reply) can be passed in instead of starting a new generation.
 '''
 
 import re
-import streamlit as st
+
+from pipeline.events import PipelineEvents
 
 class ConversationManager:
-    def conversation(self, user_input, agent_zero, report_summary=None):
+    def conversation(self, session, user_input, agent_zero, events=None, report_summary=None, stream=False, response_stream=None):
+        events = events or PipelineEvents()
         # Get risk profile report if available
-        risk_profile_report = st.session_state.get('risk_profile_report', None)
-        
-        # Generate assistant response
-        assistant_response = agent_zero.generate_response(user_input, report_summary, risk_profile_report)
+        risk_profile_report = session.risk_profile_report
         
-        # Clean up the response
-        assistant_response = re.sub("[\n\n]", "\n", assistant_response).strip()
-        st.session_state['messages'].append({"role": "assistant", "content": assistant_response})
-        with st.chat_message("assistant"):
-            st.markdown(assistant_response)
+        if stream or response_stream is not None:
+            # Use an already running (speculative) stream if one is given
+            if response_stream is None:
+                response_stream = agent_zero.stream_response(user_input, report_summary, risk_profile_report)
+
+            # Render tokens as they arrive, then post-process the finished text
+            assistant_response = events.on_assistant_stream(response_stream)
+            assistant_response = re.sub("[\n\n]", "\n", assistant_response).strip()
+            session.messages.append({"role": "assistant", "content": assistant_response})
+        else:
+            # Generate assistant response
+            assistant_response = agent_zero.generate_response(user_input, report_summary, risk_profile_report)
+            
+            # Clean up the response
+            assistant_response = re.sub("[\n\n]", "\n", assistant_response).strip()
+            session.messages.append({"role": "assistant", "content": assistant_response})
+            events.on_assistant_message(assistant_response)
 
         # Append Agent Zero's response to conversation history
-        st.session_state['conversation_history'].append({"role": "assistant", "content": assistant_response})
+        session.conversation_history.append({"role": "assistant", "content": assistant_response})
 
         return assistant_response
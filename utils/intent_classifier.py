@@ -0,0 +1,264 @@
+'''
+🧭 IntentClassifier Class - Local Fast Path for Agent One's Evaluation
+---------------------------------------------------------------------
+Technical Overview:
+Agent One only ever answers with one of three labels: 'N' (general conversation), 'R' (answer to a risk
+profile question) or 'Y' (request for equity investment advice). The IntentClassifier is a small,
+CPU-only multinomial logistic regression over word unigrams and bigrams (L2-regularized, trained by
+full-batch gradient descent with numpy on a sparse representation of the inputs: only the (row, feature)
+pairs that are set, so memory grows with the number of tokens rather than texts times vocabulary) that
+predicts the same labels locally in microseconds. It is trained on the labelled utterances in
+data/agent_one_utterances.csv plus the most recent LLM decisions logged to data/agent_one_decisions.jsonl
+(at most `MAX_LOGGED_PER_LABEL` per label, newest first), so training time on the first turn of a
+process stays bounded while the fast path keeps improving as the app is used.
+
+User messages are personal data, so the decision log only stores a hash of the input unless the
+operator opts in with AGENT_ONE_STORE_INPUTS=1; only logged texts can be learned from. Entries older than
+DECISION_RETENTION_DAYS are pruned from the log when the classifier is trained.
+
+A probability is only useful as a confidence if it is calibrated, so `fit` cross-validates the model over
+`folds` folds and fits a temperature to the held-out scores (minimizing their log loss); predictions
+report the tempered probability. On top of the confidence threshold AgentOne applies, a label is only
+returned when at least `min_coverage` of the input's words are known to the model (an unknown word such
+as a negation or an asset class can change the meaning) and the top label beats the runner-up by at least
+`min_margin`; otherwise the label is None and the input goes to the LLM. tests/test_intent_classifier.py
+measures the agreement of the local decisions with the LLM's labels on the held-out utterances in
+data/agent_one_heldout.csv.
+
+In Simple Terms:
+The IntentClassifier is a quick first reader. When a message is obviously small talk, a risk answer or
+a request for advice, it says so immediately; when it is unsure, or the message uses words it has never
+seen, it asks the LLM, and it learns from the LLM's answer for next time.
+
+Attributes:
+- l2: L2 regularization strength of the weights.
+- labels: The labels the classifier knows about.
+- min_coverage: Minimum share of the input's words known to the model for a local label.
+- min_margin: Minimum calibrated probability gap between the top label and the runner-up.
+- folds: Cross-validation folds used to calibrate the temperature.
+- temperature: Factor applied to the scores before the softmax, fitted by fit.
+
+Methods:
+- fit: Trains the model on texts and labels, then calibrates its temperature on held-out folds.
+- predict: Returns (label, confidence) for a text; the label is None when no token is known, too few words
+  are known or the top label does not win by a clear margin.
+- log_decision: Appends a decision to the decision log (the input itself only when STORE_DECISION_TEXTS).
+- stats: Returns how many turns were decided locally, from the agent response cache, or by the LLM.
+- load_training_data: Returns the seed utterances plus the most recent logged LLM decisions per label.
+- prune_decision_log: Drops decision log entries older than the retention period.
+- get_intent_classifier: Returns the process-wide classifier, trained on first use.
+'''
+
+import csv
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter, deque
+
+TRAINING_PATH = os.path.join("data", "agent_one_utterances.csv")
+DECISION_LOG_PATH = os.path.join("data", "agent_one_decisions.jsonl")
+# Raw user messages are only written to the decision log when the operator opts in
+STORE_DECISION_TEXTS = os.environ.get("AGENT_ONE_STORE_INPUTS") == "1"
+DECISION_RETENTION_DAYS = 30
+# Logged decisions used for training, per label, so first-turn training does not grow with the log
+MAX_LOGGED_PER_LABEL = 500
+
+# Temperatures tried by the calibration, from very flat to sharpened probabilities
+CALIBRATION_TEMPERATURES = [round(0.1 * step, 1) for step in range(1, 31)]
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+
+def tokenize(text):
+    words = _TOKEN_PATTERN.findall(text.lower())
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+def _softmax(scores, temperature):
+    best = max(scores)
+    weights = [math.exp((score - best) * temperature) for score in scores]
+    norm = sum(weights)
+    return [weight / norm for weight in weights]
+
+
+class IntentClassifier:
+    def __init__(self, l2=0.001, min_coverage=0.9, min_margin=0.4, folds=5, epochs=300, learning_rate=0.5):
+        self.l2 = l2
+        self.min_coverage = min_coverage
+        self.min_margin = min_margin
+        self.folds = folds
+        self.epochs = epochs
+        self.learning_rate = learning_rate
+        self.temperature = 1.0
+        self.labels = []
+        self._features = {}
+        self._weights = None
+        self._bias = None
+        self._lock = threading.Lock()
+        self._stats = Counter()
+
+    def fit(self, texts, labels, calibrate=True):
+        import numpy as np
+
+        self.labels = sorted(set(labels))
+        self._features = {}
+        for text in texts:
+            for token in tokenize(text):
+                self._features.setdefault(token, len(self._features))
+
+        # Sparse binary inputs: the (row, feature) pairs that are set
+        pairs = [(row, self._features[token]) for row, text in enumerate(texts) for token in set(tokenize(text))]
+        rows = np.array([row for row, _ in pairs], dtype=np.int64)
+        columns = np.array([feature for _, feature in pairs], dtype=np.int64)
+        targets = np.zeros((len(texts), len(self.labels)))
+        targets[np.arange(len(labels)), [self.labels.index(label) for label in labels]] = 1.0
+
+        weights = np.zeros((len(self._features), len(self.labels)))
+        bias = np.zeros(len(self.labels))
+        scores = np.empty((len(texts), len(self.labels)))
+        gradient = np.empty_like(weights)
+        for _ in range(self.epochs):
+            for label in range(len(self.labels)):
+                scores[:, label] = np.bincount(rows, weights=weights[columns, label], minlength=len(texts))
+            scores += bias
+            probabilities = np.exp(scores - scores.max(axis=1, keepdims=True))
+            probabilities /= probabilities.sum(axis=1, keepdims=True)
+            error = (probabilities - targets) / len(texts)
+            for label in range(len(self.labels)):
+                gradient[:, label] = np.bincount(columns, weights=error[rows, label], minlength=len(self._features))
+            weights -= self.learning_rate * (gradient + self.l2 * weights)
+            bias -= self.learning_rate * error.sum(axis=0)
+
+        # Per-token weight rows as plain lists, so predictions do not pay for numpy
+        self._weights = weights.tolist()
+        self._bias = bias.tolist()
+        self.temperature = self._calibrate(texts, labels) if calibrate else 1.0
+        return self
+
+    def _calibrate(self, texts, labels):
+        # Held-out scores of every training text, from a model fitted on the other folds
+        held_out = []
+        for fold in range(self.folds):
+            train = [i for i in range(len(texts)) if i % self.folds != fold]
+            model = IntentClassifier(self.l2, folds=self.folds, epochs=self.epochs, learning_rate=self.learning_rate)
+            model.fit([texts[i] for i in train], [labels[i] for i in train], calibrate=False)
+            for i in range(fold, len(texts), self.folds):
+                scores = model._scores(tokenize(texts[i]))
+                if scores is not None and labels[i] in model.labels:
+                    held_out.append((scores, model.labels.index(labels[i])))
+        if not held_out:
+            return 1.0
+
+        def log_loss(temperature):
+            return -sum(math.log(max(_softmax(scores, temperature)[label], 1e-12)) for scores, label in held_out)
+
+        return min(CALIBRATION_TEMPERATURES, key=log_loss)
+
+    def _scores(self, tokens):
+        known = [self._features[token] for token in set(tokens) if token in self._features]
+        if not known:
+            return None
+        return [bias + sum(self._weights[feature][column] for feature in known)
+                for column, bias in enumerate(self._bias)]
+
+    def predict(self, text):
+        tokens = tokenize(text)
+        scores = self._scores(tokens)
+        if scores is None:
+            return None, 0.0
+
+        probabilities = sorted(zip(_softmax(scores, self.temperature), self.labels), reverse=True)
+        confidence, best = probabilities[0]
+        runner_up = probabilities[1][0] if len(probabilities) > 1 else 0.0
+
+        words = [token for token in tokens if ' ' not in token]
+        coverage = sum(word in self._features for word in words) / len(words)
+        if coverage < self.min_coverage or confidence - runner_up < self.min_margin:
+            return None, confidence
+        return best, confidence
+
+    def log_decision(self, text, label, source, confidence=None, log_path=DECISION_LOG_PATH, store_text=None):
+        store_text = STORE_DECISION_TEXTS if store_text is None else store_text
+        decision = {"ts": time.time(), "label": label, "source": source, "confidence": confidence}
+        if store_text:
+            decision["text"] = text
+        else:
+            decision["text_sha256"] = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        with self._lock:
+            self._stats[source] += 1
+            with open(log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(decision) + "\n")
+
+    def stats(self):
+        with self._lock:
+            local, cache, llm = self._stats['local'], self._stats['cache'], self._stats['llm']
+        total = local + cache + llm
+        return {'local': local, 'cache': cache, 'llm': llm, 'skip_rate': (local + cache) / total if total else 0.0}
+
+
+def _read_decisions(decision_log_path):
+    if not os.path.exists(decision_log_path):
+        return
+    with open(decision_log_path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+def load_training_data(training_path=TRAINING_PATH, decision_log_path=DECISION_LOG_PATH,
+                       max_per_label=MAX_LOGGED_PER_LABEL, retention_days=DECISION_RETENTION_DAYS):
+    """
+    Returns (texts, labels) from the seed utterances and, per label, the `max_per_label` most recent LLM
+    decisions of the retention period whose text was logged (a repeated text counts once, with its latest label).
+    """
+    texts, labels = [], []
+    with open(training_path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            texts.append(row['text'])
+            labels.append(row['label'])
+
+    cutoff = time.time() - retention_days * 24 * 60 * 60
+    latest = {}
+    for decision in _read_decisions(decision_log_path):
+        if decision.get('source') == 'llm' and decision.get('label') and decision.get('text') \
+                and decision.get('ts', 0) >= cutoff:
+            latest.pop(decision['text'], None)  # re-inserted last, so dict order stays oldest to newest
+            latest[decision['text']] = decision['label']
+
+    recent = {}
+    for text, label in latest.items():
+        recent.setdefault(label, deque(maxlen=max_per_label)).append(text)
+    for label, label_texts in recent.items():
+        texts.extend(label_texts)
+        labels.extend([label] * len(label_texts))
+    return texts, labels
+
+def prune_decision_log(decision_log_path=DECISION_LOG_PATH, retention_days=DECISION_RETENTION_DAYS):
+    """Rewrites the decision log without the entries older than `retention_days`; returns how many were dropped."""
+    if not os.path.exists(decision_log_path):
+        return 0
+    cutoff = time.time() - retention_days * 24 * 60 * 60
+    decisions = list(_read_decisions(decision_log_path))
+    kept = [decision for decision in decisions if decision.get('ts', 0) >= cutoff]
+    if len(kept) < len(decisions):
+        tmp_path = f"{decision_log_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(decision) + "\n" for decision in kept)
+        os.replace(tmp_path, decision_log_path)
+    return len(decisions) - len(kept)
+
+
+_classifier = None
+_classifier_lock = threading.Lock()
+
+def get_intent_classifier():
+    """Returns the process-wide IntentClassifier, trained on first use (after pruning expired log entries)."""
+    global _classifier
+    with _classifier_lock:
+        if _classifier is None:
+            prune_decision_log()
+            _classifier = IntentClassifier().fit(*load_training_data())
+        return _classifier
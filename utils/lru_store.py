@@ -0,0 +1,145 @@
+'''
+🧮 LRUStore Class - Bounded Persistent Key-Value Store with LRU Eviction
+-----------------------------------------------------------------------
+Technical Overview:
+The LRUStore class is a small key-value store on top of SQLite, shared by the memoization layers of the
+app (summarized research reports, agent responses). Values are JSON documents stored under a namespace
+and a string key (usually a content hash). Every hit updates the entry's last-used time and hit count;
+when a namespace grows beyond `max_entries`, the least recently used entries are deleted. An optional
+`ttl` expires entries a fixed time after they were written. Because the store lives in a SQLite file, it
+is shared by every process of the app on the same machine. Hit and miss counters are kept per process
+for monitoring, next to the per-entry hit counts stored in the database.
+
+In Simple Terms:
+The LRUStore is a notebook of answers the app has already worked out. When the same question comes up
+again, the answer is read from the notebook; when the notebook is full, the answers that have not been
+looked at for the longest time are torn out.
+
+Attributes:
+- db_path: Path of the SQLite database.
+- namespace: Name separating this store's entries from other users of the same database.
+- max_entries: Maximum number of entries kept in the namespace.
+- ttl: Optional lifetime of an entry in seconds.
+
+Methods:
+- get: Returns the value for a key, or None on a miss.
+- set: Stores a value, evicting the least recently used entries if needed.
+- delete / clear: Remove one or all entries of the namespace.
+- stats: Returns hit/miss counters, the hit rate and the number of stored entries.
+- content_key: Returns a stable sha256 key for a JSON-serializable value.
+'''
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS lru_entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS idx_lru_entries_last_used ON lru_entries (namespace, last_used);
+"""
+
+def content_key(*parts):
+    """Hashes JSON-serializable parts into a key; dict ordering and whitespace do not change the key."""
+    canonical = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class LRUStore:
+    def __init__(self, db_path, namespace='default', max_entries=1000, ttl=None):
+        self.db_path = db_path
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0}
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def get(self, key):
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value, created_at FROM lru_entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+            if row is not None and self.ttl is not None and now - row[1] > self.ttl:
+                conn.execute("DELETE FROM lru_entries WHERE namespace = ? AND key = ?", (self.namespace, key))
+                conn.commit()
+                self._count('expired')
+                row = None
+            if row is None:
+                self._count('misses')
+                return None
+            conn.execute(
+                "UPDATE lru_entries SET last_used = ?, hits = hits + 1 WHERE namespace = ? AND key = ?",
+                (now, self.namespace, key),
+            )
+            conn.commit()
+        self._count('hits')
+        return json.loads(row[0])
+
+    def set(self, key, value):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO lru_entries (namespace, key, value, created_at, last_used, hits) "
+                "VALUES (?, ?, ?, ?, ?, 0)",
+                (self.namespace, key, json.dumps(value, default=str), now, now),
+            )
+            (count,) = conn.execute(
+                "SELECT COUNT(*) FROM lru_entries WHERE namespace = ?", (self.namespace,)
+            ).fetchone()
+            if count > self.max_entries:
+                evicted = conn.execute(
+                    "DELETE FROM lru_entries WHERE namespace = ? AND key IN ("
+                    "SELECT key FROM lru_entries WHERE namespace = ? ORDER BY last_used LIMIT ?)",
+                    (self.namespace, self.namespace, count - self.max_entries),
+                ).rowcount
+                self._count('evictions', evicted)
+            conn.commit()
+
+    def delete(self, key):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM lru_entries WHERE namespace = ? AND key = ?", (self.namespace, key))
+            conn.commit()
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM lru_entries WHERE namespace = ?", (self.namespace,))
+            conn.commit()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        with self._connect() as conn:
+            entries, stored_hits = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(hits), 0) FROM lru_entries WHERE namespace = ?", (self.namespace,)
+            ).fetchone()
+        stats['entries'] = entries
+        stats['stored_hits'] = stored_hits
+        return stats
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
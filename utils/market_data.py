@@ -0,0 +1,142 @@
+'''
+📡 MarketDataFetcher Class - Concurrent Yahoo Finance Retrieval for Advisory App
+--------------------------------------------------------------------------------
+Technical Overview:
+The MarketDataFetcher class issues the three Yahoo Finance summary calls used by the research summary
+(stock, financial and company summary) for many tickers at once on a bounded thread pool, instead of one
+blocking call after another. Every call has its own timeout, measured from the moment the call actually
+starts running, so calls queued behind the concurrency limit are not penalised. A call that raises or
+times out only blanks out that part of that company's data; the other calls and companies are unaffected.
+Results are returned keyed by ticker in the order the tickers were given, so the assembled report is
+deterministic regardless of which call finished first.
+
+The data source is pluggable: any object exposing `get_stock_summary`, `get_financial_summary` and
+`get_company_summary` (each taking `ticker=` and an optional `max_wait=`, the seconds the call may wait for
+the rate limiter) can be used, which is how benchmarks and tests swap in a local stub provider, and how
+the market data cache (utils/market_data_cache.py) is put in front of Yahoo Finance.
+
+In Simple Terms:
+The MarketDataFetcher is like sending several researchers to the library at once instead of one researcher
+making every trip. If one of them comes back empty-handed, the rest of the report is still filled in.
+
+Attributes:
+- provider: Market data source, defaults to LLMWare's YFinance web service, paced by the shared Yahoo
+  Finance rate limiter and circuit breaker (utils/rate_limiter.py). Every call passes call_timeout as its
+  `max_wait`, so a call never queues for the limiter longer than the fetcher would wait for it.
+- max_workers: Maximum number of calls in flight at once.
+- call_timeout: Seconds a single call may run before it is abandoned.
+
+Methods:
+- fetch: Fetches every summary call for a list of tickers, returning (results, errors). Each call is traced
+  as a span named after the call, a child of the caller's current span.
+'''
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from utils.rate_limiter import RETRYABLE, classify_error, get_upstream_limiter
+from utils.tracing import propagate, span
+
+logger = logging.getLogger(__name__)
+
+MARKET_DATA_CALLS = ('get_stock_summary', 'get_financial_summary', 'get_company_summary')
+
+def _is_upstream_failure(error):
+    # Only throttling and transient errors trip the breaker, not e.g. an unknown ticker
+    return classify_error(error) == RETRYABLE
+
+
+class YFinanceProvider:
+    """Adapter over LLMWare's YFinance web service exposing the three summary calls, paced by the shared
+    Yahoo Finance limiter (raises CircuitOpenError while Yahoo is failing, TimeoutError when no request slot
+    is free within `max_wait` seconds, given per call or else at construction)."""
+
+    def __init__(self, limiter=None, max_wait=None):
+        self.limiter = limiter or get_upstream_limiter('yahoo_finance')
+        self.max_wait = max_wait
+
+    def _call(self, fn, ticker, max_wait):
+        max_wait = self.max_wait if max_wait is None else max_wait
+        return self.limiter.call(fn, ticker=ticker, is_failure=_is_upstream_failure, max_wait=max_wait)
+
+    def get_stock_summary(self, ticker, max_wait=None):
+        return self._call(_yfinance().get_stock_summary, ticker, max_wait)
+
+    def get_financial_summary(self, ticker, max_wait=None):
+        return self._call(_yfinance().get_financial_summary, ticker, max_wait)
+
+    def get_company_summary(self, ticker, max_wait=None):
+        return self._call(_yfinance().get_company_summary, ticker, max_wait)
+
+
+def _yfinance():
+    # LLMWare is imported and configured on the first market data call, not when the app starts
+    from configs.config import Config
+    Config().setup()
+    from llmware.web_services import YFinance
+    return YFinance()
+
+
+class MarketDataFetcher:
+    def __init__(self, provider=None, max_workers=8, call_timeout=10.0, poll_interval=0.05):
+        self.provider = provider or YFinanceProvider()
+        self.max_workers = max_workers
+        self.call_timeout = call_timeout
+        self.poll_interval = poll_interval
+
+    def fetch(self, tickers, calls=MARKET_DATA_CALLS):
+        """
+        Fetches `calls` for every ticker concurrently.
+
+        Returns:
+            tuple: ({ticker: {call: dict}} in input order, [(ticker, call, error message)]).
+                   Failed or timed-out calls are returned as empty dicts.
+        """
+        tickers = list(dict.fromkeys(tickers))  # de-duplicate, keep order
+        results = {ticker: {call: {} for call in calls} for ticker in tickers}
+        errors = []
+        if not tickers:
+            return results, errors
+
+        started_at = {}
+
+        def run(ticker, call):
+            started_at[(ticker, call)] = time.monotonic()
+            with span(call, ticker=ticker):
+                return getattr(self.provider, call)(ticker=ticker, max_wait=self.call_timeout)
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="market-data")
+        try:
+            futures = {
+                executor.submit(propagate(run), ticker, call): (ticker, call)
+                for ticker in tickers
+                for call in calls
+            }
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    ticker, call = futures[future]
+                    try:
+                        results[ticker][call] = future.result() or {}
+                    except Exception as e:
+                        errors.append((ticker, call, str(e)))
+
+                now = time.monotonic()
+                for future in list(pending):
+                    key = futures[future]
+                    if key in started_at and now - started_at[key] > self.call_timeout:
+                        pending.discard(future)
+                        future.cancel()
+                        errors.append(key + (f"timed out after {self.call_timeout}s",))
+        finally:
+            # Do not block the request on calls that were abandoned after timing out
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        order = {ticker: i for i, ticker in enumerate(tickers)}
+        errors.sort(key=lambda error: (order[error[0]], calls.index(error[1])))
+        for ticker, call, message in errors:
+            logger.warning("Market data call %s failed for '%s': %s", call, ticker, message)
+
+        return results, errors
@@ -0,0 +1,271 @@
+'''
+🗄️ CachedMarketDataProvider Class - Tiered TTL Cache for Yahoo Finance Lookups
+------------------------------------------------------------------------------
+Technical Overview:
+The CachedMarketDataProvider class sits in front of a market data provider (by default the YFinance
+adapter used by MarketDataFetcher) and persists every summary response in a local SQLite database, so
+repeated advice requests, within one session or across sessions and processes, are served from disk.
+Every field belongs to a field group with its own freshness window, and the cache is keyed by field group:
+a response is split into one entry per group it contains. A field's group is the group of the call that
+returns it, unless FIELD_GROUP_OVERRIDES says otherwise:
+
+- quote (get_stock_summary: currentPrice, 52-week range, volume) changes by the minute.
+- valuation (get_financial_summary: marketCap, ebitda, margins, plus the trailingPE and forwardPE ratios
+  returned by get_stock_summary) changes daily.
+- profile (get_company_summary: sector, industry, website) almost never changes.
+
+A lookup is as fresh as its least fresh group entry. When every entry is fresh the merged response is
+returned directly. When one is past its TTL but still inside its group's stale window, the response is
+returned immediately while a background refresh updates it (stale-while-revalidate). Anything older, or a
+missing entry of the call's own group, is fetched synchronously. A refreshed response that lacks an
+override group's fields keeps the cached entry of that group while it is within its windows. Concurrent
+fetches of the same call and ticker (from any session, or a background refresh) share one upstream request
+through a SingleFlight group. While the Yahoo Finance circuit breaker is open (utils/rate_limiter.py),
+expired entries are served rather than failing. A synchronous fetch passes the caller's `max_wait` on to the
+provider, so a caller with a timeout (MarketDataFetcher) is not kept waiting for the rate limiter past it.
+Hit, stale-hit, miss and refresh counters are kept
+for monitoring, and each lookup records its outcome on the current tracing span (cache=hit/stale/miss, or expired while the circuit is open).
+
+In Simple Terms:
+The CachedMarketDataProvider remembers what Yahoo Finance told us and for how long each answer stays
+good. Share prices are re-checked every minute, company profiles only once a week, and while an answer
+is being refreshed in the background, users still get the slightly older one instantly.
+
+Attributes:
+- provider: The underlying market data provider.
+- db_path: Path of the SQLite cache database.
+- field_groups: Mapping of group name to {'ttl', 'stale_ttl'} in seconds.
+- field_group_overrides: Mapping of field name to its group, for fields whose call belongs to another group.
+
+Methods:
+- get_stock_summary / get_financial_summary / get_company_summary: Cached versions of the provider calls.
+- stats: Returns hit/miss counters, and how many upstream fetches were coalesced ('coalesced').
+- clear: Removes every cached entry.
+- get_market_data_cache: Returns the process-wide cached provider.
+'''
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from utils.market_data import YFinanceProvider
+from utils.rate_limiter import CircuitOpenError
+from utils.singleflight import SingleFlight
+from utils.tracing import set_attributes
+
+logger = logging.getLogger(__name__)
+
+# Upstream market data requests in flight, shared by every session of the process
+market_data_requests = SingleFlight('market_data')
+
+FIELD_GROUPS = {
+    'quote': {'ttl': 60, 'stale_ttl': 15 * 60},
+    'valuation': {'ttl': 24 * 60 * 60, 'stale_ttl': 2 * 24 * 60 * 60},
+    'profile': {'ttl': 7 * 24 * 60 * 60, 'stale_ttl': 30 * 24 * 60 * 60},
+}
+
+CALL_FIELD_GROUPS = {
+    'get_stock_summary': 'quote',
+    'get_financial_summary': 'valuation',
+    'get_company_summary': 'profile',
+}
+
+# Fields that age like another group than the rest of their call's response
+FIELD_GROUP_OVERRIDES = {
+    'trailingPE': 'valuation',
+    'forwardPE': 'valuation',
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS market_data_fields (
+    call TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    field_group TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (call, ticker, field_group)
+);
+"""
+
+FRESH, STALE, EXPIRED = 0, 1, 2
+
+class CachedMarketDataProvider:
+    def __init__(self, provider=None, db_path=None, field_groups=None, field_group_overrides=None):
+        self.provider = provider or YFinanceProvider()
+        self.db_path = db_path or os.path.join(os.getcwd(), "data", "market_data_cache.db")
+        self.field_groups = field_groups or FIELD_GROUPS
+        self.field_group_overrides = field_group_overrides if field_group_overrides is not None else FIELD_GROUP_OVERRIDES
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="market-data-refresh")
+        self._stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'refreshes': 0, 'errors': 0, 'circuit_open_hits': 0}
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def get_stock_summary(self, ticker, max_wait=None):
+        return self._get('get_stock_summary', ticker, max_wait)
+
+    def get_financial_summary(self, ticker, max_wait=None):
+        return self._get('get_financial_summary', ticker, max_wait)
+
+    def get_company_summary(self, ticker, max_wait=None):
+        return self._get('get_company_summary', ticker, max_wait)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats['coalesced'] = market_data_requests.stats()['shared']
+        lookups = stats['hits'] + stats['stale_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['hits'] + stats['stale_hits']) / lookups if lookups else 0.0
+        return stats
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM market_data_fields")
+            conn.commit()
+
+    def _get(self, call, ticker, max_wait=None):
+        entries = self._read(call, ticker)
+        state = self._state(call, entries)
+
+        if state == FRESH:
+            self._count('hits')
+            set_attributes(cache='hit')
+            return _merge(entries)
+        if state == STALE:
+            self._count('stale_hits')
+            set_attributes(cache='stale')
+            self._schedule_refresh(call, ticker)
+            return _merge(entries)
+
+        self._count('misses')
+        set_attributes(cache='miss')
+        try:
+            return self._fetch(call, ticker, max_wait)
+        except CircuitOpenError:
+            if CALL_FIELD_GROUPS[call] not in entries:
+                raise
+            # Yahoo is failing: any cached answer, however old, beats no answer
+            self._count('circuit_open_hits')
+            set_attributes(cache='expired')
+            return _merge(entries)
+
+    def _state(self, call, entries):
+        # A lookup is as fresh as its least fresh field group; without the call's own group it is a miss
+        if CALL_FIELD_GROUPS[call] not in entries:
+            return EXPIRED
+        now = time.time()
+        state = FRESH
+        for group_name, (_, fetched_at) in entries.items():
+            group = self.field_groups[group_name]
+            age = now - fetched_at
+            if age >= group['ttl'] + group['stale_ttl']:
+                return EXPIRED
+            if age >= group['ttl']:
+                state = STALE
+        return state
+
+    def _split(self, call, payload):
+        groups = {}
+        for field, value in payload.items():
+            group_name = self.field_group_overrides.get(field, CALL_FIELD_GROUPS[call])
+            groups.setdefault(group_name, {})[field] = value
+        return groups
+
+    def _fetch(self, call, ticker, max_wait=None):
+        # Sessions missing the same call for the same ticker at the same time share one upstream request
+        return market_data_requests.do((call, ticker), self._fetch_upstream, call, ticker, max_wait)[0]
+
+    def _fetch_upstream(self, call, ticker, max_wait):
+        payload = getattr(self.provider, call)(ticker=ticker, max_wait=max_wait)
+        # Empty responses usually mean a lookup failure, so they are not cached
+        if not payload:
+            return payload
+        self._write(call, ticker, payload)
+        # Field groups missing from the response are still served from their own entries
+        return _merge(self._read(call, ticker))
+
+    def _schedule_refresh(self, call, ticker):
+        key = (call, ticker)
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        self._refresher.submit(self._refresh, key)
+
+    def _refresh(self, key):
+        call, ticker = key
+        try:
+            self._fetch(call, ticker)
+            self._count('refreshes')
+        except CircuitOpenError:
+            pass  # the stale entry is served until Yahoo recovers
+        except Exception as e:
+            self._count('errors')
+            logger.warning("Background refresh of %s for '%s' failed: %s", call, ticker, e)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _read(self, call, ticker):
+        """Returns {field group: (fields, fetched_at)} of the cached entries of a call."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT field_group, payload, fetched_at FROM market_data_fields WHERE call = ? AND ticker = ?",
+                (call, ticker),
+            ).fetchall()
+        return {group_name: (json.loads(payload), fetched_at) for group_name, payload, fetched_at in rows}
+
+    def _write(self, call, ticker, payload):
+        now = time.time()
+        groups = self._split(call, payload)
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO market_data_fields (call, ticker, field_group, payload, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(call, ticker, group_name, json.dumps(fields, default=str), now) for group_name, fields in groups.items()],
+            )
+            # Entries of groups the response lacked are dropped once past their stale window
+            for group_name, group in self.field_groups.items():
+                if group_name not in groups:
+                    conn.execute(
+                        "DELETE FROM market_data_fields WHERE call = ? AND ticker = ? AND field_group = ? AND fetched_at <= ?",
+                        (call, ticker, group_name, now - group['ttl'] - group['stale_ttl']),
+                    )
+            conn.commit()
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+
+def _merge(entries):
+    merged = {}
+    for fields, _ in entries.values():
+        merged.update(fields)
+    return merged
+
+
+_market_data_cache = None
+_market_data_cache_lock = threading.Lock()
+
+def get_market_data_cache():
+    """Returns the process-wide CachedMarketDataProvider in front of Yahoo Finance."""
+    global _market_data_cache
+    with _market_data_cache_lock:
+        if _market_data_cache is None:
+            _market_data_cache = CachedMarketDataProvider()
+        return _market_data_cache
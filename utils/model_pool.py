@@ -0,0 +1,143 @@
+'''
+🧠 ModelPool Class - Shared Model Handles for Advisory App
+----------------------------------------------------------
+Technical Overview:
+The ModelPool class keeps loaded LLMWare model handles (Prompt instances) alive for the lifetime of the
+process, so that Streamlit reruns and concurrent sessions do not pay the model-load cost on every
+interaction. Handles are keyed by the model name and a fingerprint of the credential used to load them;
+the raw API key is never stored as part of the key. The pool is bounded: the least recently used handle
+is evicted once the pool is full, and handles that have not been used within the idle timeout are dropped
+on the next access. Loading is serialized per key so that two sessions asking for the same model at the
+same moment only load it once.
+
+A handle is shared by every session using the same model and key, but LLMWare's Prompt keeps per-call
+state (the prompt history, the source materials), so calls on one handle must not interleave: callers
+hold the handle's lock (lock_for) around each call.
+
+In Simple Terms:
+The ModelPool is like a coat check for models. The first time an agent needs a model, it is loaded and
+kept; the next time anyone asks for the same model with the same key, they get the one already loaded.
+Models nobody has used for a while are put away to free memory.
+
+Attributes:
+- max_size: Maximum number of model handles kept at once.
+- idle_ttl: Seconds after which an unused handle is discarded.
+- loader: Callable (model_name, api_key) -> handle, defaults to LLMWare's Prompt().load_model.
+
+Methods:
+- fingerprint: Returns a short, non-reversible fingerprint of an API key.
+- acquire: Returns a pooled handle for (model_name, api_key), loading it on first use. Whether the handle
+  was pooled or loaded is recorded on the current tracing span (pool=hit/load).
+- lock_for: Returns the lock serializing calls on a handle.
+- evict: Drops a single handle from the pool.
+- clear: Drops every handle from the pool.
+- stats: Returns load/hit/eviction counters for monitoring.
+'''
+
+import hashlib
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+from utils.tracing import set_attributes
+
+
+def _load_prompter(model_name, api_key):
+    from configs.config import Config
+    Config().setup()  # once per process, before LLMWare is first used
+    from llmware.prompts import Prompt
+    return Prompt().load_model(model_name, api_key=api_key)
+
+
+class ModelPool:
+    def __init__(self, max_size=8, idle_ttl=1800, loader=None):
+        self.max_size = max_size
+        self.idle_ttl = idle_ttl
+        self.loader = loader or _load_prompter
+        self._handles = OrderedDict()  # key -> [handle, last_used]
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        # Lives as long as the handle, so an agent still holding an evicted handle keeps its lock
+        self._handle_locks = weakref.WeakKeyDictionary()
+        self._stats = {'hits': 0, 'loads': 0, 'evictions': 0, 'expirations': 0}
+
+    @staticmethod
+    def fingerprint(api_key):
+        if not api_key:
+            return None
+        return hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]
+
+    def acquire(self, model_name, api_key):
+        key = (model_name, self.fingerprint(api_key))
+
+        handle = self._lookup(key)
+        if handle is not None:
+            set_attributes(pool='hit')
+            return handle
+
+        with self._lock:
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # Only one caller loads a given key; the others wait and then hit the pool
+        with load_lock:
+            handle = self._lookup(key)
+            if handle is not None:
+                set_attributes(pool='hit')
+                return handle
+
+            set_attributes(pool='load')
+            handle = self.loader(model_name, api_key)
+            with self._lock:
+                self._stats['loads'] += 1
+                self._handles[key] = [handle, time.monotonic()]
+                while len(self._handles) > self.max_size:
+                    self._handles.popitem(last=False)
+                    self._stats['evictions'] += 1
+                self._load_locks.pop(key, None)
+            return handle
+
+    def lock_for(self, handle):
+        with self._lock:
+            lock = self._handle_locks.get(handle)
+            if lock is None:
+                lock = self._handle_locks[handle] = threading.Lock()
+            return lock
+
+    def evict(self, model_name, api_key):
+        key = (model_name, self.fingerprint(api_key))
+        with self._lock:
+            return self._handles.pop(key, None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._handles.clear()
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, size=len(self._handles))
+
+    def _lookup(self, key):
+        now = time.monotonic()
+        with self._lock:
+            self._expire_idle(now)
+            entry = self._handles.get(key)
+            if entry is None:
+                return None
+            entry[1] = now
+            self._handles.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry[0]
+
+    def _expire_idle(self, now):
+        # Entries are kept in LRU order, so expired ones are always at the front
+        while self._handles:
+            key, (handle, last_used) = next(iter(self._handles.items()))
+            if now - last_used < self.idle_ttl:
+                break
+            del self._handles[key]
+            self._stats['expirations'] += 1
+
+
+# Process-wide pool shared by every session (Singleton pattern)
+model_pool = ModelPool()
@@ -0,0 +1,324 @@
+'''
+🚥 UpstreamLimiter Class - Shared Rate Limiting and Circuit Breaking for Outbound APIs
+-------------------------------------------------------------------------------------
+Technical Overview:
+The UpstreamLimiter paces every request to an upstream API (Yahoo Finance, for both the app's market data
+calls and the nightly F-score refresh in data/piotroski_calc.py) through three layers:
+
+- Token bucket: at most `rate` requests per second on average, with bursts of up to `burst`. The bucket
+  lives in a SQLite row (data/rate_limits.db, updated inside BEGIN IMMEDIATE transactions), so every thread
+  of every process on the host draws from the same bucket.
+- Adaptive concurrency (AIMD): the number of requests in flight per process is capped by a limit that grows
+  by one for every `limit` successful requests and is halved when the error rate of the recent requests
+  exceeds `error_threshold`, so concurrency backs off quickly when Yahoo starts throttling and recovers
+  slowly when it stops.
+- Circuit breaker: after `failure_threshold` consecutive failures (shared across processes in the same
+  SQLite row) the circuit opens and requests fail fast with CircuitOpenError for `reset_timeout` seconds,
+  instead of piling more load on a throttling upstream. Callers with cached data serve it while the circuit
+  is open. After the timeout a single request probes the upstream; only that probe's success closes the
+  circuit (a request that started before the circuit opened and succeeds late does not), and its failure
+  opens it again.
+
+`is_failure` decides which exceptions count as upstream failures (by default all of them), so errors such
+as an unknown ticker do not trip the breaker. It is given per call, because the limiter of an upstream is
+shared by every caller of the process. Likewise `max_wait` can be lowered per call, so a caller with its
+own timeout (e.g. MarketDataFetcher's call_timeout) gives up waiting for a slot or token before it would
+abandon the call anyway.
+
+In Simple Terms:
+The UpstreamLimiter is the doorman for Yahoo Finance. Everyone waits in one queue, fewer people are let
+through at once when Yahoo gets grumpy, and when Yahoo stops answering altogether, the doorman tells
+everyone to use what they already have instead of knocking again.
+
+Attributes:
+- name: Name of the upstream, the key of its shared state.
+- rate / burst: Token bucket refill rate (requests per second) and capacity.
+- initial_concurrency / max_concurrency: Bounds of the adaptive per-process concurrency limit.
+- failure_threshold / reset_timeout: Consecutive failures that open the circuit, and seconds it stays open.
+
+Methods:
+- call: Runs a request under the limiter, raising CircuitOpenError while the circuit is open and
+  TimeoutError when no slot or token is available within `max_wait` seconds.
+- circuit_open: Whether requests currently fail fast.
+- stats: Returns counters (calls, failures, rejected, waited seconds), the concurrency limit and the
+  circuit state.
+- get_upstream_limiter: Returns the process-wide limiter of an upstream configured in UPSTREAM_LIMITS,
+  raising ValueError when asked for it with settings other than those it was created with.
+- classify_error: Classifies an upstream error as RETRYABLE (throttling, transient) or PERMANENT, for
+  `is_failure` and for callers that retry.
+'''
+
+import collections
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from utils.tracing import set_attributes
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "rate_limits.db")
+
+# Defaults per upstream; Yahoo Finance throttles bursts of unauthenticated requests
+UPSTREAM_LIMITS = {
+    'yahoo_finance': {'rate': 5.0, 'burst': 20, 'initial_concurrency': 4, 'max_concurrency': 16,
+                      'failure_threshold': 8, 'reset_timeout': 60.0},
+}
+
+RETRYABLE = 'retryable'
+PERMANENT = 'permanent'
+
+RETRYABLE_ERROR_NAMES = {
+    'YFRateLimitError',
+    'Timeout',
+    'ReadTimeout',
+    'ConnectTimeout',
+    'ConnectionError',
+    'ChunkedEncodingError',
+    'JSONDecodeError',  # Yahoo answers throttled requests with an HTML page
+    'CircuitOpenError',  # the circuit of the upstream is open, retry after backoff
+}
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+RETRYABLE_MESSAGES = ('too many requests', 'rate limit', '429', 'timed out', 'temporarily unavailable')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS upstream_limits (
+    name TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    refilled_at REAL NOT NULL,
+    failures INTEGER NOT NULL DEFAULT 0,
+    open_until REAL NOT NULL DEFAULT 0
+);
+"""
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open."""
+    def __init__(self, name, retry_in):
+        super().__init__(f"Circuit for '{name}' is open, retry in {retry_in:.0f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+
+def classify_error(error):
+    # Errors marked `permanent` (e.g. data/fundamentals_fetcher.py's PermanentFetchError) are never retried
+    if getattr(error, 'permanent', False):
+        return PERMANENT
+    if type(error).__name__ in RETRYABLE_ERROR_NAMES or isinstance(error, (TimeoutError, ConnectionError)):
+        return RETRYABLE
+    status_code = getattr(getattr(error, 'response', None), 'status_code', None)
+    if status_code in RETRYABLE_STATUS_CODES:
+        return RETRYABLE
+    message = str(error).lower()
+    if any(text in message for text in RETRYABLE_MESSAGES):
+        return RETRYABLE
+    return PERMANENT
+
+
+class UpstreamLimiter:
+    def __init__(self, name, rate=5.0, burst=20, initial_concurrency=4, min_concurrency=1, max_concurrency=16,
+                 error_window=20, error_threshold=0.2, failure_threshold=8, reset_timeout=60.0,
+                 max_wait=30.0, is_failure=None, db_path=None):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.error_threshold = error_threshold
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_wait = max_wait
+        self.is_failure = is_failure or (lambda error: True)
+        # Resolved here rather than as a default argument so DEFAULT_DB_PATH can be repointed (e.g. by benchmarks)
+        self.db_path = db_path or DEFAULT_DB_PATH
+
+        self._concurrency_limit = float(initial_concurrency)
+        self._in_flight = 0
+        self._outcomes = collections.deque(maxlen=error_window)
+        self._condition = threading.Condition()
+        self._stats = {'calls': 0, 'failures': 0, 'rejected': 0, 'waited_s': 0.0}
+
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            conn.execute(
+                "INSERT OR IGNORE INTO upstream_limits (name, tokens, refilled_at) VALUES (?, ?, ?)",
+                (name, float(burst), time.time()),
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        # BEGIN IMMEDIATE takes the write lock up front, so the read-modify-write is atomic across processes
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def call(self, fn, *args, is_failure=None, max_wait=None, **kwargs):
+        """
+        Runs fn(*args, **kwargs) under the limiter. `is_failure` overrides the limiter's classification of
+        exceptions for this call; `max_wait` caps the seconds spent waiting for a slot and a token.
+        """
+        is_failure = is_failure or self.is_failure
+        max_wait = self.max_wait if max_wait is None else min(max_wait, self.max_wait)
+        deadline = time.monotonic() + max_wait
+        probe = self._allow()
+        waited = self._enter(deadline, max_wait)
+        try:
+            waited += self._take_token(deadline, max_wait)
+            if waited > 0.001:
+                self._count('waited_s', waited)
+                set_attributes(rate_limit_wait_ms=round(waited * 1000, 3))
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                self._record(failure=is_failure(e), probe=probe)
+                raise
+            self._record(failure=False, probe=probe)
+            return result
+        finally:
+            self._exit()
+
+    def circuit_open(self):
+        with self._connect() as conn:
+            open_until = conn.execute("SELECT open_until FROM upstream_limits WHERE name = ?", (self.name,)).fetchone()[0]
+        return time.time() < open_until
+
+    def stats(self):
+        with self._condition:
+            stats = dict(self._stats, concurrency_limit=int(self._concurrency_limit), in_flight=self._in_flight)
+        stats['circuit_open'] = self.circuit_open()
+        return stats
+
+    def _count(self, name, amount=1):
+        with self._condition:
+            self._stats[name] += amount
+
+    # Circuit breaker
+
+    def _allow(self):
+        # Returns True when this request is the half-open probe
+        now = time.time()
+        with self._connect() as conn:
+            open_until = conn.execute("SELECT open_until FROM upstream_limits WHERE name = ?", (self.name,)).fetchone()[0]
+        if open_until and now >= open_until:
+            # Half-open: one request probes the upstream, everyone else keeps failing fast until it reports
+            with self._transaction() as conn:
+                open_until = conn.execute("SELECT open_until FROM upstream_limits WHERE name = ?", (self.name,)).fetchone()[0]
+                if open_until and now >= open_until:
+                    conn.execute("UPDATE upstream_limits SET open_until = ? WHERE name = ?", (now + self.reset_timeout, self.name))
+                    set_attributes(circuit='probe')
+                    return True
+        if now < open_until:
+            self._count('rejected')
+            set_attributes(circuit='open')
+            raise CircuitOpenError(self.name, open_until - now)
+        return False
+
+    def _record(self, failure, probe=False):
+        with self._transaction() as conn:
+            if failure:
+                failures, open_until = conn.execute(
+                    "SELECT failures, open_until FROM upstream_limits WHERE name = ?", (self.name,)
+                ).fetchone()
+                failures += 1
+                # A failed probe reopens the circuit immediately; late failures don't extend an open circuit
+                if probe or (failures >= self.failure_threshold and not open_until):
+                    open_until = time.time() + self.reset_timeout
+                conn.execute(
+                    "UPDATE upstream_limits SET failures = ?, open_until = ? WHERE name = ?",
+                    (failures, open_until, self.name),
+                )
+            elif probe:
+                conn.execute("UPDATE upstream_limits SET failures = 0, open_until = 0 WHERE name = ?", (self.name,))
+            else:
+                # Only the probe closes the circuit; other successes reset the count while it is closed
+                conn.execute(
+                    "UPDATE upstream_limits SET failures = 0 WHERE name = ? AND failures > 0 AND open_until = 0",
+                    (self.name,),
+                )
+
+        with self._condition:
+            self._stats['calls'] += 1
+            self._stats['failures'] += int(failure)
+            self._outcomes.append(failure)
+            error_rate = sum(self._outcomes) / len(self._outcomes)
+            if failure and error_rate > self.error_threshold:
+                # Multiplicative decrease; the window restarts so one burst of errors halves the limit once
+                self._concurrency_limit = max(self.min_concurrency, self._concurrency_limit / 2)
+                self._outcomes.clear()
+            elif not failure:
+                # Additive increase: about +1 per `limit` successful requests
+                self._concurrency_limit = min(self.max_concurrency, self._concurrency_limit + 1 / self._concurrency_limit)
+            self._condition.notify_all()
+
+    # Adaptive concurrency
+
+    def _enter(self, deadline, max_wait):
+        started_at = time.monotonic()
+        with self._condition:
+            while self._in_flight >= int(self._concurrency_limit):
+                if not self._condition.wait(timeout=max(deadline - time.monotonic(), 0.0)):
+                    raise TimeoutError(f"No '{self.name}' request slot within {max_wait}s")
+            self._in_flight += 1
+        return time.monotonic() - started_at
+
+    def _exit(self):
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    # Token bucket
+
+    def _take_token(self, deadline, max_wait):
+        started_at = time.monotonic()
+        while True:
+            now = time.time()
+            with self._transaction() as conn:
+                tokens, refilled_at = conn.execute(
+                    "SELECT tokens, refilled_at FROM upstream_limits WHERE name = ?", (self.name,)
+                ).fetchone()
+                tokens = min(float(self.burst), tokens + max(now - refilled_at, 0.0) * self.rate)
+                taken = tokens >= 1
+                if taken:
+                    tokens -= 1
+                conn.execute(
+                    "UPDATE upstream_limits SET tokens = ?, refilled_at = ? WHERE name = ?", (tokens, now, self.name)
+                )
+            if taken:
+                return time.monotonic() - started_at
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"No '{self.name}' rate limit token within {max_wait}s")
+            time.sleep(min((1 - tokens) / self.rate, remaining))
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def get_upstream_limiter(name, **overrides):
+    """
+    Returns the process-wide UpstreamLimiter of `name`, created with UPSTREAM_LIMITS[name] and `overrides`.
+    Later callers get the same limiter, so they may only pass the overrides it was created with (or none);
+    per-caller behaviour such as `is_failure` and `max_wait` is given to UpstreamLimiter.call instead.
+    """
+    with _limiters_lock:
+        settings = {**UPSTREAM_LIMITS.get(name, {}), **overrides}
+        if name not in _limiters:
+            _limiters[name] = (UpstreamLimiter(name, **settings), settings)
+        limiter, created_with = _limiters[name]
+        if overrides and settings != created_with:
+            raise ValueError(f"Limiter '{name}' already exists with settings {created_with}, not {settings}")
+        return limiter
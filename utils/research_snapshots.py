@@ -0,0 +1,173 @@
+'''
+🗞️ ResearchSnapshotStore Class - Precomputed Research Summaries for Advisory App
+-------------------------------------------------------------------------------
+Technical Overview:
+The research summary (screened companies plus Yahoo Finance data) and its LLM-written summary are the
+same for every user within a time window, yet building them is the most expensive step of a 'Y' turn.
+The ResearchSnapshotStore keeps versioned snapshots of both as JSON files in a directory, per model: the
+summary text is written by Agent Zero's model, so a user only gets a snapshot summarized by the model they
+selected. A snapshot is published atomically: the versioned file is written to a temporary name and moved
+into place with os.replace, then the model's `latest-<model>.json` pointer is replaced the same way, so
+readers always see either the previous or the new snapshot, never a partial one. Reading the latest
+snapshot is O(1): one stat of the pointer, and the snapshot itself is only re-read when the pointer has
+changed. The SnapshotBuilder
+rebuilds snapshots on a background thread at a fixed interval (see _helpers/build_research_snapshot.py
+for the command-line builder), and the app falls back to live generation only when no fresh snapshot
+exists.
+
+In Simple Terms:
+The ResearchSnapshotStore is like the morning newspaper. The research is prepared ahead of time and
+put on the shelf, so a user asking for advice gets the latest edition immediately instead of waiting
+for it to be written.
+
+Attributes:
+- directory: Folder holding the versioned snapshots and the latest pointer.
+- max_age: Age in seconds after which a snapshot is no longer served.
+- keep_versions: Number of versioned snapshots kept on disk per model.
+
+Methods:
+- publish: Writes a new snapshot version and points the model's latest pointer at it.
+- latest: Returns the latest snapshot of a model if it is fresh enough, otherwise None.
+- SnapshotBuilder.build_once / start / stop: Builds snapshots once or on a background schedule.
+- get_research_snapshots: Returns the shared store for the default directory.
+'''
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DIRECTORY = os.path.join("data", "research_snapshots")
+
+def _model_slug(model_name):
+    # Model names become part of file names
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", model_name or "default")
+
+def _write_json_atomically(path, data):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, default=str)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class ResearchSnapshotStore:
+    def __init__(self, directory=DEFAULT_DIRECTORY, max_age=30 * 60, keep_versions=24):
+        self.directory = directory
+        self.max_age = max_age
+        self.keep_versions = keep_versions
+        self._lock = threading.Lock()
+        self._cached = {}  # pointer path -> (pointer mtime_ns, snapshot)
+        os.makedirs(directory, exist_ok=True)
+
+    def pointer_path(self, model_name=None):
+        return os.path.join(self.directory, f"latest-{_model_slug(model_name)}.json")
+
+    def publish(self, research_summary, summary_text, model_name=None):
+        created_at = time.time()
+        version = time.strftime("%Y%m%dT%H%M%S", time.gmtime(created_at)) + f"-{int(created_at * 1000) % 1000:03d}"
+        prefix = f"snapshot-{_model_slug(model_name)}-"
+        filename = f"{prefix}{version}.json"
+        snapshot = {
+            'version': version,
+            'created_at': created_at,
+            'model': model_name,
+            'research_summary': research_summary,
+            'summary_text': summary_text,
+        }
+        _write_json_atomically(os.path.join(self.directory, filename), snapshot)
+        _write_json_atomically(
+            self.pointer_path(model_name), {'version': version, 'filename': filename, 'created_at': created_at}
+        )
+        self._prune(prefix)
+        return version
+
+    def _prune(self, prefix):
+        versions = sorted(name for name in os.listdir(self.directory) if name.startswith(prefix))
+        for name in versions[:-self.keep_versions]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+
+    def latest(self, model_name=None, max_age=None):
+        """
+        Returns the latest snapshot dict summarized by `model_name`, or None when there is none or it is older
+        than `max_age`.
+        """
+        max_age = self.max_age if max_age is None else max_age
+        pointer_path = self.pointer_path(model_name)
+        try:
+            pointer_mtime = os.stat(pointer_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+        with self._lock:
+            cached_mtime, snapshot = self._cached.get(pointer_path, (None, None))
+            if cached_mtime != pointer_mtime:
+                try:
+                    with open(pointer_path, encoding="utf-8") as f:
+                        pointer = json.load(f)
+                    with open(os.path.join(self.directory, pointer['filename']), encoding="utf-8") as f:
+                        snapshot = json.load(f)
+                except (FileNotFoundError, ValueError, KeyError):
+                    return None
+                self._cached[pointer_path] = (pointer_mtime, snapshot)
+
+        if time.time() - snapshot['created_at'] > max_age:
+            return None
+        return snapshot
+
+
+class SnapshotBuilder:
+    def __init__(self, research_manager, store, model_name, api_key, interval=15 * 60):
+        self.research_manager = research_manager
+        self.store = store
+        self.model_name = model_name
+        self.api_key = api_key
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def build_once(self):
+        research_summary = self.research_manager.generate_research_summary()
+        summary_text = self.research_manager.summarize_report(research_summary, self.model_name, self.api_key)
+        return self.store.publish(research_summary, summary_text, self.model_name)
+
+    def _run(self):
+        while not self._stop.is_set():
+            started_at = time.monotonic()
+            try:
+                version = self.build_once()
+                logger.info("Published research snapshot %s in %.1fs", version, time.monotonic() - started_at)
+            except Exception:
+                # Keep serving the previous snapshot and try again on the next tick
+                logger.exception("Research snapshot build failed")
+            self._stop.wait(max(self.interval - (time.monotonic() - started_at), 0))
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="research-snapshots", daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_research_snapshots():
+    """Returns the process-wide ResearchSnapshotStore for the default directory."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ResearchSnapshotStore()
+        return _store
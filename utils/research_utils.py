@@ -3,79 +3,128 @@
 ------------------------------------------------------------------------------------------
 Technical Overview:
 The ResearchManager class is responsible for gathering and summarizing financial data on companies 
-to support investment advice within the advisory app. It processes a CSV file of company data, filters 
-companies based on financial health (e.g., Piotroski F-Score), and retrieves additional financial metrics 
-from Yahoo Finance via the YFinance API. The generate_research_summary method compiles these 
-data points into a detailed research summary, while the summarize_report method provides a concise 
-overview using an LLM. This setup allows the app to deliver informed, data-driven insights to users.
+to support investment advice within the advisory app. It screens the company data for financial health 
+(e.g., Piotroski F-Score), reading only the name, ticker and f_score columns of the memory-mapped
+columnar dataset (CompaniesDataset, rebuilt whenever the CSV changes). When pyarrow cannot be imported it
+falls back to the indexed SQLite store of the company CSV (kept in sync incrementally by CompaniesIndex), and 
+retrieves additional financial metrics from Yahoo Finance via the YFinance API. The 
+generate_research_summary method compiles these data points into a detailed research summary, while 
+the summarize_report method provides a concise overview using an LLM. This setup allows the app to 
+deliver informed, data-driven insights to users.
 
 In Simple Terms:
 The ResearchManager is like the app’s financial data researcher. It reads a list of companies, picks the 
-strongest ones, and gathers extra details from Yahoo Finance. Then it makes a summary of these details, 
-so the app can give users well-researched investment advice without overwhelming them with too much 
-information.
+strongest ones, and gathers extra details from Yahoo Finance for all of them at once. Then it makes a 
+summary of these details, so the app can give users well-researched investment advice without 
+overwhelming them with too much information.
 
 Attributes:
-- None specific to this class; it relies on session state for configurations and API key.
+- market_data_fetcher: MarketDataFetcher used to query Yahoo Finance concurrently for the selected companies,
+  backed by the shared on-disk market data cache (CachedMarketDataProvider) by default.
+- summary_cache: LRUStore memoizing summarize_report, keyed by a sha256 of the canonicalized research summary,
+  the model name and SUMMARY_PROMPT_VERSION (data/memo_cache.db, 256 entries). By default the process-wide
+  store of get_summary_cache, so its stats() (hit rate) cover every session and rerun.
 
 Methods:
 - generate_research_summary: Compiles a comprehensive report on selected companies, including 
-  financial metrics and company information from Yahoo Finance.
+  financial metrics and company information from Yahoo Finance. The Yahoo Finance calls for all selected
+  companies run in parallel; a failed call leaves that company's fields as 'N/A'.
 - summarize_report: Converts the research summary into a concise, user-friendly report using an LLM 
-  to ensure clarity and relevance in user interactions.
+  to ensure clarity and relevance in user interactions. The model handle comes from the shared ModelPool.
+  `status` is an optional progress context manager (e.g. PipelineEvents.status); without it the method
+  runs headless, e.g. in the background research snapshot builder. A research
+  summary identical to one summarized before returns the memoized summary without an LLM call.
+  OpenAI and Anthropic models are called through the pooled async client (agents/llm_clients.py).
+  Concurrent requests for the same summary (same cache key: research summary, model and prompt version)
+  share one in-flight LLM call (summary_requests, a SingleFlight group).
+- asummarize_report: Awaitable summarize_report, so several reports (e.g. for several models) can be
+  summarized concurrently with asyncio.gather on the process-wide event loop.
+- get_summary_cache: Returns the process-wide summary memo (Singleton pattern).
+
+Both methods record tracing spans (company screening, each Yahoo Finance call with its cache outcome, the
+summary cache lookup and the summarization LLM call), see utils/tracing.py.
 '''
 
+import asyncio
+import contextlib
 import os
-import streamlit as st
-from llmware.resources import CustomTable
-from llmware.web_services import YFinance
+import threading
+from agents.llm_clients import acomplete, provider_for_model
+from utils.async_runner import run_async
+from utils.companies_dataset import CompaniesDataset
+from utils.companies_index import get_companies_index
+from utils.context_builder import count_tokens
+from utils.market_data import MarketDataFetcher
+from utils.market_data_cache import get_market_data_cache
+from utils.lru_store import LRUStore, content_key
+from utils.model_pool import model_pool
+from utils.singleflight import SingleFlight
+from utils.tracing import set_attributes, span
+
+# Bump when the summary prompt changes, so summaries memoized with the old prompt are not reused
+SUMMARY_PROMPT_VERSION = 1
+SUMMARY_PROMPT = "Please provide a concise summary of the following research report:\n\n{report_text}"
+
+# Summaries being generated, keyed like summary_cache, shared by every session of the process
+summary_requests = SingleFlight('summarize_report')
+
+_summary_cache = None
+_summary_cache_lock = threading.Lock()
+
+def get_summary_cache():
+    """Returns the process-wide LRUStore memoizing summarize_report, so hit counters survive engine rebuilds."""
+    global _summary_cache
+    with _summary_cache_lock:
+        if _summary_cache is None:
+            _summary_cache = LRUStore(
+                os.path.join(os.getcwd(), "data", "memo_cache.db"), namespace="summarize_report", max_entries=256
+            )
+        return _summary_cache
 
 class ResearchManager:
+    def __init__(self, market_data_fetcher=None, summary_cache=None):
+        self.market_data_fetcher = market_data_fetcher or MarketDataFetcher(provider=get_market_data_cache())
+        self.summary_cache = summary_cache or get_summary_cache()
+
     def generate_research_summary(self, local_library_path="data"):
-        """Processes a CSV of companies and retrieves financial data from Yahoo Finance."""
+        """Screens the indexed companies store and retrieves financial data from Yahoo Finance."""
         # Path to the CSV file
-        fp = os.path.join(os.getcwd(), local_library_path)
-        fn = "companies.csv"
-
-        # Validate CSV
-        analysis = CustomTable().validate_csv(fp, fn, delimiter=',', encoding='utf-8-sig')
-
-        table_name = "companies_table"
-        db_name = "sqlite"
-
-        # Initialize the CustomTable object
-        ct = CustomTable(db=db_name, table_name=table_name)
-
-        # Load the CSV
-        output = ct.load_csv(fp, fn)
-
-        # Insert the rows into the database
-        ct.insert_rows()
-
-        # Retrieve companies data from the database
-        companies = ct.rows
-
-        # Filter companies with f_score > 8
-        filtered_companies = [row for row in companies if float(row.get('f_score', 0)) > 8]
-
-        # If no companies with f_score > 8, fallback to f_score > 7
-        if not filtered_companies:
-            filtered_companies = [row for row in companies if float(row.get('f_score', 0)) > 7]
+        csv_path = os.path.join(os.getcwd(), local_library_path, "companies.csv")
+
+        # Screen the memory-mapped columnar dataset (rebuilt if the CSV changed), or the indexed store without pyarrow
+        with span('screen_companies'):
+            companies = CompaniesDataset(csv_path)
+            source = 'arrow'
+            if not companies.ensure_current():
+                # Bring the indexed companies store up to date (a no-op unless the CSV changed)
+                companies = get_companies_index(csv_path)
+                companies.sync()
+                source = 'sqlite'
+
+            # Filter companies with f_score > 8
+            filtered_companies = companies.screen(min_f_score=8)
+
+            # If no companies with f_score > 8, fallback to f_score > 7
+            if not filtered_companies:
+                filtered_companies = companies.screen(min_f_score=7)
+            set_attributes(source=source, companies=len(filtered_companies))
+
+        # Fetch data from Yahoo Finance for all companies concurrently
+        tickers = [row['ticker'].split(":")[-1] for row in filtered_companies]
+        with span('market_data', tickers=len(tickers)):
+            market_data, errors = self.market_data_fetcher.fetch(tickers)
+            set_attributes(errors=len(errors))
 
         research_summary = {}
 
-
-        for row in filtered_companies:
+        for row, ticker_core in zip(filtered_companies, tickers):
             company_name = row['name']
-            ticker = row['ticker']
             f_score = row.get('f_score', 'N/A')
             research_summary[company_name] = {'f_score': f_score}
 
-            # Fetch data from Yahoo Finance
-            ticker_core = ticker.split(":")[-1]
-            yf = YFinance().get_stock_summary(ticker=ticker_core)
-            yf2 = YFinance().get_financial_summary(ticker=ticker_core)
-            yf3 = YFinance().get_company_summary(ticker=ticker_core)
+            yf = market_data[ticker_core]['get_stock_summary']
+            yf2 = market_data[ticker_core]['get_financial_summary']
+            yf3 = market_data[ticker_core]['get_company_summary']
 
             research_summary[company_name].update({
                 "current_stock_price": yf.get("currentPrice", "N/A"),
@@ -102,7 +151,45 @@ class ResearchManager:
 
         return research_summary
 
-    def summarize_report(self, research_summary, agent_zero_model, agent_zero_api_key):
+    def summarize_report(self, research_summary, agent_zero_model, agent_zero_api_key, status=None):
+        cache_key, cached = self._cached_summary(research_summary, agent_zero_model)
+        if cached is not None:
+            return cached
+
+        # Summarize the report (`status` lets the caller show progress, e.g. a spinner); sessions asking
+        # for the same summary at the same time share one LLM call
+        with status('Summarizing the report...') if status else contextlib.nullcontext():
+            report_summary_text, _ = summary_requests.do(
+                cache_key,
+                lambda: run_async(self._generate_and_store(cache_key, research_summary, agent_zero_model, agent_zero_api_key)),
+            )
+        return report_summary_text
+
+    async def asummarize_report(self, research_summary, agent_zero_model, agent_zero_api_key):
+        cache_key, cached = self._cached_summary(research_summary, agent_zero_model)
+        if cached is not None:
+            return cached
+
+        report_summary_text, _ = await summary_requests.ado(
+            cache_key,
+            lambda: self._generate_and_store(cache_key, research_summary, agent_zero_model, agent_zero_api_key),
+        )
+        return report_summary_text
+
+    def _cached_summary(self, research_summary, agent_zero_model):
+        # Identical research summaries (in any key order) for the same model and prompt are summarized once
+        cache_key = content_key(research_summary, agent_zero_model, SUMMARY_PROMPT_VERSION)
+        with span('summary_cache'):
+            cached = self.summary_cache.get(cache_key)
+            set_attributes(cache='hit' if cached is not None else 'miss')
+        return cache_key, cached
+
+    async def _generate_and_store(self, cache_key, research_summary, agent_zero_model, agent_zero_api_key):
+        report_summary_text = await self._generate_summary(research_summary, agent_zero_model, agent_zero_api_key)
+        self.summary_cache.set(cache_key, report_summary_text)
+        return report_summary_text
+
+    async def _generate_summary(self, research_summary, agent_zero_model, agent_zero_api_key):
         # Convert research_summary to text
         report_text = ""
         for company, details in research_summary.items():
@@ -111,14 +198,20 @@ class ResearchManager:
                 report_text += f"{key}: {value}\n"
             report_text += "\n"
 
-        # Load the model for summarization
-        from llmware.prompts import Prompt
-        prompter = Prompt().load_model(agent_zero_model, api_key=agent_zero_api_key)
-
-        # Summarize the report
-        with st.spinner('Summarizing the report...'):
-            summary_prompt = f"Please provide a concise summary of the following research report:\n\n{report_text}"
-            response = prompter.prompt_main(summary_prompt)
-            report_summary_text = response['llm_response']
-
-        return report_summary_text.strip()
+        summary_prompt = SUMMARY_PROMPT.format(report_text=report_text)
+        with span('llm', agent='summarize_report', model=agent_zero_model, prompt_tokens=count_tokens(summary_prompt)):
+            if provider_for_model(agent_zero_model) is None:
+                response = await asyncio.to_thread(_prompt_pooled_model, agent_zero_model, agent_zero_api_key, summary_prompt)
+            else:
+                response = await acomplete(agent_zero_model, agent_zero_api_key, summary_prompt)
+            report_summary_text = response['llm_response'].strip()
+            set_attributes(completion_tokens=(response.get('usage') or {}).get('output') or count_tokens(report_summary_text))
+        return report_summary_text
+
+
+def _prompt_pooled_model(model_name, api_key, prompt):
+    # Reuse the pooled model handle for models without an async client
+    with span('load_model', agent='summarize_report', model=model_name):
+        prompter = model_pool.acquire(model_name, api_key)
+    with model_pool.lock_for(prompter):
+        return prompter.prompt_main(prompt)
@@ -8,25 +8,147 @@ user’s risk tolerance and financial disposition. The generate_risk_profile met
 with the appropriate model and API key, leveraging conversation data to create a comprehensive risk 
 profile report. This report helps tailor investment advice to each user's unique risk appetite.
 
+Profiles are updated incrementally: the manager remembers the last structured profile (a RiskProfile)
+and how far into the conversation it has read. On the next 'R' turn, only the previous JSON profile, the
+messages since then and the rolling summary of the earlier conversation (cached in the session's
+context_state, so each turn is summarized once) are sent to AgentTwo, and the result is merged into the
+typed profile. Turns
+Agent One labeled 'R' always reach AgentTwo: short answers such as "High" or "I would hold" only make
+sense next to the question they answer. Callers updating the profile on other turns can pass
+risk_answer=False; the LLM call is then skipped unless a new user message, read together with the
+assistant question before it, carries risk-relevant content.
+
 In Simple Terms:
 The RiskProfileManager is like the app’s risk analyst. It takes what the user has shared in the 
 conversation and asks AgentTwo to create a report that shows how much financial risk the user is 
-comfortable with. This report is used to give advice that matches the user’s risk preferences.
+comfortable with. This report is used to give advice that matches the user’s risk preferences. Rather
+than re-reading the whole conversation each time, it only reads what is new.
 
 Attributes:
-- None specific to this class; it relies on session state for agent configuration.
+- None specific to this class; it keeps the current profile and read position in the conversation's
+  SessionState (risk_profile, risk_profile_cursor).
 
 Methods:
 - generate_risk_profile: Initiates AgentTwo to create a risk profile based on conversation history, 
-  helping the app customize advice according to user-specific risk tolerance.
+  helping the app customize advice according to user-specific risk tolerance. With incremental=True
+  (the default) only new messages are sent and the result is merged into the stored profile.
+  risk_answer=False gates the update on risk-relevant content; use_cascade is passed on to AgentTwo.
+- is_risk_relevant: Tells whether a message contains anything a risk profile could use.
+- has_risk_content: Tells whether any new user answer, with the question it answers, is risk-relevant.
+
+RiskProfile holds the structured profile fields (risk_ability, risk_willingness, age, NAV, plus any
+extra fields the model returns) and knows how to parse, merge and serialize them.
 '''
 
-import streamlit as st
+import json
+import re
 # Remove unnecessary import
 # from agents.agent_two import AgentTwo
 
+RISK_RELEVANT_PATTERN = re.compile(
+    r"\d|\b(age|old|young|retire\w*|risk\w*|safe\w*|conservative|moderate|aggressive|volatil\w*|"
+    r"loss\w*|lose|losing|drop\w*|crash\w*|panic|comfortable|tolerance|horizon|years?|months?|"
+    r"long[- ]term|short[- ]term|goal\w*|wealth|income|salary|earn\w*|sav\w*|debt|loan\w*|"
+    r"mortgage|portfolio|asset\w*|net worth|nav|cash|invest\w*|growth|preserv\w*|dividend\w*|"
+    r"family|children|kids|house|home|job|employ\w*|student)\b",
+    re.IGNORECASE,
+)
+
+_PLACEHOLDER_VALUES = {"", "<level>", "<number>", "unknown", "n/a", "none", "null", "not specified"}
+
+
+class RiskProfile:
+    FIELDS = ('risk_ability', 'risk_willingness', 'age', 'NAV')
+
+    def __init__(self, risk_ability=None, risk_willingness=None, age=None, NAV=None, extra=None):
+        self.risk_ability = risk_ability
+        self.risk_willingness = risk_willingness
+        self.age = age
+        self.NAV = NAV
+        self.extra = extra or {}
+
+    @classmethod
+    def from_json(cls, text):
+        """Parses the model's JSON report, tolerating code fences or text around the JSON object."""
+        match = re.search(r"\{.*\}", text or "", re.DOTALL)
+        if match is None:
+            return None
+        try:
+            data = json.loads(match.group(0))
+        except ValueError:
+            return None
+        if not isinstance(data, dict):
+            return None
+        known = {field: data.pop(field) for field in cls.FIELDS if field in data}
+        return cls(**known, extra=data)
+
+    def to_dict(self):
+        data = {field: getattr(self, field) for field in self.FIELDS}
+        data.update(self.extra)
+        return data
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=4)
+
+    def merge(self, update):
+        """Returns a new profile where every informative value in `update` overrides this one."""
+        merged = RiskProfile(**{field: getattr(self, field) for field in self.FIELDS}, extra=dict(self.extra))
+        for key, value in update.to_dict().items():
+            if str(value).strip().lower() in _PLACEHOLDER_VALUES:
+                continue
+            if key in self.FIELDS:
+                setattr(merged, key, value)
+            else:
+                merged.extra[key] = value
+        return merged
+
+
 class RiskProfileManager:
-    def generate_risk_profile(self, conversation_history, agent_two):
-        risk_profile_report = agent_two.generate_risk_profile(conversation_history)
-        return risk_profile_report
+    def is_risk_relevant(self, text):
+        return RISK_RELEVANT_PATTERN.search(text or "") is not None
+
+    def has_risk_content(self, conversation_history, start):
+        previous_question = ""
+        for index, message in enumerate(conversation_history):
+            if message['role'] == 'assistant':
+                previous_question = message['content']
+            elif message['role'] == 'user' and index >= start:
+                if self.is_risk_relevant(f"{previous_question}\n{message['content']}"):
+                    return True
+        return False
+
+    def generate_risk_profile(self, conversation_history, agent_two, session, incremental=True, risk_answer=True,
+                              use_cascade=True):
+        """
+        Returns the updated risk profile report. `risk_answer` tells that Agent One labeled the turn 'R';
+        otherwise the update is skipped when the new messages carry nothing a risk profile could use.
+        """
+        # The rolling summary of the history is cached in the session between turns
+        context_state = session.context_state.setdefault('agent_two', {})
+        if not incremental:
+            risk_profile_report = agent_two.generate_risk_profile(conversation_history, context_state, use_cascade)
+            return risk_profile_report
+
+        profile = session.risk_profile
+        cursor = session.risk_profile_cursor
+
+        if profile is not None:
+            # Outside 'R' turns, skip the LLM when nothing new could change the profile
+            if not risk_answer and not self.has_risk_content(conversation_history, cursor):
+                session.risk_profile_cursor = len(conversation_history)
+                return profile.to_json()
+            risk_profile_report = agent_two.update_risk_profile(
+                profile.to_json(), conversation_history, cursor, context_state, use_cascade
+            )
+        else:
+            risk_profile_report = agent_two.generate_risk_profile(conversation_history, context_state, use_cascade)
+
+        update = RiskProfile.from_json(risk_profile_report)
+        if update is None:
+            # Keep the raw report, and re-read these messages next time
+            return risk_profile_report
 
+        profile = (profile or RiskProfile()).merge(update)
+        session.risk_profile = profile
+        session.risk_profile_cursor = len(conversation_history)
+        return profile.to_json()
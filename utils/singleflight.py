@@ -0,0 +1,91 @@
+'''
+🛫 SingleFlight Class - Coalescing of Identical In-Flight Requests
+-----------------------------------------------------------------
+Technical Overview:
+When several sessions ask for the same thing at the same moment (the same Yahoo Finance call for the same
+ticker, the same research summary for the same model), each of them would otherwise call the upstream API.
+A SingleFlight group keeps one concurrent.futures.Future per key for the requests currently in flight.
+The first caller of a key (the leader) runs the request and settles the future; callers arriving while it
+runs (followers) wait on the same future and receive the same result or exception. Once the request
+finishes the key is forgotten, so later callers start a new request; the caches in front of the request
+serve them from then on. `ado` does the same for coroutines, and sync and async callers of one group
+share each other's in-flight requests. Whether a call led or shared is recorded on the current tracing
+span (singleflight=leader/shared).
+
+In Simple Terms:
+SingleFlight is the colleague who says "I'm already on the phone with them about that, I'll tell you both
+what they say" instead of letting everyone call the same help line at once.
+
+Attributes:
+- name: Name of the group, used in tracing attributes and logs.
+
+Methods:
+- do: Runs fn(*args, **kwargs) once per key among concurrent callers, returning (result, shared).
+- ado: Awaitable do for a coroutine factory.
+- stats: Returns the number of upstream calls made and of calls that shared one.
+'''
+
+import asyncio
+import threading
+from concurrent.futures import Future
+
+from utils.tracing import set_attributes
+
+
+class SingleFlight:
+    def __init__(self, name):
+        self.name = name
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._stats = {'calls': 0, 'shared': 0}
+
+    def _join(self, key):
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self._stats['shared'] += 1
+                set_attributes(singleflight='shared')
+                return future, False
+            future = self._calls[key] = Future()
+            self._stats['calls'] += 1
+            set_attributes(singleflight='leader')
+            return future, True
+
+    def _settle(self, key, future, result=None, error=None):
+        with self._lock:
+            self._calls.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key, fn, *args, **kwargs):
+        future, leader = self._join(key)
+        if not leader:
+            return future.result(), True
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self._settle(key, future, error=e)
+            raise
+        self._settle(key, future, result)
+        return result, False
+
+    async def ado(self, key, coroutine_factory):
+        future, leader = self._join(key)
+        if not leader:
+            return await asyncio.wrap_future(future), True
+        try:
+            result = await coroutine_factory()
+        except BaseException as e:
+            self._settle(key, future, error=e)
+            raise
+        self._settle(key, future, result)
+        return result, False
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats, in_flight=len(self._calls))
+        total = stats['calls'] + stats['shared']
+        stats['shared_rate'] = stats['shared'] / total if total else 0.0
+        return stats
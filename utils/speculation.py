@@ -0,0 +1,80 @@
+'''
+⚡ SpeculativeReply Class - Speculative Agent Zero Generation for Advisory App
+-----------------------------------------------------------------------------
+Technical Overview:
+Most turns are general conversation ('N'), and for those Agent Zero's prompt does not depend on Agent
+One's classification. SpeculativeReply starts Agent Zero's streamed generation on a background thread at
+the start of the turn, while Agent One is still classifying the input. Chunks are buffered as they
+arrive. When Agent One confirms the turn is 'N', the buffered and remaining chunks are replayed into the
+UI through `stream()`. On 'R' turns (Agent Two's updated risk profile changes the prompt) and 'Y' turns
+(the reply needs the research summary) the engine calls `cancel()`, which stops consuming the provider
+stream, closes it, and discards the result. Timestamps are recorded so each turn can report how much
+latency the overlap saved.
+
+In Simple Terms:
+SpeculativeReply lets Agent Zero start writing its answer while Agent One is still deciding what kind of
+message it was. If the guess was right, the answer is ready sooner; if not, it is thrown away.
+
+Attributes:
+- started_at / first_chunk_at / finished_at: Monotonic timestamps of the speculative generation.
+
+Methods:
+- stream: Yields the reply's chunks (already buffered ones first), raising any generation error.
+- cancel: Stops the speculative generation and discards its output.
+- duration: Seconds the generation took, or None while it is still running.
+'''
+
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.tracing import propagate
+
+_DONE = object()
+
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="speculative-reply")
+
+class SpeculativeReply:
+    def __init__(self, stream_factory):
+        self.started_at = time.monotonic()
+        self.first_chunk_at = None
+        self.finished_at = None
+        self._chunks = queue.Queue()
+        self._cancelled = threading.Event()
+        self._future = _executor.submit(propagate(self._run), stream_factory)
+
+    def _run(self, stream_factory):
+        chunks = None
+        try:
+            chunks = stream_factory()
+            for chunk in chunks:
+                if self._cancelled.is_set():
+                    break
+                if self.first_chunk_at is None:
+                    self.first_chunk_at = time.monotonic()
+                self._chunks.put(chunk)
+        except Exception as e:
+            self._chunks.put(e)
+        finally:
+            if chunks is not None and hasattr(chunks, 'close'):
+                chunks.close()  # releases the provider's streaming connection
+            self.finished_at = time.monotonic()
+            self._chunks.put(_DONE)
+
+    def stream(self):
+        while True:
+            chunk = self._chunks.get()
+            if chunk is _DONE:
+                return
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def duration(self):
+        if self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
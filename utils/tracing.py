@@ -0,0 +1,149 @@
+'''
+🔭 Tracer Class - Lightweight Span Tracing for the Agentic Pipeline
+------------------------------------------------------------------
+Technical Overview:
+The Tracer records where a turn's time goes as a tree of spans. A span has a name, a start time, a
+duration and free-form attributes (model, token counts, cache hit/miss, ticker, ...). The current span is
+kept in a contextvar, so spans opened inside another span become its children without passing anything
+around; work handed to other threads (market data calls, the speculative reply) keeps its parent by
+running under `propagate`, which copies the caller's context. Every finished span is appended as one JSON
+line to a local file (data/traces.jsonl by default), and the spans of the trace are also kept in memory
+on the root span, so the app can show a per-turn waterfall (ui/trace_waterfall.py). Generators, whose
+code runs whenever the consumer pulls, use detached spans (`start_span`) that get a parent but never
+become the current span.
+
+In Simple Terms:
+The Tracer is a stopwatch with a notebook. Every step of a turn notes when it started, how long it took
+and anything worth knowing (was it cached? how many tokens?), so slow steps can be found and fixes proven.
+
+Attributes:
+- path: JSON lines file the spans are written to (None to keep them in memory only).
+- max_bytes: Size at which the file is rotated to <path>.1, so tracing cannot fill the disk.
+- enabled: Set to False to turn tracing into a no-op.
+
+Methods:
+- span: Context manager opening a child span of the current span (or a new trace).
+- start_span: Opens a detached span, ended explicitly with Span.end.
+- set_attributes: Adds attributes to the current span.
+- propagate: Wraps a callable so it runs in the caller's tracing context on another thread.
+- tracer: Process-wide Tracer used by the module-level helpers (Singleton pattern).
+'''
+
+import contextlib
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+
+_current_span = contextvars.ContextVar('current_span', default=None)
+
+
+class Span:
+    def __init__(self, tracer, name, parent=None, attributes=None):
+        self.tracer = tracer
+        self.name = name
+        self.parent = parent
+        self.root = parent.root if parent is not None else self
+        self.trace_id = self.root.trace_id if parent is not None else uuid.uuid4().hex[:16]
+        self.span_id = uuid.uuid4().hex[:16]
+        self.attributes = dict(attributes or {})
+        self.start = time.time()
+        self.duration_ms = None
+        self.thread = threading.current_thread().name
+        if parent is None:
+            self.spans = []  # every finished span of the trace, in finishing order
+            self._spans_lock = threading.Lock()
+
+    @property
+    def depth(self):
+        return 0 if self.parent is None else self.parent.depth + 1
+
+    def set_attributes(self, **attributes):
+        self.attributes.update(attributes)
+
+    def end(self):
+        if self.duration_ms is None:
+            self.duration_ms = (time.time() - self.start) * 1000
+            with self.root._spans_lock:
+                self.root.spans.append(self)
+            self.tracer.export(self)
+
+    def to_dict(self):
+        return {
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent.span_id if self.parent is not None else None,
+            'name': self.name,
+            'start': self.start,
+            'duration_ms': round(self.duration_ms, 3) if self.duration_ms is not None else None,
+            'depth': self.depth,
+            'thread': self.thread,
+            'attributes': self.attributes,
+        }
+
+
+class Tracer:
+    def __init__(self, path=os.path.join("data", "traces.jsonl"), max_bytes=50 * 1024 * 1024, enabled=True):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._lock = threading.Lock()
+
+    def start_span(self, name, **attributes):
+        if not self.enabled:
+            return None
+        return Span(self, name, parent=_current_span.get(), attributes=attributes)
+
+    @contextlib.contextmanager
+    def span(self, name, **attributes):
+        span = self.start_span(name, **attributes)
+        if span is None:
+            yield None
+            return
+        token = _current_span.set(span)
+        try:
+            yield span
+        except Exception as e:
+            span.set_attributes(error=f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    def export(self, span):
+        if not self.path:
+            return
+        line = json.dumps(span.to_dict(), default=str)
+        try:
+            with self._lock:
+                if os.path.exists(self.path) and os.path.getsize(self.path) > self.max_bytes:
+                    os.replace(self.path, self.path + ".1")
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+        except OSError:
+            pass  # tracing must never break a turn
+
+
+# Process-wide tracer shared by every session (Singleton pattern)
+tracer = Tracer()
+
+def span(name, **attributes):
+    return tracer.span(name, **attributes)
+
+def start_span(name, **attributes):
+    return tracer.start_span(name, **attributes)
+
+def current_span():
+    return _current_span.get()
+
+def set_attributes(**attributes):
+    span = _current_span.get()
+    if span is not None:
+        span.set_attributes(**attributes)
+
+def propagate(fn):
+    """Returns `fn` bound to the caller's context, so spans it opens on another thread keep their parent."""
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.run(fn, *args, **kwargs)